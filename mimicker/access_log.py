@@ -0,0 +1,115 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+
+# (time, method, target, stub path template, status, bytes sent, seconds taken)
+_Entry = Tuple[float, str, str, Optional[str], int, int, float]
+
+
+class AccessLog:
+    """
+    Writes one JSON line per request to a file, from a background thread.
+
+    Recording a request only appends a tuple to a deque; the writer thread
+    encodes whatever has accumulated every flush_interval seconds and writes
+    it through a buffered file. Once the file would grow past max_bytes it is
+    rotated, keeping backup_count old files (path.1 being the most recent).
+    With a sample_rate below 1 only that fraction of requests is recorded.
+    """
+    def __init__(self, path: str, sample_rate: float = 1.,
+                 max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 backup_count: int = DEFAULT_BACKUP_COUNT,
+                 flush_interval: float = 0.5):
+        """
+        Raises:
+            ValueError: If sample_rate isn't in (0, 1].
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate}")
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self._entries: Deque[_Entry] = deque()
+        self._file = open(path, "ab", buffering=1 << 16)
+        self._size = self._file.tell()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mimicker-access-log",
+                                        daemon=True)
+        self._thread.start()
+
+    def record(self, method: str, target: str, stub: Optional[str], status: int,
+               size: int, latency: float):
+        """
+        Records one request.
+
+        Args:
+            method (str): The request method.
+            target (str): The request target, including any query string.
+            stub (Optional[str]): The path template of the stub that answered,
+                or None.
+            status (int): The response status.
+            size (int): Bytes written for the response, headers included.
+            latency (float): Seconds from reading the request to finishing the
+                response, delays included.
+        """
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return
+        self._entries.append((time.time(), method, target, stub, int(status), size, latency))
+
+    def flush(self):
+        """Writes out everything recorded so far."""
+        entries = self._entries
+        with self._lock:
+            while entries:
+                timestamp, method, target, stub, status, size, latency = entries.popleft()
+                line = json.dumps({
+                    "time": round(timestamp, 3), "method": method, "path": target,
+                    "stub": stub, "status": status, "bytes": size,
+                    "latency_ms": round(latency * 1000, 3),
+                }, separators=(",", ":")).encode("utf-8") + b"\n"
+                if self.max_bytes and self._size and \
+                        self._size + len(line) > self.max_bytes:
+                    self._rotate()
+                self._file.write(line)
+                self._size += len(line)
+            self._file.flush()
+
+    def close(self):
+        """Writes out what is pending and closes the file; safe to call twice."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._thread.join()
+        self.flush()
+        self._file.close()
+
+    def _run(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                older = f"{self.path}.{index}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "wb", buffering=1 << 16)
+        self._size = 0
+
+
+def worker_path(path: str, index: int) -> str:
+    """The access log of one prefork worker: access.log becomes access.worker-0.log."""
+    root, ext = os.path.splitext(path)
+    return f"{root}.worker-{index}{ext}"
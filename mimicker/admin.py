@@ -0,0 +1,45 @@
+import json
+from typing import TYPE_CHECKING, Callable, Dict
+
+from mimicker.metrics import CONTENT_TYPE, render_metrics
+from mimicker.response import Response
+
+if TYPE_CHECKING:
+    from mimicker.stub_group import StubGroup
+
+ADMIN_PREFIX = "/__mimicker__/"
+HEALTH_PATH = "/__mimicker__/health"
+REPORT_PATH = "/__mimicker__/report"
+METRICS_PATH = "/__mimicker__/metrics"
+
+
+def admin_json(data: dict) -> Response:
+    body = json.dumps(data).encode("utf-8")
+    return Response(200, [("Content-Type", "application/json")], body)
+
+
+_HEALTHY = admin_json({"status": "up"})
+
+
+def _health(stub_group: "StubGroup") -> Response:
+    return _HEALTHY
+
+
+def _report(stub_group: "StubGroup") -> Response:
+    return admin_json(stub_group.report())
+
+
+def _metrics(stub_group: "StubGroup") -> Response:
+    return Response(200, [("Content-Type", CONTENT_TYPE)], render_metrics(stub_group))
+
+
+# The built-in endpoints by path. A user stub that matches one of these paths
+# takes precedence over it (see StubGroup.overrides_admin()).
+ADMIN_ENDPOINTS: Dict[str, Callable[["StubGroup"], Response]] = {
+    HEALTH_PATH: _health,
+    REPORT_PATH: _report,
+    METRICS_PATH: _metrics,
+}
+
+# Endpoints polled often enough that logging each request would drown the log.
+QUIET_PATHS = frozenset({HEALTH_PATH, METRICS_PATH})
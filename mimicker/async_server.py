@@ -0,0 +1,377 @@
+import asyncio
+import socket
+import threading
+from http import HTTPStatus
+from typing import Optional, Set, Tuple
+
+from mimicker.access_log import AccessLog
+from mimicker.dispatch import dispatch
+from mimicker.exceptions import BodyTooLarge
+from mimicker.files import INLINE_FILE_SIZE
+from mimicker.http_parser import (MAX_HEADERS, MAX_LINE_LENGTH, Headers, HTTPParseError,
+                                  parse_headers, parse_request_line, wants_keep_alive)
+from mimicker.logger import get_logger
+from mimicker.request import DEFAULT_SPOOL_THRESHOLD, BodyBuffer, RawBody, Request
+from mimicker.response import Response, render, stream_frames
+from mimicker.sockets import SocketOptions, configure_listener
+from mimicker.stub_group import StubGroup
+
+_SUPPORTED_METHODS = {"GET", "POST", "PUT", "DELETE", "PATCH"}
+
+
+class AsyncioHTTPServer:
+    """
+    An HTTP/1.1 server that serves a StubGroup from a single asyncio event loop.
+
+    Exposes the subset of the socketserver interface MimickerServer relies on
+    (server_address, serve_forever, shutdown, server_close), so it can stand in
+    for ReusableAddressThreadingTCPServer.
+    """
+    request_queue_size = 1024
+    keep_alive_timeout = 75.0
+    max_line_length = MAX_LINE_LENGTH
+    max_headers = MAX_HEADERS
+    max_body_size: Optional[int] = None
+    spool_threshold = DEFAULT_SPOOL_THRESHOLD
+    access_log: Optional[AccessLog] = None
+
+    def __init__(self, server_address: Tuple[str, int], stub_matcher: StubGroup,
+                 reuse_port: bool = False, socket_options: SocketOptions = SocketOptions()):
+        self.logger = get_logger()
+        self.stub_matcher = stub_matcher
+        self.socket_options = socket_options
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        configure_listener(self.socket, socket_options)
+        try:
+            self.socket.bind(server_address)
+            self.socket.listen(socket_options.backlog or self.request_queue_size)
+        except OSError:
+            self.socket.close()
+            raise
+        self.socket.setblocking(False)
+        self.server_address = self.socket.getsockname()
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._shutdown_request = False
+        self._is_shut_down = threading.Event()
+        self._connections: Set[asyncio.Task] = set()
+        self.pending_delays = 0
+
+    @property
+    def active_connections(self) -> int:
+        return len(self._connections)
+
+    def serve_forever(self):
+        """
+        Runs the event loop until shutdown() is called.
+        """
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._is_shut_down.set()
+
+    def shutdown(self):
+        """
+        Stops the event loop and waits for serve_forever() to return.
+        """
+        with self._lock:
+            self._shutdown_request = True
+            loop, stop = self._loop, self._stop
+        if loop is None or self._is_shut_down.is_set():
+            return
+        try:
+            loop.call_soon_threadsafe(stop.set)
+        except RuntimeError:
+            return  # loop already closed
+        self._is_shut_down.wait()
+
+    def server_close(self):
+        self.socket.close()
+
+    async def _serve(self):
+        with self._lock:
+            if self._shutdown_request:
+                return
+            self._loop = asyncio.get_running_loop()
+            self._stop = asyncio.Event()
+
+        server = await asyncio.start_server(
+            self._handle_connection, sock=self.socket, limit=self.max_line_length
+        )
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            for task in list(self._connections):
+                task.cancel()
+            if self._connections:
+                await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        if not self.socket_options.nodelay:
+            # asyncio turns TCP_NODELAY on for every TCP connection.
+            writer.get_extra_info("socket").setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+        try:
+            keep_alive = True
+            while keep_alive:
+                keep_alive = await self._handle_one_request(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server shutting down
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _handle_one_request(self, reader: asyncio.StreamReader,
+                                  writer: asyncio.StreamWriter) -> bool:
+        try:
+            head = await asyncio.wait_for(_read_head(reader, self.max_headers),
+                                          self.keep_alive_timeout)
+            if head is None:
+                return False
+            method, target, version, headers = head
+            # The body is only timed per read, so a slow upload that keeps
+            # sending is not cut off.
+            body = await self._read_body(reader, writer, version, headers)
+        except asyncio.TimeoutError:
+            return False
+        except HTTPParseError as e:
+            self.logger.warning("Bad request: %s", e)
+            await self._write(writer, Response(e.status, []), "HTTP/1.1", False)
+            return False
+
+        started = self._loop.time()
+        tracker = self.stub_matcher.tracker
+        tracker.request_started()
+        try:
+            return await self._answer(writer, started, method, target, version, headers, body)
+        finally:
+            tracker.request_finished()
+
+    async def _answer(self, writer: asyncio.StreamWriter, started: float, method: str,
+                      target: str, version: str, headers: Headers, body: RawBody) -> bool:
+        """Dispatches a parsed request and writes the response."""
+        keep_alive = wants_keep_alive(version, headers)
+        quiet = False
+        route = None
+        stub_slot = None
+        if method not in _SUPPORTED_METHODS:
+            response = Response(HTTPStatus.NOT_IMPLEMENTED, [])
+        else:
+            request = Request(method, target, headers, body)
+            try:
+                response = dispatch(self.stub_matcher, request)
+            except Exception:
+                self.logger.exception("Error handling %s %s", method, target)
+                response = Response(HTTPStatus.INTERNAL_SERVER_ERROR, [])
+                keep_alive = False
+            finally:
+                request.close()
+            quiet = request.quiet
+            route = request.route
+            stub_slot = request.stub_slot
+
+        dispatched = self._loop.time()
+        if response.delay > 0:
+            # A timer on the loop; the connection task costs nothing while it waits.
+            self.pending_delays += 1
+            try:
+                await asyncio.sleep(response.delay)
+            finally:
+                self.pending_delays -= 1
+        sending = self._loop.time()
+        if response.streamed:
+            keep_alive, sent = await self._stream(writer, response, version, keep_alive)
+        elif response.from_file:
+            sent = await self._send_file(writer, response, version, keep_alive)
+        else:
+            sent = await self._write(writer, response, version, keep_alive)
+        finished = self._loop.time()
+        if stub_slot is not None:
+            self.stub_matcher.tracker.record_response(
+                stub_slot, (dispatched - started) + (finished - sending),
+                response.delay, sending - dispatched, sent)
+        if not quiet:
+            self.logger.info('"%s %s %s" %d -', method, target, version, response.status)
+            if self.access_log is not None:
+                self.access_log.record(method, target, route, response.status, sent,
+                                       finished - started)
+        return keep_alive
+
+    async def _read_body(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         version: str, headers: Headers) -> RawBody:
+        body: RawBody = b""
+        chunked = "chunked" in headers.get("transfer-encoding", "").lower()
+        length = 0
+        if not chunked and "content-length" in headers:
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                length = -1
+            if length < 0:
+                raise HTTPParseError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+            if self.max_body_size is not None and length > self.max_body_size:
+                raise HTTPParseError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                                     f"body of {length} bytes refused")
+
+        if chunked or length > 0:
+            if version == "HTTP/1.1" and \
+                    headers.get("expect", "").lower() == "100-continue":
+                writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+                await writer.drain()
+            if chunked or length > self.spool_threshold:
+                buffer = BodyBuffer(self.spool_threshold, self.max_body_size)
+                try:
+                    if chunked:
+                        await _read_chunked(reader, buffer, self.keep_alive_timeout)
+                    else:
+                        await _read_into(reader, length, buffer, self.keep_alive_timeout)
+                except BodyTooLarge as e:
+                    raise HTTPParseError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e))
+                body = buffer.getvalue()
+            else:
+                body = await _read_exactly(reader, length, self.keep_alive_timeout)
+        return body
+
+    async def _write(self, writer: asyncio.StreamWriter, response: Response,
+                     version: str, keep_alive: bool) -> int:
+        data = render(response, version, keep_alive)
+        writer.write(data)
+        await writer.drain()
+        return len(data)
+
+    async def _send_file(self, writer: asyncio.StreamWriter, response: Response,
+                         version: str, keep_alive: bool) -> int:
+        body = response.body
+        try:
+            head = render(response, version, keep_alive)
+            if body.length <= INLINE_FILE_SIZE:
+                writer.write(head + body.read())
+                await writer.drain()
+            else:
+                writer.write(head)
+                await writer.drain()
+                # Zero-copy through os.sendfile where the loop supports it.
+                await self._loop.sendfile(writer.transport, body.file,
+                                          body.offset, body.length)
+        finally:
+            body.close()
+        return len(head) + body.length
+
+    async def _stream(self, writer: asyncio.StreamWriter, response: Response,
+                      version: str, keep_alive: bool) -> Tuple[bool, int]:
+        """
+        Write a streamed response; returns whether the connection stays open,
+        and the number of bytes written.
+        """
+        if version == "HTTP/1.0":
+            # Without chunked encoding the body ends when the connection does.
+            keep_alive = False
+        frames = stream_frames(response, version)
+        try:
+            first = next(frames, b"")
+        except Exception:
+            self.logger.exception("Error streaming response")
+            sent = await self._write(writer, Response(HTTPStatus.INTERNAL_SERVER_ERROR, []),
+                                     version, False)
+            return False, sent
+        sent = 0
+        try:
+            # Send the head with the first chunk, in one write.
+            data = render(response, version, keep_alive) + first
+            writer.write(data)
+            sent = len(data)
+            await writer.drain()
+            for frame in frames:
+                if response.chunk_delay > 0:
+                    await asyncio.sleep(response.chunk_delay)
+                writer.write(frame)
+                sent += len(frame)
+                await writer.drain()
+        except Exception:
+            # The status is already sent; all that's left is to cut the body short.
+            self.logger.exception("Error streaming response")
+            return False, sent
+        finally:
+            frames.close()
+        return keep_alive, sent
+
+
+async def _read_head(reader: asyncio.StreamReader, max_headers: int
+                     ) -> Optional[Tuple[str, str, str, Headers]]:
+    request_line = b"\r\n"
+    # Tolerate stray CRLFs between pipelined requests (RFC 9112 §2.2).
+    while request_line in (b"\r\n", b"\n"):
+        request_line = await _readline(reader)
+    if not request_line:
+        return None
+
+    method, target, version = parse_request_line(request_line)
+
+    lines = []
+    while True:
+        line = await _readline(reader)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if len(lines) >= max_headers:
+            raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 "too many headers")
+        lines.append(line)
+    return method, target, version, parse_headers(lines, max_headers)
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "line too long")
+
+
+async def _read_exactly(reader: asyncio.StreamReader, length: int, timeout: float) -> bytes:
+    """Reads length bytes, allowing timeout seconds between arrivals."""
+    data = bytearray()
+    while len(data) < length:
+        chunk = await asyncio.wait_for(reader.read(length - len(data)), timeout)
+        if not chunk:
+            raise asyncio.IncompleteReadError(bytes(data), length)
+        data += chunk
+    return bytes(data)
+
+
+async def _read_into(reader: asyncio.StreamReader, length: int, buffer: BodyBuffer,
+                     timeout: float):
+    while length > 0:
+        chunk = await asyncio.wait_for(reader.read(min(length, 65536)), timeout)
+        if not chunk:
+            raise asyncio.IncompleteReadError(b"", length)
+        buffer.write(chunk)
+        length -= len(chunk)
+
+
+async def _read_chunked(reader: asyncio.StreamReader, buffer: BodyBuffer, timeout: float):
+    while True:
+        size_line = await asyncio.wait_for(_readline(reader), timeout)
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPParseError(HTTPStatus.BAD_REQUEST, "invalid chunk size")
+        if size == 0:
+            # Discard trailers up to the terminating blank line.
+            while (await asyncio.wait_for(_readline(reader), timeout)) \
+                    not in (b"\r\n", b"\n", b""):
+                pass
+            return
+        await _read_into(reader, size, buffer, timeout)
+        await _read_exactly(reader, 2, timeout)
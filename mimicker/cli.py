@@ -12,7 +12,9 @@ from typing import Optional
 from mimicker.config import build_routes, load_config, validate_config
 from mimicker.logger import get_logger
 from mimicker.mimicker import mimicker
+from mimicker.prefork import serve_prefork
 from mimicker.route import Route
+from mimicker.server import ENGINES
 
 _HEALTH_PATH = "/__mimicker__/health"
 _REPORT_PATH = "/__mimicker__/report"
@@ -45,7 +47,7 @@ def cmd_serve(args):
                 print(f"[ERROR] {e}", file=sys.stderr)
             sys.exit(1)
 
-        routes = build_routes(data)
+        routes = build_routes(data, os.path.dirname(config_path))
         if port is None:
             port = int(data.get("port", 8080))
 
@@ -56,7 +58,18 @@ def cmd_serve(args):
         route = _parse_inline_stub(args.stub)
         routes.append(route)
 
-    server = mimicker(port)
+    workers = getattr(args, "workers", None) or 1
+    if workers > 1:
+        try:
+            code = serve_prefork(port, routes, workers, **_server_options(args))
+        except RuntimeError as e:
+            print(f"[ERROR] {e}", file=sys.stderr)
+            sys.exit(1)
+        if code:
+            sys.exit(code)
+        return
+
+    server = mimicker(port, **_server_options(args))
     if routes:
         server.routes(*routes)
 
@@ -73,6 +86,39 @@ def cmd_serve(args):
         server.shutdown()
 
 
+def _server_options(args) -> dict:
+    """Collect the optional server settings that were given on the command line."""
+    options = {}
+    if getattr(args, "engine", None):
+        options["engine"] = args.engine
+    if getattr(args, "threads", None) is not None:
+        options["threads"] = args.threads
+    if getattr(args, "match_cache", None) is not None:
+        options["match_cache_size"] = args.match_cache
+    if getattr(args, "max_body_size", None) is not None:
+        options["max_body_size"] = args.max_body_size
+    if getattr(args, "spool_threshold", None) is not None:
+        options["spool_threshold"] = args.spool_threshold
+    if getattr(args, "compress_min_size", None) is not None:
+        options["compress_min_size"] = args.compress_min_size
+    for name in ("backlog", "send_buffer", "recv_buffer"):
+        if getattr(args, name, None) is not None:
+            options[name] = getattr(args, name)
+    if getattr(args, "no_tcp_nodelay", False):
+        options["tcp_nodelay"] = False
+    if getattr(args, "max_unmatched", None) is not None:
+        options["max_unmatched"] = args.max_unmatched
+    if getattr(args, "unmatched_samples", None) is not None:
+        options["unmatched_samples"] = args.unmatched_samples
+    if getattr(args, "access_log", None):
+        options["access_log"] = args.access_log
+    if getattr(args, "access_log_sample", None) is not None:
+        options["access_log_sample"] = args.access_log_sample
+    if getattr(args, "access_log_max_bytes", None) is not None:
+        options["access_log_max_bytes"] = args.access_log_max_bytes
+    return options
+
+
 def cmd_wait(args):
     url = args.url.rstrip("/") + _HEALTH_PATH
     deadline = time.monotonic() + args.timeout
@@ -144,6 +190,17 @@ def _print_text_report(data: dict):
     print(f"\nMimicker Report")
     print(f"  Stubs      : {s['matched_stubs']}/{s['total_stubs']} exercised")
     print(f"  Unmatched  : {s['unmatched_requests']} request(s)")
+    workers = data.get("workers")
+    if workers:
+        print(f"  Processes  : {workers['reporting']}/{workers['count']} worker(s) reporting")
+    server = data.get("server", {})
+    if "threads" in server:
+        print(f"  Workers    : {server['threads']} thread(s), "
+              f"{server['queue_depth']} connection(s) queued")
+    cache = data.get("match_cache")
+    if cache:
+        print(f"  Match cache: {cache['hits']} hit(s), {cache['misses']} miss(es), "
+              f"{cache['size']}/{cache['max_size']} entries")
 
     if data["unused_stubs"]:
         print("\nUnused stubs (never hit):")
@@ -153,7 +210,27 @@ def _print_text_report(data: dict):
     if data["unmatched_requests"]:
         print("\nUnmatched requests (contract drift):")
         for req in data["unmatched_requests"]:
-            print(f"  - {req['method']} {req['path']}  [{req['timestamp']}]")
+            count = req.get("count", 1)
+            seen = req['timestamp']
+            if count > 1:
+                seen = f"{count} times, {req['first_seen']} .. {req['last_seen']}"
+            print(f"  - {req['method']} {req['path']}  [{seen}]")
+
+    timed = [stub for stub in data["stubs"] if stub.get("timings")]
+    if timed:
+        print("\nServer-side timings (p50 / p90 / p99 / max):")
+        for stub in timed:
+            timings = stub["timings"]
+            print(f"  - {stub['method']} {stub['path']}  [{timings['count']} response(s)]")
+            print(f"      handling : {_quantiles(timings['handling_ms'])} ms")
+            if timings["delay_ms"]["max"] > 0:
+                print(f"      delay    : {_quantiles(timings['actual_delay_ms'])} ms "
+                      f"(configured {_quantiles(timings['delay_ms'])} ms)")
+            print(f"      bytes    : {_quantiles(timings['response_bytes'])}")
+
+
+def _quantiles(summary: dict) -> str:
+    return " / ".join(f"{summary[key]:g}" for key in ("p50", "p90", "p99", "max"))
 
 
 def _print_github_summary(data: dict):
@@ -174,10 +251,12 @@ def _print_github_summary(data: dict):
 
     if data["unmatched_requests"]:
         print("\n### Unmatched Requests (Contract Drift)\n")
-        print("| Method | Path | Timestamp |")
-        print("|--------|------|-----------|")
+        print("| Method | Path | Count | First seen | Last seen |")
+        print("|--------|------|------:|------------|-----------|")
         for req in data["unmatched_requests"]:
-            print(f"| `{req['method']}` | `{req['path']}` | {req['timestamp']} |")
+            print(f"| `{req['method']}` | `{req['path']}` | {req.get('count', 1)} "
+                  f"| {req.get('first_seen', req['timestamp'])} "
+                  f"| {req.get('last_seen', req['timestamp'])} |")
 
 
 # ── inline stub parser ────────────────────────────────────────────────────────
@@ -206,6 +285,13 @@ def _parse_inline_stub(stub_str: str) -> Route:
 
 # ── entry point ───────────────────────────────────────────────────────────────
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         prog="mimicker",
@@ -224,6 +310,77 @@ def main():
         "--stub", metavar="STUB",
         help="Inline stub: 'METHOD /path -> STATUS {json}'"
     )
+    p_serve.add_argument(
+        "--engine", choices=ENGINES, default=None,
+        help="Server engine: 'threaded' (default) or 'asyncio' "
+             "(overrides MIMICKER_ENGINE)"
+    )
+    p_serve.add_argument(
+        "--threads", type=_positive_int, default=None, metavar="N",
+        help="Serve connections from a fixed pool of N worker threads "
+             "(threaded engine; default: one thread per connection)"
+    )
+    p_serve.add_argument(
+        "--workers", type=int, default=None, metavar="N",
+        help="Fork N worker processes sharing the port via SO_REUSEPORT (default: 1)"
+    )
+    p_serve.add_argument(
+        "--match-cache", type=_positive_int, default=None, metavar="N",
+        help="Cache up to N route-match results by method and path (default: off)"
+    )
+    p_serve.add_argument(
+        "--max-body-size", type=int, default=None, metavar="BYTES",
+        help="Answer requests with a larger body with 413 (default: unlimited)"
+    )
+    p_serve.add_argument(
+        "--spool-threshold", type=int, default=None, metavar="BYTES",
+        help="Buffer request bodies larger than BYTES in a temporary file "
+             "(default: 1048576)"
+    )
+    p_serve.add_argument(
+        "--compress-min-size", type=int, default=None, metavar="BYTES",
+        help="Precompress static bodies of at least BYTES with gzip/deflate and "
+             "serve them by Accept-Encoding (default: off)"
+    )
+    p_serve.add_argument(
+        "--backlog", type=_positive_int, default=None, metavar="N",
+        help="Length of the listen queue (default: 128 threaded, 1024 asyncio)"
+    )
+    p_serve.add_argument(
+        "--send-buffer", type=_positive_int, default=None, metavar="BYTES",
+        help="SO_SNDBUF for connections (default: OS default)"
+    )
+    p_serve.add_argument(
+        "--recv-buffer", type=_positive_int, default=None, metavar="BYTES",
+        help="SO_RCVBUF for connections (default: OS default)"
+    )
+    p_serve.add_argument(
+        "--no-tcp-nodelay", action="store_true",
+        help="Leave Nagle's algorithm on for connections (TCP_NODELAY is set by default)"
+    )
+    p_serve.add_argument(
+        "--max-unmatched", type=int, default=None, metavar="N",
+        help="Distinct method and path pairs of unmatched requests kept for the "
+             "report; the least recently seen is dropped past N (default: 1000)"
+    )
+    p_serve.add_argument(
+        "--unmatched-samples", type=int, default=None, metavar="N",
+        help="Also keep the last N unmatched requests individually (default: 0)"
+    )
+    p_serve.add_argument(
+        "--access-log", default=None, metavar="FILE",
+        help="Append one JSON line per request to FILE "
+             "(overrides MIMICKER_ACCESS_LOG)"
+    )
+    p_serve.add_argument(
+        "--access-log-sample", type=float, default=None, metavar="RATE",
+        help="Fraction of requests written to the access log, in (0, 1] (default: 1)"
+    )
+    p_serve.add_argument(
+        "--access-log-max-bytes", type=int, default=None, metavar="BYTES",
+        help="Rotate the access log at this size, keeping 5 old files; "
+             "0 never rotates (default: 100 MiB)"
+    )
 
     # wait
     p_wait = sub.add_parser(
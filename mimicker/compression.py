@@ -0,0 +1,80 @@
+import gzip
+import zlib
+from functools import lru_cache
+from typing import Callable, Container, Dict, Optional, Tuple
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+# Content codings in order of preference when a client rates several equally.
+CODINGS: Dict[str, Callable[[bytes], bytes]] = {}
+if zstd is not None:
+    CODINGS["zstd"] = zstd.compress
+CODINGS["gzip"] = lambda data: gzip.compress(data, mtime=0)
+# HTTP's "deflate" is the zlib format (RFC 9110 §8.4.1.2), not raw deflate.
+CODINGS["deflate"] = zlib.compress
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """
+    Compress a body with every supported coding.
+
+    Returns:
+        Dict[str, bytes]: The compressed body by coding name, leaving out
+        codings that don't make it smaller.
+    """
+    variants = {}
+    for coding, compress in CODINGS.items():
+        compressed = compress(body)
+        if len(compressed) < len(body):
+            variants[coding] = compressed
+    return variants
+
+
+def negotiate(accept_encoding: Optional[str], available: Container[str]) -> Optional[str]:
+    """
+    Pick a content coding for a request.
+
+    Args:
+        accept_encoding (Optional[str]): The request's Accept-Encoding header.
+        available (Container[str]): The codings the response is available in.
+
+    Returns:
+        Optional[str]: The coding the client rates highest, or None to send
+        the body as-is.
+    """
+    if not accept_encoding:
+        return None
+    for coding in _preferences(accept_encoding):
+        if coding in available:
+            return coding
+    return None
+
+
+@lru_cache(maxsize=256)
+def _preferences(accept_encoding: str) -> Tuple[str, ...]:
+    # Clients send a handful of distinct Accept-Encoding values; parse each once.
+    ratings: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, *params = item.strip().split(";")
+        q = 1.
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.
+        if coding:
+            ratings[coding] = q
+    wildcard = ratings.get("*", 0.)
+    # The body as-is is acceptable unless excluded; a coding rated below it loses.
+    identity = ratings.get("identity", wildcard if "*" in ratings else 1.)
+    candidates = []
+    for rank, coding in enumerate(CODINGS):
+        q = ratings.get(coding, wildcard)
+        if q > 0 and q >= identity:
+            candidates.append((-q, rank, coding))
+    return tuple(coding for _, _, coding in sorted(candidates))
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from mimicker.route import Route
 from mimicker.sequence import SequenceStep
@@ -53,12 +53,33 @@ def validate_config(data: Dict[str, Any]) -> List[str]:
             errors.append(f"{prefix}: 'status' must be an HTTP status code integer")
         if "sequence" in route and not isinstance(route["sequence"], list):
             errors.append(f"{prefix}: 'sequence' must be a list of step objects")
+        if "etag" in route and not isinstance(route["etag"], bool):
+            errors.append(f"{prefix}: 'etag' must be true or false")
+        errors.extend(_validate_body_file(route, prefix))
+        for j, step_data in enumerate(route.get("sequence") or []):
+            if isinstance(step_data, dict):
+                errors.extend(_validate_body_file(step_data, f"{prefix}.sequence[{j}]"))
 
     return errors
 
 
-def build_routes(data: Dict[str, Any]) -> List[Route]:
-    """Convert validated config data into Route objects."""
+def _validate_body_file(entry: Dict[str, Any], prefix: str) -> List[str]:
+    if "body_file" not in entry:
+        return []
+    if not isinstance(entry["body_file"], str) or not entry["body_file"]:
+        return [f"{prefix}: 'body_file' must be a file path"]
+    if "body" in entry:
+        return [f"{prefix}: 'body' and 'body_file' are mutually exclusive"]
+    return []
+
+
+def build_routes(data: Dict[str, Any], base_dir: Optional[str] = None) -> List[Route]:
+    """
+    Convert validated config data into Route objects.
+
+    Relative body_file paths are resolved against base_dir, normally the
+    directory of the config file, or the working directory if it is None.
+    """
     routes = []
     for r in data.get("routes", []):
         method = str(r.get("method", "GET")).upper()
@@ -75,11 +96,15 @@ def build_routes(data: Dict[str, Any]) -> List[Route]:
             route.status(int(r["status"]))
         if "body" in r:
             route.body(r["body"])
+        if "body_file" in r:
+            route.body_file(_resolve(r["body_file"], base_dir))
         if "headers" in r:
             h = r["headers"]
             route.headers(list(h.items()) if isinstance(h, dict) else h)
         if "delay_ms" in r:
             route.delay(float(r["delay_ms"]) / 1000.0)
+        if "etag" in r:
+            route.etag(r["etag"])
 
         if "sequence" in r:
             steps = []
@@ -89,6 +114,8 @@ def build_routes(data: Dict[str, Any]) -> List[Route]:
                     s.status(int(step_data["status"]))
                 if "body" in step_data:
                     s.body(step_data["body"])
+                if "body_file" in step_data:
+                    s.body_file(_resolve(step_data["body_file"], base_dir))
                 if "headers" in step_data:
                     h = step_data["headers"]
                     s.headers(list(h.items()) if isinstance(h, dict) else h)
@@ -99,3 +126,7 @@ def build_routes(data: Dict[str, Any]) -> List[Route]:
 
         routes.append(route)
     return routes
+
+
+def _resolve(path: str, base_dir: Optional[str]) -> str:
+    return os.path.join(base_dir, path) if base_dir else path
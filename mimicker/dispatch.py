@@ -0,0 +1,140 @@
+import json
+import logging
+from typing import Dict
+
+from mimicker.admin import ADMIN_ENDPOINTS, QUIET_PATHS
+from mimicker.logger import get_logger
+from mimicker.request import Request
+from mimicker.files import FileBody
+from mimicker.response import (Response, encode_body, file_response, prepare,
+                               response_headers, stream_response)
+from mimicker.stream import as_stream
+from mimicker.stub_group import Stub, StubGroup
+
+logger = get_logger()
+
+
+def dispatch(stub_group: StubGroup, request: Request) -> Response:
+    """
+    Resolve a request against the stub group and the admin endpoints.
+
+    Args:
+        stub_group (StubGroup): The stubs to match against.
+        request (Request): The incoming request.
+
+    Returns:
+        Response: The response to write, and the delay to apply before writing it.
+    """
+    method = request.method
+    endpoint = ADMIN_ENDPOINTS.get(request.target)
+    if endpoint is not None and not stub_group.overrides_admin(method, request.target):
+        # Built-in endpoints skip stub matching; health probes skip the log too.
+        request.quiet = request.target in QUIET_PATHS
+        if not request.quiet:
+            log_incoming_request(request)
+        return endpoint(stub_group)
+
+    log_incoming_request(request)
+
+    matched_stub, path_params = stub_group.match_request(request)
+
+    if matched_stub:
+        return _stub_response(stub_group, matched_stub, request, path_params)
+
+    endpoint = ADMIN_ENDPOINTS.get(request.path)
+    if endpoint is not None:
+        # User stubs take precedence; admin handler is the fallback.
+        return endpoint(stub_group)
+
+    logger.warning("No match for %s %s. Returning 404.", method, request.target)
+    logger.info("Responded with 404 for %s request to %s", method, request.target)
+    return Response(404, [])
+
+
+def log_incoming_request(request: Request):
+    # Reading the lazy headers and body costs; skip it when nobody reads it.
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    if logger.isEnabledFor(logging.DEBUG):
+        body = request.body
+        body_text = _JSONText(body, "\nBody:\n") if body else ""
+    else:
+        # Reading and parsing the body just to log it would undo the lazy
+        # body for stubs that never look at it; the declared size is enough.
+        length = request.headers.get("content-length")
+        body_text = f"\nBody: <{length} bytes>" if length and length != "0" else ""
+    # The JSON is rendered when the record is written, on the log thread.
+    logger.info(
+        "→ %s %s\nHeaders:\n%s%s",
+        request.method,
+        request.target,
+        _JSONText(dict(request.headers)),
+        body_text
+    )
+
+
+class _JSONText:
+    """Formats a value as indented JSON only when converted to str."""
+    __slots__ = ("value", "prefix")
+
+    def __init__(self, value, prefix: str = ""):
+        self.value = value
+        self.prefix = prefix
+
+    def __str__(self) -> str:
+        return self.prefix + json.dumps(self.value, indent=2, default=_describe_binary)
+
+
+def _describe_binary(value) -> str:
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return "<spooled upload>"
+
+
+def _stub_response(stub_group: StubGroup, matched_stub: Stub, request: Request,
+                   path_params: Dict[str, str]) -> Response:
+    if matched_stub.rate_limit:
+        key_header_val = request.headers.get(
+            matched_stub.rate_limit.key_header.lower()
+        ) if matched_stub.rate_limit.key_header else ""
+        tracker_key = f"{request.method}:{request.path}:{key_header_val}"
+        allowed, remaining, reset_time = stub_group.rate_limiter.is_allowed(
+            tracker_key,
+            matched_stub.rate_limit.max_requests,
+            matched_stub.rate_limit.window_seconds,
+        )
+        if not allowed:
+            if request.stub_slot is not None:
+                stub_group.tracker.count_rate_limited(request.stub_slot)
+            rl = matched_stub.rate_limit
+            return Response(rl.status_code, list(rl.headers or []),
+                            encode_body(rl.body, path_params))
+
+    status_code, delay, response, response_func, headers, _, sequence = matched_stub
+    etag = stub_group.etag_enabled(matched_stub)
+
+    if sequence:
+        seq_step = sequence.next_step()
+        template = stub_group.template(seq_step) or prepare(
+            seq_step._status, seq_step._body, seq_step._headers, seq_step._delay,
+            etag=etag, param_names=path_params)
+    elif response_func:
+        status_code, response = response_func(payload=request.body,
+                                              headers=request.headers,
+                                              params=path_params,
+                                              query_params=request.query_params)
+        if isinstance(response, FileBody):
+            return file_response(status_code,
+                                 response_headers(headers, response.content_type),
+                                 response, delay or 0., request, etag)
+        body_stream = as_stream(response)
+        if body_stream is not None:
+            return stream_response(status_code, response_headers(headers),
+                                   body_stream, delay or 0.)
+        return Response(status_code, response_headers(headers),
+                        encode_body(response, path_params), delay or 0.)
+    else:
+        template = stub_group.template(matched_stub) or prepare(
+            status_code, response, headers, delay, etag=etag, param_names=path_params)
+
+    return template.render(path_params, request)
@@ -3,3 +3,10 @@ class TemplateError(Exception):
     Exception raised when a path template is invalid.
     """
     pass
+
+
+class BodyTooLarge(Exception):
+    """
+    Exception raised when a request body exceeds the server's max_body_size.
+    """
+    pass
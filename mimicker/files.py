@@ -0,0 +1,145 @@
+import mimetypes
+import mmap
+import os
+import socket
+from email.utils import formatdate
+from typing import IO, NamedTuple, Optional, Tuple
+
+# Files up to this size are read and sent with the headers in one write;
+# larger ones go through sendfile.
+INLINE_FILE_SIZE = 64 * 1024
+
+
+class FileInfo(NamedTuple):
+    size: int
+    etag: str
+    last_modified: str
+    modified_at: float
+
+
+class FileRange:
+    """The open file and byte range a response body is sent from."""
+    __slots__ = ("file", "offset", "length")
+
+    def __init__(self, file: IO[bytes], offset: int, length: int):
+        self.file = file
+        self.offset = offset
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    def read(self) -> bytes:
+        self.file.seek(self.offset)
+        return self.file.read(self.length)
+
+    def close(self):
+        self.file.close()
+
+
+class FileBody:
+    """
+    A response body served from a file on disk.
+
+    The file is opened per response and sent with sendfile where the platform
+    has it, so its content never passes through Python. ETag and
+    Last-Modified are derived from the file's metadata and kept until the
+    file changes.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._info: Optional[Tuple[Tuple[int, int, int], FileInfo]] = None
+
+    @property
+    def content_type(self) -> str:
+        guessed, _ = mimetypes.guess_type(self.path)
+        return guessed or "application/octet-stream"
+
+    def open(self) -> Tuple[IO[bytes], FileInfo]:
+        """
+        Opens the file.
+
+        Returns:
+            Tuple[IO[bytes], FileInfo]: The file, open for binary reading, and
+            its size and validators as of the moment it was opened.
+        """
+        file = open(self.path, "rb")
+        try:
+            return file, self._file_info(os.fstat(file.fileno()))
+        except BaseException:
+            file.close()
+            raise
+
+    def _file_info(self, stat: os.stat_result) -> FileInfo:
+        key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        cached = self._info
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        info = FileInfo(stat.st_size,
+                        f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+                        formatdate(stat.st_mtime, usegmt=True),
+                        stat.st_mtime)
+        self._info = (key, info)
+        return info
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a Range header against a file size.
+
+    Only single byte ranges are honoured; anything else is ignored, which
+    RFC 9110 §14.2 allows, and the whole file is sent.
+
+    Returns:
+        Optional[Tuple[int, int]]: The offset and length to send, or None for
+        the whole file.
+
+    Raises:
+        RangeNotSatisfiable: If the range lies entirely past the end of the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start = max(size - suffix, 0)
+            end = size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or (last and end < start):
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = min(end, size - 1)
+    return start, end - start + 1
+
+
+def send_file(sock: socket.socket, body: FileRange):
+    """
+    Write a file range to a socket without copying it through Python:
+    sendfile where the platform has it, otherwise from a read-only mmap.
+    """
+    if body.length == 0:
+        return
+    if hasattr(os, "sendfile"):
+        sock.sendfile(body.file, body.offset, body.length)
+        return
+    with mmap.mmap(body.file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with memoryview(mapped) as view:
+            with view[body.offset:body.offset + body.length] as part:
+                sock.sendall(part)
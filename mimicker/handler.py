@@ -1,26 +1,130 @@
 import http.server
-import json
-from time import sleep
-from typing import Any, Dict, List, Optional, Tuple
-from urllib.parse import parse_qs, urlparse
+import time
+from functools import partial
+from http import HTTPStatus
+from typing import Callable, Iterator, Optional, Tuple
 
+from mimicker.dispatch import dispatch
+from mimicker.exceptions import BodyTooLarge
+from mimicker.files import INLINE_FILE_SIZE, send_file
+from mimicker.http_parser import (MAX_LINE_LENGTH, HTTPParseError, parse_request_line,
+                                  read_headers, wants_keep_alive)
 from mimicker.logger import get_logger
-from mimicker.stub_group import Stub, StubGroup
-
-_HEALTH_PATH = "/__mimicker__/health"
-_REPORT_PATH = "/__mimicker__/report"
-_ADMIN_PREFIX = "/__mimicker__/"
+from mimicker.request import BodyBuffer, RawBody, Request
+from mimicker.response import Response, render, stream_frames
+from mimicker.stub_group import StubGroup
 
 
 class MimickerHandler(http.server.SimpleHTTPRequestHandler):
     logger = get_logger()
+    protocol_version = "HTTP/1.1"
+    # Set when the connection is handed back to the server before it is done
+    # (parked while idle, or waiting on a delayed response); the server runs it
+    # once this thread has let go of the connection.
+    continuation: Optional[Callable[[], None]] = None
+    # The client sent "Expect: 100-continue" and is waiting before sending the body.
+    expecting_continue = False
+    # The current request is left out of the access log (see Request.quiet).
+    quiet = False
+    # The matched stub's path template and tracker slot, when the request was
+    # read and when its response was ready, for the access log and the stub's
+    # timings.
+    route: Optional[str] = None
+    stub_slot: Optional[int] = None
+    started = 0.
+    dispatched = 0.
+    sending = 0.
+    # A streamed response waiting out its chunk_delay: the response, its
+    # remaining frames, the bytes written so far and the next frame to write.
+    streaming: Optional[Tuple[Response, Iterator[bytes], int, bytes]] = None
 
     def __init__(self, stub_matcher: StubGroup, *args, **kwargs):
         self.stub_matcher = stub_matcher
         super().__init__(*args, **kwargs)
 
+    def setup(self):
+        self.timeout = self.server.keep_alive_timeout
+        self.disable_nagle_algorithm = self.server.socket_options.nodelay
+        super().setup()
+
+    def parse_request(self):
+        # Replaces BaseHTTPRequestHandler's parsing, which goes through
+        # email.parser, with the shared parser.
+        self.expecting_continue = False
+        self.quiet = False
+        self.route = None
+        self.stub_slot = None
+        self.started = time.perf_counter()
+        self.command = None
+        self.request_version = self.default_request_version
+        self.close_connection = True
+        # Tolerate stray CRLFs between pipelined requests (RFC 9112 §2.2).
+        while self.raw_requestline in (b"\r\n", b"\n"):
+            self.raw_requestline = self.rfile.readline(MAX_LINE_LENGTH + 1)
+        if not self.raw_requestline:
+            return False
+        self.requestline = str(self.raw_requestline, "latin-1").rstrip("\r\n")
+        try:
+            self.command, self.path, self.request_version = \
+                parse_request_line(self.raw_requestline)
+            self.headers = read_headers(self.rfile)
+        except HTTPParseError as e:
+            self.send_error(e.status, str(e))
+            return False
+        if self.path.startswith("//"):
+            self.path = "/" + self.path.lstrip("/")
+        self.close_connection = not wants_keep_alive(self.request_version, self.headers)
+        if self.request_version == "HTTP/1.1" and \
+                self.headers.get("expect", "").lower() == "100-continue":
+            return self.handle_expect_100()
+        return True
+
+    def handle_expect_100(self):
+        # Defer "100 Continue" until something actually reads the body.
+        self.expecting_continue = True
+        return True
+
+    def handle(self):
+        self.close_connection = True
+        self.handle_one_request()
+        self._serve_keep_alive()
+
+    def resume(self, response: Optional[Response] = None):
+        """
+        Continues serving a connection the server handed back.
+
+        Args:
+            response (Optional[Response]): A delayed response that is now due.
+                Without one, the connection is a parked keep-alive connection
+                that has become readable.
+        """
+        self.continuation = None
+        try:
+            if self.streaming is not None:
+                self._continue_stream()
+                self._serve_keep_alive()
+            elif response is None:
+                self.handle()
+            else:
+                self._send(response)
+                self._serve_keep_alive()
+        finally:
+            self.finish()
+
+    def finish(self):
+        if self.continuation is None:
+            super().finish()
+
+    def _serve_keep_alive(self):
+        while not self.close_connection and self.continuation is None:
+            if self.server.parks_idle_connections and not self._input_pending():
+                # Release the worker until the client sends its next request.
+                self.continuation = partial(self.server.park, self)
+                return
+            self.handle_one_request()
+
     def log_message(self, format, *args):
-        self.logger.info(format % args)
+        self.logger.info(format, *args)
 
     def do_GET(self):
         self._handle_request("GET")
@@ -38,133 +142,223 @@ class MimickerHandler(http.server.SimpleHTTPRequestHandler):
         self._handle_request("PATCH")
 
     def _handle_request(self, method: str):
-        parsed = urlparse(self.path)
-        clean_path = parsed.path
-
-        request_headers = {key.lower(): value for key, value in self.headers.items()}
-        request_body = self._get_request_body()
-
-        self.log_incoming_request(method, request_body, request_headers)
-
-        matched_stub, path_params = self.stub_matcher.match(
-            method, self.path, request_headers=request_headers
-        )
-
-        if matched_stub:
-            self._send_response(matched_stub, method, path_params,
-                                parse_qs(parsed.query), request_body,
-                                request_headers)
-        elif clean_path == _HEALTH_PATH:
-            # User stubs take precedence; admin handler is the fallback.
-            self._send_admin_json({"status": "up"})
-        elif clean_path == _REPORT_PATH:
-            self._send_admin_json(self.stub_matcher.tracker.report())
-        else:
-            self.logger.warning("No match for %s %s. Returning 404.", method, self.path)
-            self._send_404_response(method)
-
-    def log_incoming_request(self, method, request_body, request_headers):
-        headers_str = json.dumps(request_headers, indent=2)
-        body_str = json.dumps(request_body, indent=2) if request_body else ""
-        self.logger.info(
-            "→ %s %s\nHeaders:\n%s%s",
-            method,
-            self.path,
-            headers_str,
-            f"\nBody:\n{body_str}" if body_str else ""
-        )
-
-    def _send_admin_json(self, data: dict):
-        body = json.dumps(data).encode("utf-8")
-        self.send_response(200)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _send_response(self, matched_stub: Stub, method: str,
-                       path_params: Dict[str, str],
-                       query_params: Dict[str, List[str]], request_body: Any,
-                       request_headers: Dict[str, str]):
-        if matched_stub.rate_limit:
-            key_header_val = request_headers.get(
-                matched_stub.rate_limit.key_header.lower()
-            ) if matched_stub.rate_limit.key_header else ""
-            tracker_key = f"{method}:{urlparse(self.path).path}:{key_header_val}"
-            allowed, remaining, reset_time = self.stub_matcher.rate_limiter.is_allowed(
-                tracker_key,
-                matched_stub.rate_limit.max_requests,
-                matched_stub.rate_limit.window_seconds,
-            )
-            if not allowed:
-                rl = matched_stub.rate_limit
-                self.send_response(rl.status_code)
-                if rl.headers:
-                    for header_name, header_value in rl.headers:
-                        self.send_header(header_name, header_value)
-                self.end_headers()
-                self._write_response(rl.body, path_params)
-                return
+        # Finished by _send(), possibly on another thread after a delay.
+        self.stub_matcher.tracker.request_started()
+        length = self._content_length()
+        if length is None:
+            # The body can't be delimited, so the connection can't be reused.
+            self._refuse_body(HTTPStatus.BAD_REQUEST)
+            return
+        max_body_size = self.server.max_body_size
+        if max_body_size is not None and length > max_body_size:
+            self._refuse_body()
+            return
+
+        request = Request(method, self.path, self.headers, self._read_body)
+        try:
+            response = dispatch(self.stub_matcher, request)
+            if not request.body_read:
+                # Nothing needed the body; skip past it without buffering it.
+                self._read_body(keep=False)
+            self.dispatched = time.perf_counter()
+        except BodyTooLarge:
+            self._refuse_body()
+            return
+        except Exception:
+            self.logger.exception("Error handling %s %s", method, self.path)
+            self.close_connection = True
+            self._send(Response(HTTPStatus.INTERNAL_SERVER_ERROR, []))
+            return
+        except BaseException:
+            self.stub_matcher.tracker.request_finished()
+            raise
+        finally:
+            request.close()
+
+        self.quiet = request.quiet
+        self.route = request.route
+        self.stub_slot = request.stub_slot
+        if response.delay > 0:
+            # Let go of the thread while the delay elapses.
+            self.continuation = partial(self.server.delay_response, self,
+                                        response.delay, response)
+            return
+        self._send(response)
+
+    def _refuse_body(self, status: HTTPStatus = HTTPStatus.REQUEST_ENTITY_TOO_LARGE):
+        self.close_connection = True
+        self._send(Response(status, []))
 
-        status_code, delay, response, response_func, headers, _, sequence = matched_stub
-
-        if sequence:
-            seq_step = sequence.next_step()
-            status_code = seq_step._status
-            response = seq_step._body
-            headers = seq_step._headers
-            delay = seq_step._delay
-
-        if delay > 0:
-            sleep(delay)
-        if response_func and not sequence:
-            status_code, response = response_func(payload=request_body,
-                                                  headers=request_headers,
-                                                  params=path_params,
-                                                  query_params=query_params)
-
-        self.send_response(status_code)
-        self._set_headers(headers)
-
-        self.end_headers()
-        self._write_response(response, path_params)
-
-    def _set_headers(self, headers: Optional[List[Tuple[str, str]]]):
-        if headers:
-            for header_name, header_value in headers:
-                self.send_header(header_name, header_value)
-            if not any(header[0].lower() == 'content-type' for header in headers):
-                self.send_header('Content-Type', 'application/json')
-        else:
-            self.send_header('Content-Type', 'application/json')
-
-    def _write_response(self, response: Any, path_params: Dict[str, str]):
-        if isinstance(response, dict):
-            response = self._format_response(response, path_params)
-            self.wfile.write(json.dumps(response).encode('utf-8'))
-        elif isinstance(response, str):
-            self.wfile.write(response.encode('utf-8'))
-        elif response is None:
-            pass
-        else:
-            self.wfile.write(str(response).encode('utf-8'))
-
-    def _send_404_response(self, method: str):
-        self.send_response(404)
-        self.end_headers()
-        self.log_message("Responded with 404 for %s request to %s", method, self.path)
-
-    @staticmethod
-    def _format_response(response: dict, path_params: dict):
-        return {k: (v.format(**path_params) if isinstance(v, str) else v)
-                for k, v in response.items()}
-
-    def _get_request_body(self) -> Optional[dict]:
-        content_length = self.headers.get('content-length')
-        if content_length:
+    def _send(self, response: Response):
+        self.sending = time.perf_counter()
+        if not self.quiet:
+            self.log_request(response.status)
+        try:
+            if response.streamed:
+                sent = self._stream(response)
+            elif response.from_file:
+                sent = self._send_file(response)
+            else:
+                data = render(response, self.request_version, not self.close_connection)
+                self.wfile.write(data)
+                sent = len(data)
+        except BaseException:
+            self.stub_matcher.tracker.request_finished()
+            raise
+        if sent is not None:
+            self._sent(response, sent)
+
+    def _sent(self, response: Response, sent: int):
+        """Books a response that has been written in full."""
+        self.stub_matcher.tracker.request_finished()
+        finished = time.perf_counter()
+        if self.stub_slot is not None:
+            self.stub_matcher.tracker.record_response(
+                self.stub_slot, (self.dispatched - self.started) + (finished - self.sending),
+                response.delay, self.sending - self.dispatched, sent)
+        access_log = self.server.access_log
+        if access_log is not None and not self.quiet:
+            access_log.record(self.command, self.path, self.route, response.status,
+                              sent, finished - self.started)
+
+    def _send_file(self, response: Response) -> int:
+        body = response.body
+        try:
+            head = render(response, self.request_version, not self.close_connection)
+            if body.length <= INLINE_FILE_SIZE:
+                self.wfile.write(head + body.read())
+            else:
+                self.wfile.write(head)
+                send_file(self.connection, body)
+        finally:
+            body.close()
+        return len(head) + body.length
+
+    def _stream(self, response: Response) -> Optional[int]:
+        """
+        Writes a streamed response; returns the number of bytes written, or
+        None if the rest of it follows once chunk_delay has passed.
+        """
+        if self.request_version == "HTTP/1.0":
+            # Without chunked encoding the body ends when the connection does.
+            self.close_connection = True
+        frames = stream_frames(response, self.request_version)
+        try:
+            first = next(frames, b"")
+        except Exception:
+            self.logger.exception("Error streaming response to %s", self.path)
+            self.close_connection = True
+            data = render(Response(HTTPStatus.INTERNAL_SERVER_ERROR, []),
+                          self.request_version, False)
+            self.wfile.write(data)
+            return len(data)
+        # Send the head with the first chunk, in one write.
+        return self._stream_rest(
+            response, frames, 0,
+            render(response, self.request_version, not self.close_connection) + first)
+
+    def _continue_stream(self):
+        response, frames, sent, frame = self.streaming
+        self.streaming = None
+        sent = self._stream_rest(response, frames, sent, frame)
+        if sent is not None:
+            self._sent(response, sent)
+
+    def _stream_rest(self, response: Response, frames: Iterator[bytes], sent: int,
+                     pending: bytes) -> Optional[int]:
+        """
+        Writes pending and the frames after it; returns the bytes written in
+        all, or None if the next frame is waiting out chunk_delay.
+        """
+        try:
+            self.wfile.write(pending)
+            sent += len(pending)
+            for frame in frames:
+                if response.chunk_delay > 0:
+                    # Let go of the thread while the delay elapses.
+                    self.streaming = (response, frames, sent, frame)
+                    self.continuation = partial(self.server.resume_later, self,
+                                                response.chunk_delay)
+                    return None
+                self.wfile.write(frame)
+                sent += len(frame)
+        except Exception:
+            # The status is already sent; all that's left is to cut the body short.
+            self.logger.exception("Error streaming response to %s", self.path)
+            self.close_connection = True
+        frames.close()
+        return sent
+
+    def _input_pending(self) -> bool:
+        """
+        Returns True if the next request is already buffered or readable,
+        without blocking.
+        """
+        timeout = self.connection.gettimeout()
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(timeout)
+
+    def _content_length(self) -> Optional[int]:
+        """The declared body length, or None if it is not a non-negative integer."""
+        try:
+            length = int(self.headers.get("content-length", 0))
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def _read_body(self, keep: bool = True) -> RawBody:
+        if self.expecting_continue:
+            self.expecting_continue = False
+            if not keep:
+                # The client is still holding the body back; rather than ask for
+                # it only to throw it away, end the connection after responding.
+                self.close_connection = True
+                return b""
+            self.send_response_only(HTTPStatus.CONTINUE)
+            self.end_headers()
+
+        server = self.server
+        buffer = BodyBuffer(server.spool_threshold, server.max_body_size, keep=keep)
+        if "chunked" in self.headers.get("transfer-encoding", "").lower():
+            self._read_chunked(buffer)
+            return buffer.getvalue()
+        if self.headers.get('content-length'):
+            length = self._content_length()
+            if length is None:
+                # The body can't be delimited, so the connection can't be reused.
+                self.close_connection = True
+                return b""
+            if keep and length <= server.spool_threshold:
+                return self.rfile.read(length)
+            self._read_exact(length, buffer)
+            return buffer.getvalue()
+        return b""
+
+    def _read_exact(self, length: int, buffer: BodyBuffer):
+        while length > 0:
+            chunk = self.rfile.read(min(length, 65536))
+            if not chunk:
+                break
+            buffer.write(chunk)
+            length -= len(chunk)
+
+    def _read_chunked(self, buffer: BodyBuffer):
+        while True:
+            size_line = self.rfile.readline(65537)
             try:
-                length = int(content_length)
-                body = self.rfile.read(length).decode('utf-8')
-                return json.loads(body) if body else None
-            except (ValueError, json.JSONDecodeError):
-                return None
-        return None
+                size = int(size_line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                self.close_connection = True
+                return
+            if size == 0:
+                # Discard trailers up to the terminating blank line.
+                while self.rfile.readline(65537) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            self._read_exact(size, buffer)
+            self.rfile.readline(65537)
@@ -0,0 +1,103 @@
+from array import array
+from math import ceil
+from typing import Dict, List
+
+# Each power of two is split into 2**SUB_BUCKET_BITS buckets, so a recorded
+# value is known to within 1/8th of itself, whatever its magnitude.
+SUB_BUCKET_BITS = 3
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+# Enough buckets for any value below 2**63.
+MAX_BUCKETS = (64 - SUB_BUCKET_BITS) * _SUB_BUCKETS
+_LARGEST = (1 << 63) - 1
+
+
+def bucket_index(value: int) -> int:
+    if value < _SUB_BUCKETS:
+        return max(value, 0)
+    if value > _LARGEST:
+        value = _LARGEST
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * _SUB_BUCKETS + (value >> shift) - _SUB_BUCKETS
+
+
+def bucket_upper_bound(index: int) -> int:
+    """The largest value that falls in a bucket."""
+    if index < _SUB_BUCKETS:
+        return index
+    shift = index // _SUB_BUCKETS - 1
+    top = index % _SUB_BUCKETS + _SUB_BUCKETS
+    return ((top + 1) << shift) - 1
+
+
+class Histogram:
+    """
+    Counts of non-negative integers in logarithmic buckets, in the style of
+    HdrHistogram.
+
+    Recording is O(1). Memory is one counter per bucket up to the largest
+    value seen, and never more than MAX_BUCKETS counters. Not thread-safe;
+    callers serialize record() themselves.
+    """
+    __slots__ = ("counts", "total", "sum", "max")
+
+    def __init__(self):
+        self.counts = array("q")
+        self.total = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, value: int):
+        index = bucket_index(value)
+        counts = self.counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.total += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> int:
+        """
+        The value at or below which fraction of the recorded values fall,
+        rounded up to the end of its bucket (and never above the maximum).
+        """
+        if not self.total:
+            return 0
+        rank = max(1, ceil(fraction * self.total))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_upper_bound(index), self.max)
+        return self.max
+
+    def merge(self, other: "Histogram"):
+        counts = self.counts
+        if len(other.counts) > len(counts):
+            counts.extend([0] * (len(other.counts) - len(counts)))
+        for index, count in enumerate(other.counts):
+            counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def summary(self, scale: float = 1.) -> Dict[str, float]:
+        """p50, p90, p99 and max, each multiplied by scale."""
+        return {
+            "p50": round(self.percentile(.5) * scale, 3),
+            "p90": round(self.percentile(.9) * scale, 3),
+            "p99": round(self.percentile(.99) * scale, 3),
+            "max": round(self.max * scale, 3),
+        }
+
+    def to_list(self) -> List[int]:
+        """The histogram as plain data: total, sum, max, then the bucket counts."""
+        return [self.total, self.sum, self.max, *self.counts]
+
+    @classmethod
+    def from_list(cls, data: List[int]) -> "Histogram":
+        histogram = cls()
+        histogram.total, histogram.sum, histogram.max = data[0], data[1], data[2]
+        histogram.counts.extend(data[3:])
+        return histogram
@@ -0,0 +1,143 @@
+from http import HTTPStatus
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+# Limits on the request head, shared by every engine.
+MAX_LINE_LENGTH = 65536
+MAX_HEADERS = 100
+
+_BLANK_LINES = (b"\r\n", b"\n", b"")
+
+
+class HTTPParseError(Exception):
+    """
+    Raised when a request on the wire cannot be parsed.
+    """
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Headers(Dict[str, str]):
+    """
+    Request headers keyed by lowercased name.
+
+    A field sent more than once reads as one comma-separated value, as
+    RFC 9110 §5.3 allows; get_all() returns the values one by one.
+    """
+    __slots__ = ("_repeated",)
+
+    def __init__(self):
+        super().__init__()
+        self._repeated: Optional[Dict[str, List[str]]] = None
+
+    def add(self, name: str, value: str):
+        """Adds a field; name must already be lowercased."""
+        existing = self.get(name)
+        if existing is None:
+            self[name] = value
+            return
+        if self._repeated is None:
+            self._repeated = {}
+        self._repeated.setdefault(name, [existing]).append(value)
+        self[name] = f"{existing}, {value}"
+
+    def get_all(self, name: str) -> List[str]:
+        name = name.lower()
+        if self._repeated is not None and name in self._repeated:
+            return list(self._repeated[name])
+        value = self.get(name)
+        return [] if value is None else [value]
+
+
+def parse_request_line(line: bytes) -> Tuple[str, str, str]:
+    """
+    Splits a request line into method, target and version.
+
+    Raises:
+        HTTPParseError: 400 if the line is malformed, 505 for a version other
+            than HTTP/1.x.
+    """
+    parts = line.split()
+    if len(parts) != 3 or not parts[2].startswith(b"HTTP/"):
+        raise HTTPParseError(HTTPStatus.BAD_REQUEST, f"malformed request line {line!r}")
+    method, target, version = (part.decode("latin-1") for part in parts)
+    if version not in ("HTTP/1.1", "HTTP/1.0"):
+        major, dot, minor = version[5:].partition(".")
+        if not (dot and major.isdigit() and minor.isdigit()):
+            raise HTTPParseError(HTTPStatus.BAD_REQUEST, f"invalid version {version!r}")
+        if major != "1":
+            raise HTTPParseError(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED,
+                                 f"unsupported version {version!r}")
+    return method, target, version
+
+
+def parse_headers(lines: Iterable[bytes], max_headers: int = MAX_HEADERS) -> Headers:
+    """
+    Parses header field lines, without the blank line that ends them.
+
+    Raises:
+        HTTPParseError: 431 past max_headers lines, 400 for a malformed line.
+            Folded lines (obsolete since RFC 7230) and whitespace before the
+            colon are refused, as RFC 9112 §5 requires of a server.
+    """
+    headers = Headers()
+    for count, line in enumerate(lines):
+        if count >= max_headers:
+            raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 "too many headers")
+        name, sep, value = line.decode("latin-1").partition(":")
+        if not sep or not name or name[0] in " \t" or name[-1] in " \t":
+            raise HTTPParseError(HTTPStatus.BAD_REQUEST, f"malformed header line {line!r}")
+        headers.add(name.lower(), value.strip(" \t\r\n"))
+    return headers
+
+
+def read_headers(rfile: IO[bytes], max_line_length: int = MAX_LINE_LENGTH,
+                 max_headers: int = MAX_HEADERS) -> Headers:
+    """
+    Reads and parses the header block from a buffered binary stream, such as
+    a socket's makefile("rb").
+
+    When the whole block is already buffered, as it almost always is, it is
+    taken in one read and split in place, rather than line by line.
+
+    Raises:
+        HTTPParseError: As parse_headers, and 431 for a line longer than
+            max_line_length.
+    """
+    peek = getattr(rfile, "peek", None)
+    if peek is not None:
+        buffered = peek(max_line_length)
+        if buffered[:2] == b"\r\n":
+            rfile.read(2)
+            return Headers()
+        end = buffered.find(b"\r\n\r\n")
+        # A bare LF before it may end the block earlier ("\n\n"), leaving the
+        # rest to a pipelined request; such blocks are read line by line.
+        if end != -1 and buffered.count(b"\n", 0, end) == buffered.count(b"\r\n", 0, end):
+            lines = rfile.read(end + 4)[:end].split(b"\n")
+            if max(map(len, lines)) > max_line_length:
+                raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                     "header line too long")
+            return parse_headers(lines, max_headers)
+
+    lines = []
+    while True:
+        line = rfile.readline(max_line_length + 1)
+        if len(line) > max_line_length:
+            raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 "header line too long")
+        if line in _BLANK_LINES:
+            return parse_headers(lines, max_headers)
+        if len(lines) >= max_headers:
+            raise HTTPParseError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 "too many headers")
+        lines.append(line)
+
+
+def wants_keep_alive(version: str, headers: Dict[str, str]) -> bool:
+    """Whether the connection stays open after this request's response."""
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        return "close" not in connection
+    return "keep-alive" in connection
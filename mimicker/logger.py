@@ -1,13 +1,30 @@
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from colorlog import ColoredFormatter
 
 _logger: logging.Logger | None = None
+_listener: QueueListener | None = None
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread as they are.
+
+    QueueHandler.prepare() formats each record on the calling thread so it can
+    be pickled to another process. The listener here runs in the same process,
+    so the message is left to be formatted when the record is written, off the
+    request thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
 
 def configure_logger() -> logging.Logger:
-    global _logger
+    global _logger, _listener
     if _logger is not None:
         return _logger
 
@@ -27,12 +44,45 @@ def configure_logger() -> logging.Logger:
         }
     )
     handler.setFormatter(formatter)
-    _logger.addHandler(handler)
+    # Request threads only enqueue; a listener thread does the terminal writes.
+    queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+    queue_handler.setFormatter(formatter)
+    _listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_restart_listener)
+    _logger.addHandler(queue_handler)
     _logger.setLevel(set_log_level())
 
     return _logger
 
 
+def flush_logs():
+    """Blocks until every record logged so far has been written."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _restart_listener():
+    # The listener thread doesn't survive fork(); give the child its own.
+    global _listener
+    if _listener is None:
+        return
+    for handler in _logger.handlers:
+        if isinstance(handler, _DeferredQueueHandler):
+            handler.queue = queue.SimpleQueue()
+            _listener = QueueListener(handler.queue, *_listener.handlers,
+                                      respect_handler_level=True)
+            _listener.start()
+
+
 def set_log_level():
     log_level_str = os.getenv("MIMICKER_LOG_LEVEL", "INFO").upper()
     return getattr(logging, log_level_str, logging.INFO)
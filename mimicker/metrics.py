@@ -0,0 +1,111 @@
+from typing import TYPE_CHECKING, List
+
+from mimicker.histogram import MAX_BUCKETS, Histogram, bucket_upper_bound
+
+if TYPE_CHECKING:
+    from mimicker.stub_group import StubGroup
+
+# Prometheus text exposition format.
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, of the buckets latency histograms are exposed with.
+LATENCY_BUCKETS = (.0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5,
+                   1, 2.5, 5, 10)
+_LE = [f"{bound:g}" for bound in LATENCY_BUCKETS] + ["+Inf"]
+
+
+def _exposed_bucket(index: int) -> int:
+    # Histograms record microseconds; a bucket is exposed under the first
+    # bound its values can't exceed.
+    upper = bucket_upper_bound(index)
+    for exposed, bound in enumerate(LATENCY_BUCKETS):
+        if upper <= round(bound * 1e6):
+            return exposed
+    return len(LATENCY_BUCKETS)
+
+
+# Histogram bucket index -> index into _LE, worked out once.
+_EXPOSED = [_exposed_bucket(index) for index in range(MAX_BUCKETS)]
+
+
+def render_metrics(stub_group: "StubGroup") -> bytes:
+    """
+    The server's counters in Prometheus text format.
+
+    Everything is read in place from counters kept up to date as requests are
+    served, so a scrape costs a pass over the stubs and nothing more; the
+    histograms are only copied when those of sibling prefork workers have to
+    be merged in. Counters and histograms include those of sibling prefork
+    workers; gauges are those of the process answering.
+    """
+    peers = stub_group.peer_snapshots() if stub_group.peer_snapshots else ()
+    stubs, unmatched = stub_group.tracker.totals(peers)
+    section = stub_group.report_sections.get("server")
+    server = section() if section else {}
+    labels = [_labels(stub.method, stub.path) for stub in stubs]
+    lines: List[str] = []
+
+    _family(lines, "mimicker_stub_requests_total", "counter",
+            "Requests answered by each stub.")
+    lines.extend(f"mimicker_stub_requests_total{{{label}}} {stub.hit_count}"
+                 for stub, label in zip(stubs, labels))
+
+    _family(lines, "mimicker_unmatched_requests_total", "counter",
+            "Requests that matched no stub.")
+    lines.append(f"mimicker_unmatched_requests_total {unmatched}")
+
+    _family(lines, "mimicker_rate_limited_requests_total", "counter",
+            "Requests refused by a stub's rate limit.")
+    lines.extend(f"mimicker_rate_limited_requests_total{{{label}}} {stub.rate_limited}"
+                 for stub, label in zip(stubs, labels) if stub.rate_limited)
+
+    _family(lines, "mimicker_requests_in_flight", "gauge",
+            "Requests being answered, including those waiting out a delay.")
+    lines.append(f"mimicker_requests_in_flight {stub_group.tracker.in_flight}")
+    if "active_connections" in server:
+        _family(lines, "mimicker_active_connections", "gauge", "Open client connections.")
+        lines.append(f"mimicker_active_connections {server['active_connections']}")
+    if "pending_delays" in server:
+        _family(lines, "mimicker_pending_delays", "gauge",
+                "Delayed responses waiting to be written.")
+        lines.append(f"mimicker_pending_delays {server['pending_delays']}")
+
+    timed = [(stub.timings, label) for stub, label in zip(stubs, labels)
+             if stub.timings is not None]
+    _family(lines, "mimicker_stub_handling_seconds", "histogram",
+            "Time spent reading each request and writing its response, delays excluded.")
+    for timings, label in timed:
+        with timings.locked():
+            _histogram(lines, "mimicker_stub_handling_seconds", label, timings.handling)
+    _family(lines, "mimicker_stub_delay_seconds", "histogram",
+            "Time each response of a delayed stub actually waited before being written.")
+    for timings, label in timed:
+        with timings.locked():
+            if timings.delay.max > 0:
+                _histogram(lines, "mimicker_stub_delay_seconds", label, timings.actual_delay)
+
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _family(lines: List[str], name: str, kind: str, description: str):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: List[str], name: str, label: str, histogram: Histogram):
+    exposed = [0] * len(_LE)
+    for index, count in enumerate(histogram.counts):
+        if count:
+            exposed[_EXPOSED[index]] += count
+    cumulative = 0
+    for le, count in zip(_LE, exposed):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{label},le="{le}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{label}}} {histogram.sum / 1e6}")
+    lines.append(f"{name}_count{{{label}}} {histogram.total}")
+
+
+def _labels(method: str, path: str) -> str:
+    path = path.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'method="{method}",path="{path}"'
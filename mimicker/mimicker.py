@@ -1,3 +1,6 @@
+from typing import Optional
+
+from mimicker.access_log import DEFAULT_MAX_BYTES
 from mimicker.route import Route
 from mimicker.server import MimickerServer
 
@@ -67,15 +70,65 @@ def patch(path: str) -> Route:
     return Route("PATCH", path)
 
 
-def mimicker(port: int = 8080) -> MimickerServer:
+def mimicker(port: int = 8080, engine: Optional[str] = None,
+             threads: Optional[int] = None,
+             match_cache_size: Optional[int] = None,
+             max_body_size: Optional[int] = None,
+             spool_threshold: Optional[int] = None,
+             compress_min_size: Optional[int] = None,
+             backlog: Optional[int] = None,
+             send_buffer: Optional[int] = None,
+             recv_buffer: Optional[int] = None,
+             tcp_nodelay: bool = True,
+             access_log: Optional[str] = None,
+             access_log_sample: float = 1.,
+             access_log_max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+             max_unmatched: Optional[int] = None,
+             unmatched_samples: Optional[int] = None) -> MimickerServer:
     """
     Starts a Mimicker server on the specified port.
 
     Args:
         port (int, optional): The port to run the server on. Defaults to 8080.
+        engine (str, optional): "threaded" or "asyncio". Defaults to the
+            MIMICKER_ENGINE environment variable, or "threaded".
+        threads (int, optional): Size of the threaded engine's worker pool.
+            Defaults to one thread per connection.
+        match_cache_size (int, optional): Cache up to this many match results by
+            method and raw path. Disabled by default.
+        max_body_size (int, optional): Answer requests with a larger body with
+            413 Payload Too Large. Unlimited by default.
+        spool_threshold (int, optional): Buffer request bodies larger than this
+            many bytes in a temporary file. Defaults to 1 MiB.
+        compress_min_size (int, optional): Precompress static bodies of at least
+            this many bytes, served by Accept-Encoding. Disabled by default.
+        backlog (int, optional): Length of the listen() queue.
+        send_buffer (int, optional): SO_SNDBUF for connections, in bytes.
+        recv_buffer (int, optional): SO_RCVBUF for connections, in bytes.
+        tcp_nodelay (bool): Set TCP_NODELAY on connections. Defaults to True.
+        access_log (str, optional): Append one JSON line per request to this
+            file. Defaults to the MIMICKER_ACCESS_LOG environment variable.
+        access_log_sample (float): Fraction of requests to record, in (0, 1].
+        access_log_max_bytes (int, optional): Rotate the access log at this
+            size. Defaults to 100 MiB.
+        max_unmatched (int, optional): Distinct method and path pairs of
+            unmatched requests kept for the report. Defaults to 1000.
+        unmatched_samples (int, optional): Also keep this many of the most
+            recent unmatched requests individually.
 
     Returns:
         MimickerServer: An instance of the running Mimicker server.
     """
-    server = MimickerServer(port).start()
+    server = MimickerServer(port, engine=engine, threads=threads,
+                            match_cache_size=match_cache_size,
+                            max_body_size=max_body_size,
+                            spool_threshold=spool_threshold,
+                            compress_min_size=compress_min_size,
+                            backlog=backlog, send_buffer=send_buffer,
+                            recv_buffer=recv_buffer, tcp_nodelay=tcp_nodelay,
+                            access_log=access_log,
+                            access_log_sample=access_log_sample,
+                            access_log_max_bytes=access_log_max_bytes,
+                            max_unmatched=max_unmatched,
+                            unmatched_samples=unmatched_samples).start()
     return server
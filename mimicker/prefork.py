@@ -0,0 +1,203 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+from typing import Dict, Iterable, List
+
+from mimicker.access_log import worker_path
+from mimicker.logger import flush_logs, get_logger
+from mimicker.route import Route
+from mimicker.server import MimickerServer, register_routes
+from mimicker.stub_group import StubGroup
+from mimicker.tracking import RequestTracker
+
+logger = get_logger()
+
+
+def serve_prefork(port: int, routes: Iterable[Route], workers: int, **options) -> int:
+    """
+    Serves routes from several forked worker processes sharing one port.
+
+    Routes are compiled once in the parent, so every worker inherits the same
+    stub table copy-on-write. Each worker binds its own listening socket with
+    SO_REUSEPORT and the kernel spreads incoming connections across them.
+    /__mimicker__/report served by any worker merges the trackers of all workers.
+    An access log is written per worker, e.g. access.worker-0.log for access.log.
+
+    Args:
+        port (int): The port to listen on. 0 picks a free port shared by all workers.
+        routes (Iterable[Route]): The routes to serve.
+        workers (int): Number of worker processes to fork.
+        **options: Extra MimickerServer arguments (engine, threads).
+
+    Returns:
+        int: 0 once all workers have exited after a shutdown request, 1 if any
+        worker exited on its own with an error.
+
+    Raises:
+        RuntimeError: If the platform lacks fork() or SO_REUSEPORT.
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("--workers requires fork() and SO_REUSEPORT (Linux, macOS, BSD)")
+
+    stub_group = StubGroup()
+    register_routes(stub_group, routes)
+
+    # Holding the port (without listening) resolves port 0 to a concrete port
+    # that every worker can then join.
+    reservation = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    reservation.bind(("", port))
+    port = reservation.getsockname()[1]
+    stats_dir = tempfile.mkdtemp(prefix="mimicker-workers-")
+
+    children: Dict[int, int] = {}
+    for index in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                reservation.close()
+                code = _run_worker(index, port, workers, stub_group, stats_dir, options)
+            finally:
+                # os._exit() skips atexit, which would write out queued logs.
+                flush_logs()
+                os._exit(code)
+        children[pid] = index
+
+    logger.info("Serving on port %d with %d worker processes.", port, workers)
+    stopping = False
+    failed = False
+
+    def _terminate(*_):
+        nonlocal stopping
+        stopping = True
+        for child in list(children):
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    previous_handler = signal.signal(signal.SIGTERM, _terminate)
+    try:
+        while children:
+            try:
+                pid, status = os.wait()
+            except KeyboardInterrupt:
+                _terminate()
+                continue
+            index = children.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            if code != 0 and not stopping:
+                failed = True
+                logger.error("Worker %s (pid %d) exited with status %d", index, pid, code)
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        reservation.close()
+        shutil.rmtree(stats_dir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+def _run_worker(index: int, port: int, workers: int, stub_group: StubGroup,
+                stats_dir: str, options: dict) -> int:
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    stats_path = os.path.join(stats_dir, f"worker-{index}.sock")
+    stats = _StatsListener(stats_path, stub_group.tracker)
+    peers = _PeerSnapshots(stats_dir, stats_path)
+    stub_group.peer_snapshots = peers
+    stub_group.report_sections["workers"] = lambda: {
+        "count": workers, "reporting": peers.reporting,
+    }
+
+    access_log = options.get("access_log") or os.getenv("MIMICKER_ACCESS_LOG")
+    if access_log:
+        # Workers can't share a file they each rotate.
+        options = {**options, "access_log": worker_path(access_log, index)}
+    server = MimickerServer(port, reuse_port=True, stub_group=stub_group, **options)
+    server.start()
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+    stats.close()
+    return 0
+
+
+class _StatsListener:
+    """
+    Answers every connection on a Unix socket with the worker's tracker snapshot.
+    """
+    def __init__(self, path: str, tracker: RequestTracker):
+        self.path = path
+        self.tracker = tracker
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.bind(path)
+        self.socket.listen(16)
+        threading.Thread(target=self._serve, name="mimicker-stats", daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                return
+            with connection:
+                try:
+                    connection.sendall(json.dumps(self.tracker.snapshot()).encode("utf-8"))
+                except OSError:
+                    pass
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.socket.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class _PeerSnapshots:
+    """
+    Collects tracker snapshots from the other workers' stats sockets.
+    """
+    timeout = 1.0
+
+    def __init__(self, stats_dir: str, own_path: str):
+        self.stats_dir = stats_dir
+        self.own_path = own_path
+        self.reporting = 1
+
+    def __call__(self) -> List[dict]:
+        snapshots = []
+        for name in sorted(os.listdir(self.stats_dir)):
+            path = os.path.join(self.stats_dir, name)
+            if path == self.own_path:
+                continue
+            try:
+                snapshots.append(self._fetch(path))
+            except (OSError, ValueError) as e:
+                logger.warning("Could not read stats of worker at %s: %s", path, e)
+        self.reporting = 1 + len(snapshots)
+        return snapshots
+
+    def _fetch(self, path: str) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(path)
+            chunks = []
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        return json.loads(b"".join(chunks))
@@ -1,5 +1,6 @@
 import re
 from re import Pattern
+from typing import List, Optional
 
 from mimicker.exceptions import TemplateError
 
@@ -56,10 +57,13 @@ def _parse_without_query(template: str) -> Pattern:
     Returns:
         Compiled regex Pattern for matching URLs
     """
+    return re.compile(_path_only_regex(template))
+
+
+def _path_only_regex(template: str) -> str:
     path_regex = _build_path_regex(template)
     # Allow any query string (or none) after the path
-    full = rf'^{path_regex}(?:\?.*)?$'
-    return re.compile(full)
+    return rf'^{path_regex}(?:\?.*)?$'
 
 
 def _parse_with_query(template: str) -> Pattern:
@@ -116,13 +120,12 @@ def _build_path_regex(path_t: str) -> str:
     Returns:
         A regex string for matching the path (not compiled)
     """
-    parts = path_t.strip('/').split('/')
+    parts = template_segments(path_t)
     regex_parts = []
     for part in parts:
         # Check if the part is a parameter (e.g., {id})
-        m = re.fullmatch(r'\{(\w+)}', part)
-        if m:
-            name = m.group(1)  # Extract parameter name from inside braces
+        name = segment_param(part)
+        if name:
             regex_parts.append(
                 f'(?P<{name}>[^/?]+)')  # Create named capture group to capture parameter names
         else:
@@ -131,3 +134,31 @@ def _build_path_regex(path_t: str) -> str:
 
     # Preserve leading slash and handle empty path case
     return '/' + '/'.join(regex_parts) if parts and parts[0] else '/'
+
+
+def template_segments(path_t: str) -> List[str]:
+    """
+    Split the path portion of a template into its segments.
+
+    Leading and trailing slashes are ignored, so "/users/{id}/" gives
+    ["users", "{id}"] and "/" gives [""].
+    """
+    return path_t.strip('/').split('/')
+
+
+def segment_param(segment: str) -> Optional[str]:
+    """
+    Return the parameter name of a "{name}" segment, or None for a literal segment.
+    """
+    m = re.fullmatch(r'\{(\w+)}', segment)
+    return m.group(1) if m else None
+
+
+def is_path_template(pattern: Pattern, template: str) -> bool:
+    """
+    Check whether pattern is exactly what parse_endpoint_pattern builds for a
+    template without query parameters, so it can be matched segment by segment.
+    """
+    return bool(template) and '?' not in template \
+        and pattern.flags == re.compile('').flags \
+        and pattern.pattern == _path_only_regex(template)
@@ -0,0 +1,222 @@
+import json
+import tempfile
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import ParseResult, parse_qs, urlparse
+
+from mimicker.exceptions import BodyTooLarge
+from mimicker.http_parser import Headers
+
+# Bodies larger than this are spooled to a temporary file instead of memory.
+DEFAULT_SPOOL_THRESHOLD = 1 << 20
+
+_UNSET: Any = object()
+
+RawBody = Union[bytes, IO[bytes]]
+
+
+class BodyBuffer:
+    """
+    Collects a request body chunk by chunk.
+
+    The body stays in memory while it is small and moves to a
+    SpooledTemporaryFile once it grows past spool_threshold, so memory use is
+    bounded whatever the upload size. With keep=False chunks are only counted.
+    """
+    def __init__(self, spool_threshold: int = DEFAULT_SPOOL_THRESHOLD,
+                 max_size: Optional[int] = None, keep: bool = True):
+        self.spool_threshold = spool_threshold
+        self.max_size = max_size
+        self.keep = keep
+        self.size = 0
+        self._chunks: List[bytes] = []
+        self._file: Optional[IO[bytes]] = None
+
+    def write(self, data: bytes):
+        """
+        Raises:
+            BodyTooLarge: If the body grows past max_size.
+        """
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            self.close()
+            raise BodyTooLarge(f"request body exceeds {self.max_size} bytes")
+        if not self.keep:
+            return
+        if self._file is None and self.size > self.spool_threshold:
+            # SpooledTemporaryFile takes max_size=0 as "no limit", so a zero
+            # threshold goes straight to disk.
+            self._file = tempfile.SpooledTemporaryFile(max_size=self.spool_threshold) \
+                if self.spool_threshold > 0 else tempfile.TemporaryFile()
+            for chunk in self._chunks:
+                self._file.write(chunk)
+            self._chunks = []
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._chunks.append(data)
+
+    def getvalue(self) -> RawBody:
+        """The collected body: bytes, or a file rewound to its start once spooled."""
+        if self._file is not None:
+            self._file.seek(0)
+            return self._file
+        return b"".join(self._chunks)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class Request:
+    """
+    One incoming request, shared by every stage of dispatch.
+
+    Derived views (path, query parameters, lowercased headers, the body and its
+    parsed form) are computed the first time something reads them and then kept,
+    so each is built at most once per request, and not at all if nothing needs it.
+    """
+    __slots__ = ("method", "target", "quiet", "route", "stub_slot", "_raw_body",
+                 "_raw_headers", "_url", "_query_params", "_headers", "_body")
+
+    def __init__(self, method: str, target: str, headers: Mapping[str, str],
+                 raw_body: Union[RawBody, Callable[[], RawBody]] = b""):
+        """
+        Args:
+            method (str): The HTTP method.
+            target (str): The raw request target, including any query string.
+            headers (Mapping[str, str]): The request headers, in any case;
+                Headers from the parser are used as they are.
+            raw_body (Union[RawBody, Callable[[], RawBody]]): The request body
+                (bytes, or a file for spooled uploads), or a function that reads
+                it from the connection when first needed.
+        """
+        self.method = method
+        self.target = target
+        # Set by dispatch for requests the engines leave out of the access log.
+        self.quiet = False
+        # The path template of the stub that matched, once one has.
+        self.route: Optional[str] = None
+        # Its slot in the tracker, for RequestTracker.record_response().
+        self.stub_slot: Optional[int] = None
+        self._raw_body = raw_body
+        self._raw_headers = headers
+        self._url: Optional[ParseResult] = None
+        self._query_params: Optional[Dict[str, List[str]]] = None
+        self._headers: Optional[Dict[str, str]] = None
+        self._body: Any = _UNSET
+
+    @property
+    def path(self) -> str:
+        """The target's path, without the query string."""
+        return self._parsed_url().path
+
+    @property
+    def query_params(self) -> Dict[str, List[str]]:
+        if self._query_params is None:
+            self._query_params = parse_qs(self._parsed_url().query)
+        return self._query_params
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """The headers with lowercased names."""
+        if self._headers is None:
+            raw = self._raw_headers
+            if isinstance(raw, Headers):
+                self._headers = raw
+            else:
+                self._headers = {key.lower(): value for key, value in raw.items()}
+        return self._headers
+
+    @property
+    def body_read(self) -> bool:
+        """Whether the body has been taken off the connection."""
+        return not callable(self._raw_body)
+
+    @property
+    def raw_body(self) -> bytes:
+        """The body as bytes; this loads a spooled upload into memory."""
+        content = self._content()
+        if isinstance(content, bytes):
+            return content
+        content.seek(0)
+        data = content.read()
+        content.seek(0)
+        return data
+
+    @property
+    def body(self) -> Optional[Any]:
+        """
+        The body parsed according to its Content-Type.
+
+        JSON types give the decoded value (None if it isn't valid JSON),
+        application/x-www-form-urlencoded a dict of value lists, text/* a str,
+        and anything else the raw bytes. Without a Content-Type the body is
+        tried as JSON first. An empty body is None. Uploads large enough to be
+        spooled to disk are returned unparsed, as a readable binary file.
+        """
+        if self._body is _UNSET:
+            content = self._content()
+            if isinstance(content, bytes):
+                self._body = parse_body(content, self.headers.get("content-type"))
+            else:
+                self._body = content
+        return self._body
+
+    def close(self):
+        """Releases a spooled upload."""
+        if not callable(self._raw_body) and not isinstance(self._raw_body, bytes):
+            self._raw_body.close()
+
+    def _content(self) -> RawBody:
+        if callable(self._raw_body):
+            self._raw_body = self._raw_body()
+        return self._raw_body
+
+    def _parsed_url(self) -> ParseResult:
+        if self._url is None:
+            self._url = urlparse(self.target)
+        return self._url
+
+
+def parse_body(raw: bytes, content_type: Optional[str]) -> Optional[Any]:
+    if not raw:
+        return None
+    mime, charset = _split_content_type(content_type)
+    if mime == "application/json" or mime.endswith("+json"):
+        return parse_json_body(raw)
+    if mime == "application/x-www-form-urlencoded":
+        return parse_qs(_decode(raw, charset))
+    if mime.startswith("text/"):
+        return _decode(raw, charset)
+    if not mime:
+        parsed = parse_json_body(raw)
+        return raw if parsed is None else parsed
+    return raw
+
+
+def _split_content_type(content_type: Optional[str]) -> Tuple[str, Optional[str]]:
+    if not content_type:
+        return "", None
+    mime, *params = content_type.split(";")
+    charset = None
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip('"') or None
+    return mime.strip().lower(), charset
+
+
+def _decode(raw: bytes, charset: Optional[str]) -> str:
+    try:
+        return raw.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        # Unknown charset; UTF-8 is the most likely guess.
+        return raw.decode("utf-8", errors="replace")
+
+
+def parse_json_body(raw: bytes) -> Optional[Any]:
+    try:
+        body = raw.decode('utf-8')
+        return json.loads(body) if body else None
+    except (ValueError, json.JSONDecodeError):
+        return None
@@ -0,0 +1,380 @@
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from time import time
+from typing import Any, Collection, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from mimicker.compression import compress_variants, negotiate
+from mimicker.files import FileBody, FileRange, RangeNotSatisfiable, byte_range
+from mimicker.logger import get_logger
+from mimicker.request import Request
+from mimicker.stream import Stream
+from mimicker.template import BodyTemplate, fill
+
+
+class Response(NamedTuple):
+    """
+    A fully resolved response, independent of the engine that writes it.
+
+    head, when set, is the already encoded status line and header block
+    (up to, but excluding, the per-connection Date and Connection headers).
+    body is either the encoded body, a range of an open file, or, for a
+    streamed response, an iterator of encoded chunks sent chunk_delay seconds
+    apart.
+    """
+    status: int
+    headers: List[Tuple[str, str]]
+    body: Union[bytes, FileRange, Iterator[bytes]] = b""
+    delay: float = 0.
+    head: Optional[bytes] = None
+    chunk_delay: float = 0.
+
+    @property
+    def streamed(self) -> bool:
+        return not isinstance(self.body, (bytes, FileRange))
+
+    @property
+    def from_file(self) -> bool:
+        return isinstance(self.body, FileRange)
+
+
+def body_allowed(status: int) -> bool:
+    """Informational, 204 and 304 responses never carry a body (RFC 9110 §6.4.1)."""
+    return status >= 200 and status not in (204, 304)
+
+
+def encode_body(response: Any, path_params: Dict[str, str]) -> bytes:
+    """
+    Encode a body only known at request time, such as a response_func result.
+    Top-level string values of a dict have their path-parameter placeholders
+    filled and "{{"/"}}" unescaped; nothing else is touched.
+    """
+    if isinstance(response, dict):
+        response = {key: fill(value, path_params) if isinstance(value, str) else value
+                    for key, value in response.items()}
+        return json.dumps(response).encode('utf-8')
+    elif isinstance(response, str):
+        return response.encode('utf-8')
+    elif response is None:
+        return b""
+    return str(response).encode('utf-8')
+
+
+def response_headers(headers: Optional[List[Tuple[str, str]]],
+                     content_type: str = 'application/json') -> List[Tuple[str, str]]:
+    if headers:
+        if not any(header[0].lower() == 'content-type' for header in headers):
+            return list(headers) + [('Content-Type', content_type)]
+        return list(headers)
+    return [('Content-Type', content_type)]
+
+
+class ResponseTemplate(NamedTuple):
+    """
+    A stub response compiled at registration.
+
+    static is the fully encoded response when the body has no placeholders;
+    stream and file are set instead of a body template for chunked and
+    file-backed bodies. encoded holds precompressed variants of static by
+    content coding. validators holds, by content coding (None for static
+    itself), the ETag of each variant and its ready-made 304 response, for
+    answering conditional requests; modified_at is the Last-Modified time.
+    conditional enables 304 responses for file bodies.
+    """
+    status: int
+    headers: List[Tuple[str, str]]
+    body: BodyTemplate
+    delay: float = 0.
+    static: Optional[Response] = None
+    stream: Optional[Stream] = None
+    file: Optional[FileBody] = None
+    encoded: Optional[Dict[str, Response]] = None
+    validators: Optional[Dict[Optional[str], Tuple[str, Response]]] = None
+    modified_at: float = 0.
+    conditional: bool = False
+
+    def render(self, path_params: Dict[str, str],
+               request: Optional[Request] = None) -> Response:
+        """
+        Args:
+            path_params (Dict[str, str]): The path parameters of the request.
+            request (Optional[Request]): The request; file bodies honour its
+                Range header, compressed bodies its Accept-Encoding, and
+                bodies with validators its conditional headers.
+        """
+        if self.static is not None:
+            if request is None:
+                return self.static
+            coding = None
+            if self.encoded:
+                coding = negotiate(request.headers.get("accept-encoding"), self.encoded)
+            if self.validators is not None:
+                etag, not_modified = self.validators[coding]
+                if is_not_modified(request, etag, self.modified_at):
+                    return not_modified
+            return self.static if coding is None else self.encoded[coding]
+        if self.stream is not None:
+            return stream_response(self.status, self.headers, self.stream, self.delay)
+        if self.file is not None:
+            return file_response(self.status, self.headers, self.file, self.delay,
+                                 request, self.conditional)
+        return Response(self.status, self.headers, self.body.render(path_params), self.delay)
+
+
+def is_not_modified(request: Request, etag: str, modified_at: float) -> bool:
+    """
+    Whether a GET can be answered with 304 Not Modified: If-None-Match lists
+    the ETag (compared weakly), or, without If-None-Match, If-Modified-Since
+    is no earlier than modified_at (RFC 9110 §13.1).
+    """
+    if request.method != "GET":
+        return False
+    headers = request.headers
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        return any(_opaque_tag(tag) == etag for tag in if_none_match.split(","))
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(modified_at) <= since
+    return False
+
+
+def stream_response(status: int, headers: List[Tuple[str, str]], stream: Stream,
+                    delay: float = 0.) -> Response:
+    return Response(status, headers, stream.open(), delay, chunk_delay=stream.chunk_delay)
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def file_response(status: int, headers: List[Tuple[str, str]], file_body: FileBody,
+                  delay: float = 0., request: Optional[Request] = None,
+                  conditional: bool = True) -> Response:
+    """
+    Open a file-backed body, answering a single-range Range request on a 200
+    stub with 206 Partial Content (or 416 if it lies past the end of the file),
+    and, when conditional, a matching conditional GET with 304.
+    """
+    try:
+        file, info = file_body.open()
+    except OSError as e:
+        get_logger().error("Cannot serve body file %s: %s", file_body.path, e)
+        return Response(500, [])
+
+    validator_headers = [("ETag", info.etag), ("Last-Modified", info.last_modified)]
+    if conditional and status == 200 and request is not None \
+            and is_not_modified(request, info.etag, info.modified_at):
+        file.close()
+        return Response(304, _not_modified_headers(headers) + validator_headers,
+                        b"", delay)
+
+    headers = headers + [("Accept-Ranges", "bytes")] + validator_headers
+    offset, length = 0, info.size
+    requested = request.headers.get("range") if request is not None else None
+    if requested and status == 200:
+        if_range = request.headers.get("if-range")
+        if not if_range or if_range in (info.etag, info.last_modified):
+            try:
+                found = byte_range(requested, info.size)
+            except RangeNotSatisfiable:
+                file.close()
+                return Response(416, headers + [("Content-Range", f"bytes */{info.size}")],
+                                b"", delay)
+            if found is not None:
+                offset, length = found
+                status = 206
+                headers.append(("Content-Range",
+                                f"bytes {offset}-{offset + length - 1}/{info.size}"))
+    return Response(status, headers, FileRange(file, offset, length), delay)
+
+
+def prepare(status_code: int, response: Any,
+            headers: Optional[List[Tuple[str, str]]] = None,
+            delay: Optional[float] = 0,
+            compress_min_size: Optional[int] = None,
+            etag: bool = False,
+            param_names: Collection[str] = ()) -> ResponseTemplate:
+    """
+    Compile a stub response once, ahead of any request.
+
+    Args:
+        status_code (int): The response status.
+        response (Any): The stub body.
+        headers (Optional[List[Tuple[str, str]]]): The stub headers.
+        delay (Optional[float]): The stub delay in seconds.
+        compress_min_size (Optional[int]): Precompress static bodies of at
+            least this many bytes with every supported content coding. No
+            compression when None.
+        etag (bool): Add ETag and Last-Modified to 2xx static and file bodies
+            and answer conditional GETs with 304, unless the stub sets its
+            own validators.
+        param_names (Collection[str]): The path parameters of the route;
+            only placeholders naming one of them are filled per request.
+
+    Returns:
+        ResponseTemplate: The compiled response; fully encoded, head included,
+        when the body has no path-parameter placeholders.
+
+    Raises:
+        TypeError: If the body is an iterator, such as a generator; those are
+            sent with stream().
+    """
+    if isinstance(response, Iterator):
+        raise TypeError(f"A stub body can't be an iterator ({type(response).__name__}); "
+                        f"wrap it in stream() to send it chunk by chunk")
+    if isinstance(response, FileBody):
+        return ResponseTemplate(status_code, response_headers(headers, response.content_type),
+                                BodyTemplate(None), delay or 0., file=response,
+                                conditional=etag)
+    headers = response_headers(headers)
+    if isinstance(response, Stream):
+        return ResponseTemplate(status_code, headers, BodyTemplate(None),
+                                delay or 0., stream=response)
+    body = BodyTemplate(response, param_names)
+    if not body.static:
+        return ResponseTemplate(status_code, headers, body, delay or 0.)
+
+    encoded = body.render({})
+    bodies: Dict[Optional[str], bytes] = {None: encoded}
+    if compress_min_size is not None and len(encoded) >= compress_min_size \
+            and body_allowed(status_code) and not _has_header(headers, "content-encoding"):
+        compressed = compress_variants(encoded)
+        if compressed:
+            headers = headers + [("Vary", "Accept-Encoding")]
+            bodies.update(compressed)
+
+    conditional = etag and 200 <= status_code < 300 and body_allowed(status_code) \
+        and not _has_header(headers, "etag", "last-modified")
+    modified_at = int(time())
+    digest = hashlib.blake2b(encoded, digest_size=8).hexdigest()
+    responses: Dict[Optional[str], Response] = {}
+    validators: Dict[Optional[str], Tuple[str, Response]] = {}
+    for coding, data in bodies.items():
+        variant_headers = headers if coding is None else headers + [("Content-Encoding", coding)]
+        if conditional:
+            # Each coding is a different representation, so it gets its own strong ETag.
+            tag = f'"{digest}"' if coding is None else f'"{digest}-{coding}"'
+            validator_headers = [("ETag", tag),
+                                 ("Last-Modified", formatdate(modified_at, usegmt=True))]
+            validators[coding] = (tag, _static(
+                304, _not_modified_headers(variant_headers) + validator_headers, b"", delay))
+            variant_headers = variant_headers + validator_headers
+        responses[coding] = _static(status_code, variant_headers, data, delay)
+
+    static = responses.pop(None)
+    return ResponseTemplate(status_code, headers, body, delay or 0., static,
+                            encoded=responses or None, validators=validators or None,
+                            modified_at=modified_at)
+
+
+def _static(status: int, headers: List[Tuple[str, str]], body: bytes,
+            delay: Optional[float]) -> Response:
+    return Response(status, headers, body, delay or 0., encode_head(status, headers, body))
+
+
+def _has_header(headers: List[Tuple[str, str]], *names: str) -> bool:
+    return any(name.lower() in names for name, _ in headers)
+
+
+def _not_modified_headers(headers: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    # A 304 repeats the caching headers of the 200 but not its content metadata.
+    return [(name, value) for name, value in headers
+            if name.lower() not in ("content-type", "content-encoding")]
+
+
+def encode_head(status: int, headers: List[Tuple[str, str]],
+                body: Optional[bytes], chunked: bool = False) -> bytes:
+    """
+    Encode the status line and headers, including Content-Length (or
+    Transfer-Encoding when chunked) when the status allows a body. A body of
+    None has no declared length and ends when the connection closes.
+    """
+    status = int(status)
+    lines = [f"HTTP/1.1 {status} {reason(status)}\r\n"]
+    for name, value in headers:
+        lines.append(f"{name}: {value}\r\n")
+    if body_allowed(status):
+        if chunked:
+            lines.append("Transfer-Encoding: chunked\r\n")
+        elif body is not None:
+            lines.append(f"Content-Length: {len(body)}\r\n")
+    return "".join(lines).encode("latin-1")
+
+
+def render(response: Response, version: str, keep_alive: bool) -> bytes:
+    """
+    Serialize a response for the wire.
+
+    Args:
+        response (Response): The response to write.
+        version (str): The request's HTTP version, e.g. "HTTP/1.1".
+        keep_alive (bool): Whether the connection stays open afterwards.
+
+    Returns:
+        bytes: The status line, headers and body. For streamed and
+        file-backed responses, only the status line and headers; the chunks
+        follow from stream_frames(), the file from send_file(). HTTP/1.0
+        clients can't take chunked encoding, so their streamed responses must
+        be sent with keep_alive=False.
+    """
+    head = response.head
+    if response.streamed:
+        head = encode_head(response.status, response.headers, None,
+                           chunked=version != "HTTP/1.0")
+    elif head is None:
+        head = encode_head(response.status, response.headers, response.body)
+    parts = [head, b"Date: ", _http_date(), b"\r\n"]
+    if not keep_alive:
+        parts.append(b"Connection: close\r\n")
+    elif version == "HTTP/1.0":
+        parts.append(b"Connection: keep-alive\r\n")
+    parts.append(b"\r\n")
+    if body_allowed(response.status) and isinstance(response.body, bytes):
+        parts.append(response.body)
+    return b"".join(parts)
+
+
+def stream_frames(response: Response, version: str) -> Iterator[bytes]:
+    """
+    Frame the chunks of a streamed response for the wire: chunked encoding,
+    ending with the last-chunk marker, except for HTTP/1.0 clients, which get
+    the chunks as-is. Nothing is sent for statuses that carry no body.
+    """
+    if not body_allowed(response.status):
+        return
+    chunked = version != "HTTP/1.0"
+    for chunk in response.body:
+        if not chunk:
+            # An empty chunk would end the body early.
+            continue
+        yield b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk
+    if chunked:
+        yield b"0\r\n\r\n"
+
+
+def reason(status: int) -> str:
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+
+_cached_date: Tuple[int, bytes] = (0, b"")
+
+
+def _http_date() -> bytes:
+    # Formatting the date is measurable per request; it only changes once a second.
+    global _cached_date
+    now = int(time())
+    if _cached_date[0] != now:
+        _cached_date = (now, formatdate(now, usegmt=True).encode("ascii"))
+    return _cached_date[1]
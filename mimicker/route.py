@@ -1,6 +1,7 @@
 import re
 from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, Union
 
+from mimicker.files import FileBody
 from mimicker.rate_limit import RateLimitConfig
 from mimicker.regex import parse_endpoint_pattern
 from mimicker.sequence import SequenceConfig, SequenceStep
@@ -29,6 +30,7 @@ class Route:
         self._compiled_path: Pattern = parse_endpoint_pattern(path)
         self._rate_limit: Optional[RateLimitConfig] = None
         self._sequence: Optional[SequenceConfig] = None
+        self._etag = False
 
     def delay(self, delay: float):
         """
@@ -48,8 +50,8 @@ class Route:
         Sets the response body for the route.
 
         Args:
-            response (Union[Dict[str, Any], str], optional): The response body (JSON or string).
-            Defaults to an empty string.
+            response (Union[Dict[str, Any], str], optional): The response body (JSON or string),
+            or a Stream built with stream() for a chunked body. Defaults to an empty string.
 
         Returns:
             Route: The current Route instance (for method chaining).
@@ -57,6 +59,23 @@ class Route:
         self._body = response if response is not None else ""
         return self
 
+    def body_file(self, path: str):
+        """
+        Serves the response body from a file, read at request time.
+
+        The file is sent without being loaded into memory, Range requests are
+        answered with 206 Partial Content, and ETag and Last-Modified headers
+        are added. The Content-Type defaults to one guessed from the file name.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            Route: The current Route instance (for method chaining).
+        """
+        self._body = FileBody(path)
+        return self
+
     def status(self, status_code: int):
         """
         Sets the HTTP status code for the response.
@@ -83,6 +102,23 @@ class Route:
         self._headers = headers
         return self
 
+    def etag(self, enabled: bool = True):
+        """
+        Enables or disables validators for this route's static and file bodies.
+
+        When enabled (off by default), 2xx responses carry an ETag and
+        Last-Modified computed at registration, and GET requests with a
+        matching If-None-Match or If-Modified-Since get 304 Not Modified.
+
+        Args:
+            enabled (bool): Whether to send validators and answer with 304.
+
+        Returns:
+            Route: The current Route instance (for method chaining).
+        """
+        self._etag = enabled
+        return self
+
     def response_func(self, func: Callable[..., Tuple[int, Any]]):
         """
         Sets a custom response function for dynamic responses.
@@ -163,4 +199,5 @@ class Route:
             "response_func": self._response_func,
             "rate_limit": self._rate_limit,
             "sequence": self._sequence,
+            "etag": self._etag,
         }
@@ -0,0 +1,142 @@
+from math import inf
+from re import Pattern
+from typing import Any, Dict, List, Optional, Tuple
+
+from mimicker.regex import is_path_template, segment_param, template_segments
+
+
+class _Route:
+    __slots__ = ("order", "pattern", "key")
+
+    def __init__(self, order: int, pattern: Pattern, key: Any):
+        self.order = order
+        self.pattern = pattern
+        self.key = key
+
+
+# A candidate match: the route and its path params.
+_Match = Tuple[_Route, Dict[str, str]]
+
+
+class _Node:
+    def __init__(self):
+        self.literals: Dict[str, "_Node"] = {}
+        self.params: Dict[str, "_Node"] = {}
+        self.route: Optional[_Route] = None
+        # Lowest registration order anywhere below this node, to prune the search.
+        self.min_order: float = inf
+
+
+class Router:
+    """
+    Finds the earliest registered pattern that matches a request path.
+
+    Templates made only of literal segments are looked up in a dict, templates
+    with {param} segments in a segment tree, so matching costs O(path depth)
+    rather than O(number of routes). Patterns the tree can't represent
+    (query-parameter templates, hand-written regexes) are tried in
+    registration order as regexes. When several routes match, the one
+    registered first wins, as with a linear scan.
+    """
+    def __init__(self):
+        self._next_order = 0
+        self._routes: Dict[Pattern, _Route] = {}
+        self._static: Dict[str, _Route] = {}
+        self._root = _Node()
+        self._regexes: List[_Route] = []
+
+    def add(self, pattern: Pattern, template: str = "", key: Any = None):
+        """
+        Register a pattern. Re-registering an equal pattern keeps its original
+        position and replaces its key.
+
+        Args:
+            pattern (Pattern): The compiled pattern, as built by parse_endpoint_pattern.
+            template (str): The template pattern was built from, if any.
+            key (Any): A value handed back by match() along with the pattern.
+        """
+        route = self._routes.get(pattern)
+        if route is not None:
+            route.key = key
+            return
+        order = self._next_order
+        self._next_order += 1
+        route = self._routes[pattern] = _Route(order, pattern, key)
+
+        if not is_path_template(pattern, template):
+            self._regexes.append(route)
+            return
+
+        segments = template_segments(template)
+        if not any(segment_param(segment) for segment in segments):
+            self._static.setdefault("/" + "/".join(segments), route)
+            return
+
+        node = self._root
+        node.min_order = min(node.min_order, order)
+        for segment in segments:
+            name = segment_param(segment)
+            children = node.params if name else node.literals
+            node = children.setdefault(name or segment, _Node())
+            node.min_order = min(node.min_order, order)
+        if node.route is None:
+            node.route = route
+
+    def match(self, path: str) -> Optional[Tuple[Pattern, Dict[str, str], Any]]:
+        """
+        Match a raw request target (path and optional query string).
+
+        Returns:
+            Optional[Tuple[Pattern, Dict[str, str], Any]]: The matching pattern,
+            its path parameters and the key it was registered with, or None.
+        """
+        path_part = path.split("?", 1)[0]
+        best: Optional[_Match] = None
+        static = self._static.get(path_part)
+        if static is not None:
+            best = (static, {})
+
+        if path_part.startswith("/"):
+            found = _search(self._root, path_part[1:].split("/"), 0,
+                            best[0].order if best else inf)
+            if found is not None:
+                best = found
+
+        best_order = best[0].order if best else inf
+        for route in self._regexes:
+            if route.order >= best_order:
+                break
+            regex_match = route.pattern.match(path)
+            if regex_match:
+                return route.pattern, regex_match.groupdict(), route.key
+
+        if best is None:
+            return None
+        route, params = best
+        return route.pattern, params, route.key
+
+
+def _search(node: _Node, segments: List[str], index: int,
+            best_order: float) -> Optional[_Match]:
+    if node.min_order >= best_order:
+        return None
+    if index == len(segments):
+        if node.route is not None and node.route.order < best_order:
+            return node.route, {}
+        return None
+
+    segment = segments[index]
+    best = None
+    child = node.literals.get(segment)
+    if child is not None:
+        best = _search(child, segments, index + 1, best_order)
+        if best is not None:
+            best_order = best[0].order
+    if segment:
+        for name, child in node.params.items():
+            found = _search(child, segments, index + 1, best_order)
+            if found is not None:
+                found[1][name] = segment
+                best = found
+                best_order = found[0].order
+    return best
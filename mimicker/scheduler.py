@@ -0,0 +1,75 @@
+import heapq
+import itertools
+import threading
+from time import monotonic
+from typing import Callable, List, Optional, Tuple
+
+from mimicker.logger import get_logger
+
+
+class DelayScheduler:
+    """
+    Runs callbacks after a delay from a single timer thread.
+
+    Pending callbacks live in a heap ordered by due time, so a delayed response
+    costs one heap entry while it waits instead of a blocked thread.
+    """
+    def __init__(self):
+        self.logger = get_logger()
+        self._heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of callbacks waiting for their due time."""
+        return len(self._heap)
+
+    def call_later(self, delay: float, callback: Callable[[], None]):
+        """
+        Schedules callback to run once delay seconds have passed.
+
+        Args:
+            delay (float): Seconds to wait.
+            callback (Callable[[], None]): Invoked on the timer thread; it should
+                hand any slow work off rather than run it inline.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            heapq.heappush(self._heap, (monotonic() + delay, next(self._counter), callback))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mimicker-timer",
+                                                daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def close(self):
+        """
+        Stops the timer thread and drops every pending callback.
+        """
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    remaining = self._heap[0][0] - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+                _, _, callback = heapq.heappop(self._heap)
+            try:
+                callback()
+            except Exception:
+                self.logger.exception("Delayed callback failed")
@@ -2,6 +2,8 @@ import threading
 from dataclasses import dataclass, field
 from typing import Any, List, Optional, Tuple
 
+from mimicker.files import FileBody
+
 
 @dataclass
 class SequenceStep:
@@ -18,6 +20,10 @@ class SequenceStep:
         self._body = content
         return self
 
+    def body_file(self, path: str) -> "SequenceStep":
+        self._body = FileBody(path)
+        return self
+
     def headers(self, headers: List[Tuple[str, str]]) -> "SequenceStep":
         self._headers = headers
         return self
@@ -34,6 +40,10 @@ class SequenceConfig:
         self._index = 0
         self._lock = threading.Lock()
 
+    @property
+    def steps(self) -> List[SequenceStep]:
+        return self._steps
+
     def next_step(self) -> SequenceStep:
         with self._lock:
             current = self._steps[self._index]
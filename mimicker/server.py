@@ -1,19 +1,304 @@
 import atexit
+import os
+import queue
+import selectors
+import socket
 import socketserver
 import threading
+from collections import deque
+from functools import partial
+from time import monotonic
+from typing import Deque, Dict, Iterable, Optional, Set
 
+from mimicker.access_log import DEFAULT_MAX_BYTES, AccessLog
+from mimicker.async_server import AsyncioHTTPServer
 from mimicker.logger import get_logger
 from mimicker.handler import MimickerHandler
+from mimicker.request import DEFAULT_SPOOL_THRESHOLD
 from mimicker.route import Route
+from mimicker.scheduler import DelayScheduler
+from mimicker.sockets import SocketOptions, configure_listener
 from mimicker.stub_group import StubGroup
-from mimicker.tracking import RequestTracker
+from mimicker.tracking import DEFAULT_MAX_UNMATCHED, RequestTracker
 
 
 class ReusableAddressThreadingTCPServer(socketserver.ThreadingTCPServer):
+    """
+    Starts a thread per connection.
+
+    A handler may hand its connection back before it is done with it by setting
+    a continuation (e.g. parking an idle keep-alive connection, or scheduling a
+    delayed response); the server then runs the continuation instead of closing
+    the connection, and the thread is released.
+    """
     allow_reuse_address = True
     # Default backlog of 5 causes RST on macOS when more than 5 connections
     # arrive simultaneously before the first accept() clears the queue.
     request_queue_size = 128
+    # Keep-alive connections can outlive shutdown(); don't block on their threads.
+    daemon_threads = True
+    block_on_close = False
+    # Seconds an idle keep-alive connection is held open before it is closed.
+    keep_alive_timeout = 75.0
+    parks_idle_connections = False
+    # Request bodies: larger ones are refused with 413 (None: no limit), and
+    # ones past spool_threshold are buffered in a temporary file.
+    max_body_size: Optional[int] = None
+    spool_threshold = DEFAULT_SPOOL_THRESHOLD
+    # One JSON line per request, when enabled.
+    access_log: Optional[AccessLog] = None
+
+    def __init__(self, server_address, RequestHandlerClass, reuse_port: bool = False,
+                 socket_options: SocketOptions = SocketOptions()):
+        self.reuse_port = reuse_port
+        self.socket_options = socket_options
+        if socket_options.backlog:
+            self.request_queue_size = socket_options.backlog
+        self.scheduler = DelayScheduler()
+        self._connections_lock = threading.Lock()
+        self._connections: Set[socket.socket] = set()
+        super().__init__(server_address, RequestHandlerClass)
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        configure_listener(self.socket, self.socket_options)
+        super().server_bind()
+
+    @property
+    def active_connections(self) -> int:
+        return len(self._connections)
+
+    @property
+    def pending_delays(self) -> int:
+        """Number of delayed responses waiting to be written."""
+        return self.scheduler.pending
+
+    def process_request(self, request, client_address):
+        with self._connections_lock:
+            self._connections.add(request)
+        self._submit(partial(self._process, request, client_address))
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def shutdown_request(self, request):
+        with self._connections_lock:
+            self._connections.discard(request)
+        super().shutdown_request(request)
+
+    def delay_response(self, handler, delay: float, response):
+        """
+        Writes response on handler's connection once delay seconds have passed,
+        without holding a thread in the meantime.
+        """
+        self.scheduler.call_later(
+            delay, partial(self._submit, partial(self._resume, handler, response))
+        )
+
+    def resume_later(self, handler, delay: float):
+        """
+        Resumes handler once delay seconds have passed, e.g. to write the next
+        chunk of a streamed response, without holding a thread in the meantime.
+        """
+        self.scheduler.call_later(delay, partial(self._submit, partial(self._resume, handler)))
+
+    def _submit(self, job):
+        threading.Thread(target=job, daemon=True).start()
+
+    def _process(self, request, client_address):
+        try:
+            handler = self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+            self.shutdown_request(request)
+            return
+        self._release(handler)
+
+    def _resume(self, handler, response=None):
+        try:
+            handler.resume(response)
+        except Exception:
+            handler.continuation = None
+            self.handle_error(handler.request, handler.client_address)
+        self._release(handler)
+
+    def _release(self, handler):
+        continuation = handler.continuation
+        if continuation is None:
+            self.shutdown_request(handler.request)
+        else:
+            continuation()
+
+    def server_close(self):
+        super().server_close()
+        self.scheduler.close()
+        # Wake handlers blocked reading the next request on a keep-alive connection.
+        with self._connections_lock:
+            connections = list(self._connections)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class ReusableAddressPooledTCPServer(ReusableAddressThreadingTCPServer):
+    """
+    A threaded server that hands accepted connections to a fixed pool of workers.
+
+    Connections wait in a queue until a worker is free. At most queue_size of
+    them may be newly accepted ones; past that the accept loop blocks and
+    further clients wait in the listen backlog, so thread count and memory stay
+    bounded under overload. Connections coming back to the pool (a delayed
+    response falling due, a parked connection turning readable) are never held
+    back by that limit, so they don't stall behind new clients.
+
+    Idle keep-alive connections don't hold a worker: the handler parks them with
+    park(), and a selector thread queues them again once the client sends data.
+    """
+    parks_idle_connections = True
+
+    def __init__(self, server_address, RequestHandlerClass, threads: int,
+                 queue_size: int = 1024, reuse_port: bool = False,
+                 socket_options: SocketOptions = SocketOptions()):
+        if threads < 1:
+            raise ValueError(f"threads must be at least 1, got {threads}")
+        super().__init__(server_address, RequestHandlerClass, reuse_port=reuse_port,
+                         socket_options=socket_options)
+        self.threads = threads
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        # Free places for accepted connections in _requests.
+        self._accept_slots = threading.Semaphore(queue_size)
+        self._workers = [
+            threading.Thread(target=self._work, name=f"mimicker-worker-{i}", daemon=True)
+            for i in range(threads)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._to_park: Deque = deque()
+        self._parked: Dict[socket.socket, float] = {}  # connection -> idle deadline
+        self._closing = False
+        self._reactor = threading.Thread(target=self._react, name="mimicker-reactor",
+                                         daemon=True)
+        self._reactor.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of connections, new or resumed, waiting for a free worker."""
+        return self._requests.qsize()
+
+    def park(self, handler):
+        """
+        Holds an idle keep-alive connection until the client sends its next request.
+        """
+        self._to_park.append(handler)
+        self._wake()
+
+    def process_request(self, request, client_address):
+        # Blocks the accept loop while queue_size accepted connections are waiting.
+        self._accept_slots.acquire()
+        super().process_request(request, client_address)
+
+    def _process(self, request, client_address):
+        self._accept_slots.release()
+        super()._process(request, client_address)
+
+    def _submit(self, job):
+        self._requests.put(job)
+
+    def _work(self):
+        while True:
+            job = self._requests.get()
+            if job is None:
+                return
+            job()
+
+    def _wake(self):
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _react(self):
+        next_expiry = monotonic() + 1.0
+        while not self._closing:
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.fileobj is self._wakeup_r:
+                    self._drain_wakeups()
+                    continue
+                self._selector.unregister(key.fileobj)
+                del self._parked[key.fileobj]
+                self._submit(partial(self._resume, key.data))
+
+            now = monotonic()
+            while self._to_park:
+                handler = self._to_park.popleft()
+                self._parked[handler.connection] = now + self.keep_alive_timeout
+                self._selector.register(handler.connection, selectors.EVENT_READ, handler)
+
+            if now >= next_expiry:
+                next_expiry = now + 1.0
+                for connection, deadline in list(self._parked.items()):
+                    if deadline <= now:
+                        self._close_parked(connection)
+
+        for connection in list(self._parked):
+            self._close_parked(connection)
+        self._selector.close()
+
+    def _drain_wakeups(self):
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _close_parked(self, connection):
+        handler = self._selector.unregister(connection).data
+        del self._parked[connection]
+        handler.continuation = None
+        handler.finish()
+        self.shutdown_request(connection)
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wake()
+        self._reactor.join()
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+        for _ in self._workers:
+            self._requests.put(None)
+
+
+ENGINES = ("threaded", "asyncio")
+
+
+def register_routes(stub_group: StubGroup, routes: Iterable[Route]):
+    """
+    Compiles routes into stubs on the given stub group.
+    """
+    for route in routes:
+        route_config = route.build()
+        stub_group.add(
+            method=route_config["method"],
+            pattern=route_config["compiled_path"],
+            status_code=route_config["status"],
+            delay=route_config["delay"],
+            response=route_config["body"],
+            headers=route_config["headers"],
+            response_func=route_config["response_func"],
+            rate_limit=route_config["rate_limit"],
+            sequence=route_config["sequence"],
+            path_template=route_config["path"],
+            etag=route_config["etag"],
+        )
 
 
 class MimickerServer:
@@ -22,13 +307,117 @@ class MimickerServer:
 
     This server allows defining request-response routes for testing or simulation purposes.
     """
-    def __init__(self, port: int = 8080):
+    def __init__(self, port: int = 8080, engine: Optional[str] = None,
+                 threads: Optional[int] = None, reuse_port: bool = False,
+                 stub_group: Optional[StubGroup] = None,
+                 match_cache_size: Optional[int] = None,
+                 max_body_size: Optional[int] = None,
+                 spool_threshold: Optional[int] = None,
+                 compress_min_size: Optional[int] = None,
+                 backlog: Optional[int] = None,
+                 send_buffer: Optional[int] = None,
+                 recv_buffer: Optional[int] = None,
+                 tcp_nodelay: bool = True,
+                 access_log: Optional[str] = None,
+                 access_log_sample: float = 1.,
+                 access_log_max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 max_unmatched: Optional[int] = None,
+                 unmatched_samples: Optional[int] = None):
+        """
+        Initializes the server and binds its listening socket.
+
+        Args:
+            port (int): The port to listen on. 0 lets the OS pick a free port.
+            engine (str, optional): "threaded" (one thread per connection) or
+                "asyncio" (a single event loop). Defaults to the MIMICKER_ENGINE
+                environment variable, or "threaded".
+            threads (int, optional): Size of the worker pool for the threaded
+                engine. When unset, a new thread is started per connection.
+                Ignored by the asyncio engine.
+            reuse_port (bool): Bind with SO_REUSEPORT so several processes can
+                share the port.
+            stub_group (StubGroup, optional): An already populated stub group to
+                serve, e.g. one compiled before forking worker processes.
+            match_cache_size (int, optional): Cache up to this many match results
+                by method and raw path. Disabled when unset.
+            max_body_size (int, optional): Answer requests with a larger body
+                with 413 Payload Too Large. Unlimited when unset.
+            spool_threshold (int, optional): Bodies larger than this many bytes
+                are buffered in a temporary file and handed to response_func as
+                a file object. Defaults to 1 MiB.
+            compress_min_size (int, optional): Precompress static bodies of at
+                least this many bytes with gzip and deflate (and zstd where
+                available), served by Accept-Encoding. Disabled when unset.
+            backlog (int, optional): Length of the listen() queue. Defaults to
+                128 (threaded) or 1024 (asyncio).
+            send_buffer (int, optional): SO_SNDBUF for connections, in bytes.
+            recv_buffer (int, optional): SO_RCVBUF for connections, in bytes.
+            tcp_nodelay (bool): Set TCP_NODELAY on connections, so small
+                responses are sent without waiting on Nagle's algorithm.
+            access_log (str, optional): Append one JSON line per request to
+                this file (method, path, matched stub, status, bytes and
+                latency). Defaults to the MIMICKER_ACCESS_LOG environment
+                variable; disabled when neither is set.
+            access_log_sample (float): Fraction of requests to record, in (0, 1].
+            access_log_max_bytes (int, optional): Rotate the access log once it
+                reaches this size, keeping five old files. Never rotated when
+                None or 0. Defaults to 100 MiB.
+            max_unmatched (int, optional): Distinct method and path pairs of
+                unmatched requests kept for the report. Defaults to 1000.
+            unmatched_samples (int, optional): Also keep this many of the most
+                recent unmatched requests individually. None by default.
+        """
         self.logger = get_logger()
-        self.stub_matcher = StubGroup()
-        self.server = ReusableAddressThreadingTCPServer(("", port), self._handler_factory)
+        self.stub_matcher = stub_group if stub_group is not None else StubGroup()
+        if match_cache_size is not None:
+            self.stub_matcher.enable_match_cache(match_cache_size)
+        if max_unmatched is not None or unmatched_samples is not None:
+            self.stub_matcher.tracker.limit_unmatched(
+                DEFAULT_MAX_UNMATCHED if max_unmatched is None else max_unmatched,
+                0 if unmatched_samples is None else unmatched_samples)
+        self.engine = engine or os.getenv("MIMICKER_ENGINE", "threaded")
+        socket_options = SocketOptions(backlog, send_buffer, recv_buffer, tcp_nodelay)
+        if self.engine == "threaded" and threads is not None:
+            self.server = ReusableAddressPooledTCPServer(("", port), self._handler_factory,
+                                                         threads=threads,
+                                                         reuse_port=reuse_port,
+                                                         socket_options=socket_options)
+        elif self.engine == "threaded":
+            self.server = ReusableAddressThreadingTCPServer(("", port), self._handler_factory,
+                                                            reuse_port=reuse_port,
+                                                            socket_options=socket_options)
+        elif self.engine == "asyncio":
+            self.server = AsyncioHTTPServer(("", port), self.stub_matcher,
+                                            reuse_port=reuse_port,
+                                            socket_options=socket_options)
+        else:
+            raise ValueError(
+                f"Unknown engine {self.engine!r}. Must be one of {list(ENGINES)}"
+            )
+        if compress_min_size is not None:
+            self.stub_matcher.enable_compression(compress_min_size)
+        if max_body_size is not None:
+            self.server.max_body_size = max_body_size
+        if spool_threshold is not None:
+            self.server.spool_threshold = spool_threshold
+        access_log = access_log or os.getenv("MIMICKER_ACCESS_LOG")
+        if access_log:
+            self.server.access_log = AccessLog(access_log, access_log_sample,
+                                               access_log_max_bytes)
+        self.stub_matcher.report_sections["server"] = self._server_stats
         self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         atexit.register(self.shutdown)
-        self.logger.debug("Initialized MimickerServer on port %s", port)
+        self.logger.debug("Initialized MimickerServer on port %s (%s engine)",
+                          port, self.engine)
+
+    def _server_stats(self) -> dict:
+        stats = {"engine": self.engine}
+        if isinstance(self.server, ReusableAddressPooledTCPServer):
+            stats["threads"] = self.server.threads
+            stats["queue_depth"] = self.server.queue_depth
+        stats["active_connections"] = self.server.active_connections
+        stats["pending_delays"] = self.server.pending_delays
+        return stats
 
     def _handler_factory(self, *args):
         self.logger.debug("Creating a new handler for incoming connection")
@@ -44,20 +433,7 @@ class MimickerServer:
         Returns:
             MimickerServer: The current server instance (for method chaining).
         """
-        for route in routes:
-            route_config = route.build()
-            self.stub_matcher.add(
-                method=route_config["method"],
-                pattern=route_config["compiled_path"],
-                status_code=route_config["status"],
-                delay=route_config["delay"],
-                response=route_config["body"],
-                headers=route_config["headers"],
-                response_func=route_config["response_func"],
-                rate_limit=route_config["rate_limit"],
-                sequence=route_config["sequence"],
-                path_template=route_config["path"],
-            )
+        register_routes(self.stub_matcher, routes)
         return self
 
     def load_config(self, path: str) -> "MimickerServer":
@@ -75,7 +451,7 @@ class MimickerServer:
         errors = validate_config(data)
         if errors:
             raise ValueError(f"Invalid config file '{path}': {'; '.join(errors)}")
-        return self.routes(*build_routes(data))
+        return self.routes(*build_routes(data, os.path.dirname(path)))
 
     @property
     def tracker(self) -> RequestTracker:
@@ -110,3 +486,5 @@ class MimickerServer:
         self.server.server_close()
         if self._thread.is_alive():
             self._thread.join()
+        if self.server.access_log is not None:
+            self.server.access_log.close()
@@ -0,0 +1,28 @@
+import socket
+from typing import NamedTuple, Optional
+
+
+class SocketOptions(NamedTuple):
+    """
+    Tuning for the listening socket and the connections accepted on it.
+
+    backlog is the listen() queue length (each engine has its own default),
+    send_buffer and recv_buffer set SO_SNDBUF and SO_RCVBUF (the OS default
+    when None), and nodelay sets TCP_NODELAY on every connection.
+    """
+    backlog: Optional[int] = None
+    send_buffer: Optional[int] = None
+    recv_buffer: Optional[int] = None
+    nodelay: bool = True
+
+
+def configure_listener(sock: socket.socket, options: SocketOptions):
+    """
+    Applies the buffer sizes to a listening socket, before bind() and listen(),
+    so accepted connections inherit them and the receive window is scaled to
+    match.
+    """
+    if options.send_buffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, options.send_buffer)
+    if options.recv_buffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, options.recv_buffer)
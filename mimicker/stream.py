@@ -0,0 +1,70 @@
+import json
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
+
+Chunks = Union[Iterable[Any], Callable[[], Iterable[Any]]]
+
+
+class Stream:
+    """
+    A response body sent with Transfer-Encoding: chunked, one chunk at a time,
+    so it never has to be held in memory whole.
+
+    chunks is an iterable, or a function returning one. A function is called
+    afresh for every response, so a generator function can back a stub that is
+    hit many times; a generator object can only be sent once.
+    """
+    def __init__(self, chunks: Chunks, chunk_delay: float = 0.):
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+
+    def open(self) -> Iterator[bytes]:
+        """A new iterator over the encoded chunks of one response."""
+        source = self.chunks() if callable(self.chunks) else self.chunks
+        return _encoded(iter(source))
+
+
+def stream(chunks: Chunks, chunk_delay: float = 0.) -> Stream:
+    """
+    Creates a chunked response body.
+
+    Args:
+        chunks (Chunks): The chunks to send, or a function returning them. bytes
+            are sent as-is, str as UTF-8, anything else as JSON.
+        chunk_delay (float): Seconds to wait before each chunk after the first.
+            No thread is held while waiting.
+
+    Returns:
+        Stream: A body for Route.body(), step().body() or a response_func.
+    """
+    return Stream(chunks, chunk_delay)
+
+
+def as_stream(body: Any) -> Optional[Stream]:
+    """
+    The Stream for a response_func body: a Stream as-is, or any other iterator
+    (such as a generator) wrapped in one. None for ordinary bodies.
+    """
+    if isinstance(body, Stream):
+        return body
+    if isinstance(body, Iterator):
+        return Stream(body)
+    return None
+
+
+def _encoded(source: Iterator[Any]) -> Iterator[bytes]:
+    try:
+        for chunk in source:
+            yield encode_chunk(chunk)
+    finally:
+        # Let a generator run its cleanup when the client goes away early.
+        close = getattr(source, "close", None)
+        if close is not None:
+            close()
+
+
+def encode_chunk(chunk: Any) -> bytes:
+    if isinstance(chunk, (bytes, bytearray, memoryview)):
+        return bytes(chunk)
+    if isinstance(chunk, str):
+        return chunk.encode("utf-8")
+    return json.dumps(chunk).encode("utf-8")
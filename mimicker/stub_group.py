@@ -1,8 +1,13 @@
 from re import Pattern
-from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, Callable, Collection, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+from mimicker.admin import ADMIN_ENDPOINTS, ADMIN_PREFIX
+from mimicker.cache import LRUCache
 from mimicker.rate_limit import RateLimitConfig, RateLimitTracker
 from mimicker.regex import parse_endpoint_pattern
+from mimicker.request import Request
+from mimicker.response import Response, ResponseTemplate, prepare
+from mimicker.router import Router
 from mimicker.sequence import SequenceConfig
 from mimicker.tracking import RequestTracker
 
@@ -17,12 +22,31 @@ class Stub(NamedTuple):
     sequence: Optional[SequenceConfig] = None
 
 
+_MISS = object()
+
+
 class StubGroup:
     def __init__(self):
         self.stubs: Dict[str, Dict[Pattern, Stub]] = {}
+        self._routers: Dict[str, Router] = {}
+        # Match results keyed by (method, raw path); None until enable_match_cache().
+        self.match_cache: Optional[LRUCache] = None
         self.rate_limiter = RateLimitTracker()
         self.tracker = RequestTracker()
-        self._stub_keys: Dict[int, Tuple[str, str]] = {}  # id(pattern) -> (method, path_template)
+        # Extra report sections (e.g. engine stats), keyed by their name in the report.
+        self.report_sections: Dict[str, Callable[[], dict]] = {}
+        # Tracker snapshots of sibling worker processes to merge into report().
+        self.peer_snapshots: Optional[Callable[[], List[dict]]] = None
+        # Responses compiled at registration, keyed by id() of the stub or sequence
+        # step they were built from (kept alongside it so the id can't be reused).
+        self._templates: Dict[int, Tuple[Any, ResponseTemplate]] = {}
+        # Static bodies at least this large are precompressed; None until
+        # enable_compression().
+        self.compress_min_size: Optional[int] = None
+        # Stubs registered with etag=True, keyed by id() like _templates.
+        self._with_etag: Dict[int, Stub] = {}
+        # (method, path) of admin endpoints a user stub takes over; see overrides_admin().
+        self._admin_overrides: Set[Tuple[str, str]] = set()
 
     def add(self, method: str, pattern: Union[str, Pattern],
             status_code: int, response: Any, delay: Optional[float] = 0,
@@ -30,54 +54,154 @@ class StubGroup:
             headers: Optional[List[Tuple[str, str]]] = None,
             rate_limit: Optional[RateLimitConfig] = None,
             sequence: Optional[SequenceConfig] = None,
-            path_template: str = ""):
+            path_template: str = "",
+            etag: bool = False):
         if method not in self.stubs:
             self.stubs[method] = {}
+            self._routers[method] = Router()
 
         if isinstance(pattern, str):
             path_template = path_template or pattern
             pattern = parse_endpoint_pattern(pattern)
 
-        self.stubs[method][pattern] = Stub(status_code, delay, response, response_func,
-                                           headers, rate_limit, sequence)
-        self._stub_keys[id(pattern)] = (method, path_template or str(pattern))
-        self.tracker.register_stub(method, path_template or str(pattern))
+        previous = self.stubs[method].get(pattern)
+        if previous is not None:
+            self._forget_prepared(previous)
+            self._with_etag.pop(id(previous), None)
+        stub = Stub(status_code, delay, response, response_func,
+                    headers, rate_limit, sequence)
+        if etag:
+            self._with_etag[id(stub)] = stub
+        self.stubs[method][pattern] = stub
+        # Each route carries its (hit counter slot, path_template) to match_request().
+        route = path_template or str(pattern)
+        self._routers[method].add(
+            pattern, path_template, (self.tracker.register_stub(method, route), route))
+        self._admin_overrides.update(
+            (method, path) for path in ADMIN_ENDPOINTS if pattern.match(path))
+        if self.match_cache is not None:
+            self.match_cache.clear()
+        self._prepare(stub, pattern.groupindex)
+
+    def enable_match_cache(self, max_size: int):
+        """
+        Caches up to max_size match results (including misses) by method and raw
+        path. The cache is cleared whenever a stub is added, and its counters are
+        reported under "match_cache".
+
+        Args:
+            max_size (int): Maximum number of cached results.
+
+        Raises:
+            ValueError: If max_size is less than 1.
+        """
+        self.match_cache = LRUCache(max_size)
+        self.report_sections["match_cache"] = self.match_cache.stats
+
+    def enable_compression(self, min_size: int):
+        """
+        Precompresses static response bodies of at least min_size bytes with
+        every supported content coding, including those of stubs already
+        added, so each request only has to pick one from its Accept-Encoding.
+
+        Args:
+            min_size (int): Smallest body, in bytes, worth compressing.
+        """
+        self.compress_min_size = min_size
+        for stubs in self.stubs.values():
+            for pattern, stub in stubs.items():
+                self._prepare(stub, pattern.groupindex)
+
+    def overrides_admin(self, method: str, path: str) -> bool:
+        """
+        Whether a user stub matches an admin endpoint's path, and so answers
+        it instead of the built-in handler. Worked out as stubs are added, so
+        admin requests can be answered without matching.
+        """
+        return (method, path) in self._admin_overrides
+
+    def etag_enabled(self, stub: Stub) -> bool:
+        """Whether the stub answers conditional requests (see Route.etag())."""
+        return self._with_etag.get(id(stub)) is stub
+
+    def template(self, source: Any) -> Optional[ResponseTemplate]:
+        """
+        Returns the response compiled at registration for a stub or sequence step,
+        or None for stubs answered by a response_func.
+        """
+        entry = self._templates.get(id(source))
+        if entry is not None and entry[0] is source:
+            return entry[1]
+        return None
+
+    def prepared(self, source: Any) -> Optional[Response]:
+        """
+        Returns the fully encoded response of a stub or sequence step, or None
+        if it has to be rendered per request.
+        """
+        template = self.template(source)
+        return template.static if template else None
+
+    def _prepare(self, stub: Stub, param_names: Collection[str]):
+        if stub.sequence:
+            for seq_step in stub.sequence.steps:
+                self._templates[id(seq_step)] = (seq_step, prepare(
+                    seq_step._status, seq_step._body, seq_step._headers, seq_step._delay,
+                    self.compress_min_size, self.etag_enabled(stub), param_names))
+        elif not stub.response_func:
+            self._templates[id(stub)] = (stub, prepare(
+                stub.status_code, stub.response, stub.headers, stub.delay,
+                self.compress_min_size, self.etag_enabled(stub), param_names))
+
+    def _forget_prepared(self, stub: Stub):
+        sources = stub.sequence.steps if stub.sequence else [stub]
+        for source in sources:
+            if self.template(source) is not None:
+                del self._templates[id(source)]
+
+    def report(self) -> dict:
+        peers = self.peer_snapshots() if self.peer_snapshots else ()
+        report = self.tracker.report(peers)
+        for name, section in self.report_sections.items():
+            report[name] = section()
+        return report
 
     def match(self, method: str, path: str,
               request_headers: Optional[Dict[str, str]] = None) -> Tuple[
             Optional[Stub], Dict[str, str]]:
+        return self.match_request(Request(method, path, request_headers or {}))
+
+    def match_request(self, request: Request) -> Tuple[Optional[Stub], Dict[str, str]]:
+        """
+        Finds the stub for a request and records the hit, or records the request
+        as unmatched.
+
+        Returns:
+            Tuple[Optional[Stub], Dict[str, str]]: The matched stub, or None, and
+            its path parameters.
+        """
+        method, path = request.method, request.target
         matched_stub = None
         path_params = {}
-        matched_pattern = None
-
-        for compiled_path, stub in self.stubs.get(method, {}).items():
-            match = compiled_path.match(path)
-            if match:
-                headers_included = True
-                if stub.headers and request_headers:
-                    headers_included = all(
-                        header_name in request_headers
-                        and request_headers[header_name] == header_value
-                        for header_name, header_value in stub.headers
-                    )
-
-                if stub.headers and not headers_included:
-                    pass
-
-                matched_stub = stub
-                matched_pattern = compiled_path
-                path_params = match.groupdict()
-                break
-
-        if matched_stub and matched_pattern is not None:
-            stub_key = self._stub_keys.get(id(matched_pattern))
-            if stub_key:
-                self.tracker.record_hit(*stub_key)
-        elif matched_stub is None:
-            from urllib.parse import urlparse
-            clean_path = urlparse(path).path
+
+        cache = self.match_cache
+        found = cache.get((method, path), _MISS) if cache is not None else _MISS
+        if found is _MISS:
+            generation = cache.generation if cache is not None else 0
+            router = self._routers.get(method)
+            found = router.match(path) if router else None
+            if cache is not None:
+                cache.put((method, path), found, generation)
+        if found:
+            matched_pattern, path_params, (request.stub_slot, request.route) = found
+            matched_stub = self.stubs[method][matched_pattern]
+            # Cached params are shared; hand out a copy the caller may modify.
+            path_params = dict(path_params)
+            self.tracker.count_hit(request.stub_slot)
+        else:
+            clean_path = request.path
             # Don't count admin paths as unmatched — they're handled by the server itself.
-            if not clean_path.startswith("/__mimicker__/"):
+            if not clean_path.startswith(ADMIN_PREFIX):
                 self.tracker.record_unmatched(method, clean_path)
 
         return matched_stub, path_params
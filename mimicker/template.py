@@ -0,0 +1,141 @@
+import json
+import re
+from typing import Any, Collection, Dict, List, Tuple, Union
+
+# "{{" and "}}" are escaped braces; "{name}" is a placeholder.
+_TOKEN = re.compile(r"\{\{|\}\}|\{(\w+)\}")
+
+# Literal text and placeholder names, alternating and starting with text.
+_Pieces = Tuple[str, ...]
+
+
+class BodyTemplate:
+    """
+    A response body compiled once into pre-encoded JSON fragments and
+    placeholder slots.
+
+    Dict bodies are walked to any depth: string values naming one of the
+    route's path parameters, such as ``{id}``, become slots filled per
+    request, and everything else is encoded ahead of time, so rendering only
+    touches the slots. As with str.format, ``{{`` and ``}}`` in dict string
+    values stand for literal braces; other braces, such as ``{missing}`` or
+    ``a{2}``, are sent as they are. String and other non-dict bodies are sent
+    as-is.
+    """
+    def __init__(self, body: Any, param_names: Collection[str] = ()):
+        """
+        Args:
+            body (Any): The stub body.
+            param_names (Collection[str]): The path parameters of the route.
+        """
+        parts: List[Union[bytes, _Pieces]] = []
+        if isinstance(body, dict):
+            _compile(body, parts, param_names)
+        elif isinstance(body, str):
+            parts.append(body.encode("utf-8"))
+        elif body is not None:
+            parts.append(str(body).encode("utf-8"))
+        # Bytes are static fragments, tuples are placeholder slots.
+        self._parts = _merge(parts)
+
+    @property
+    def static(self) -> bool:
+        """True if the body doesn't depend on path parameters."""
+        return all(isinstance(part, bytes) for part in self._parts)
+
+    def render(self, path_params: Dict[str, str]) -> bytes:
+        """
+        Fill the placeholder slots.
+
+        Args:
+            path_params (Dict[str, str]): The path parameters of the request.
+
+        Returns:
+            bytes: The encoded body.
+        """
+        if len(self._parts) == 1 and isinstance(self._parts[0], bytes):
+            return self._parts[0]
+        return b"".join(
+            part if isinstance(part, bytes)
+            else json.dumps(_join(part, path_params)).encode("utf-8")
+            for part in self._parts
+        )
+
+
+def fill(text: str, path_params: Dict[str, str]) -> str:
+    """
+    Fill the placeholders of text that name a path parameter and unescape
+    "{{" and "}}", leaving any other braces as they are.
+    """
+    pieces = _split(text, path_params)
+    return pieces if isinstance(pieces, str) else _join(pieces, path_params)
+
+
+def _compile(value: Any, parts: List[Union[bytes, _Pieces]], param_names: Collection[str]):
+    # Mirrors json.dumps' default separators so the output is byte-identical.
+    if isinstance(value, dict):
+        parts.append(b"{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                parts.append(b", ")
+            # Let json decide how non-string keys are spelled.
+            parts.append(json.dumps({key: 0})[1:-4].encode("utf-8") + b": ")
+            _compile(item, parts, param_names)
+        parts.append(b"}")
+    elif isinstance(value, (list, tuple)):
+        parts.append(b"[")
+        for i, item in enumerate(value):
+            if i:
+                parts.append(b", ")
+            _compile(item, parts, param_names)
+        parts.append(b"]")
+    elif isinstance(value, str):
+        pieces = _split(value, param_names)
+        parts.append(json.dumps(pieces).encode("utf-8") if isinstance(pieces, str) else pieces)
+    else:
+        parts.append(json.dumps(value).encode("utf-8"))
+
+
+def _split(text: str, param_names: Collection[str]) -> Union[str, _Pieces]:
+    """
+    Splits text around its placeholders, or returns it as plain text if none
+    of them names a path parameter. Either way "{{" and "}}" stand for literal
+    braces, as with str.format.
+    """
+    if "{" not in text and "}}" not in text:
+        return text
+    pieces: List[str] = []
+    literal: List[str] = []
+    start = 0
+    for token in _TOKEN.finditer(text):
+        literal.append(text[start:token.start()])
+        start = token.end()
+        name = token.group(1)
+        if name is not None and name in param_names:
+            pieces.append("".join(literal))
+            pieces.append(name)
+            literal = []
+        else:
+            literal.append(token.group()[:1] if name is None else token.group())
+    literal.append(text[start:])
+    if not pieces:
+        return "".join(literal)
+    pieces.append("".join(literal))
+    return tuple(pieces)
+
+
+def _join(pieces: _Pieces, path_params: Dict[str, str]) -> str:
+    return "".join(
+        piece if i % 2 == 0 else str(path_params.get(piece, "{%s}" % piece))
+        for i, piece in enumerate(pieces)
+    )
+
+
+def _merge(parts: List[Union[bytes, _Pieces]]) -> List[Union[bytes, _Pieces]]:
+    merged: List[Union[bytes, _Pieces]] = []
+    for part in parts:
+        if isinstance(part, bytes) and merged and isinstance(merged[-1], bytes):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return merged
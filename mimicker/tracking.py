@@ -1,7 +1,15 @@
 import threading
-from dataclasses import dataclass, field
+import time
+import weakref
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from mimicker.histogram import Histogram
+
+# Distinct (method, path) pairs of unmatched requests kept by default.
+DEFAULT_MAX_UNMATCHED = 1000
 
 
 @dataclass
@@ -11,66 +19,468 @@ class StubRecord:
     hit_count: int = 0
 
 
+@dataclass
+class StubTotals:
+    """A stub's counters, summed across processes; see RequestTracker.totals()."""
+    method: str
+    path: str
+    hit_count: int
+    rate_limited: int
+    timings: Optional["StubTimings"]
+
+
 @dataclass
 class UnmatchedRecord:
+    """Every unmatched request for one method and path."""
     method: str
     path: str
-    timestamp: str = field(
-        default_factory=lambda: datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    )
+    count: int
+    first_seen: float
+    last_seen: float
 
 
-class RequestTracker:
+class StubTimings:
+    """
+    Server-side histograms of one stub's responses: the time spent handling
+    them and their configured and actual delays (in microseconds), and their
+    size in bytes.
+    """
+    __slots__ = ("_lock", "handling", "delay", "actual_delay", "size")
+
     def __init__(self):
+        # Guards only this stub's histograms, so stubs never contend.
         self._lock = threading.Lock()
-        self._stubs: Dict[str, StubRecord] = {}
-        self._unmatched: List[UnmatchedRecord] = []
+        self.handling = Histogram()
+        self.delay = Histogram()
+        self.actual_delay = Histogram()
+        self.size = Histogram()
+
+    def record(self, handling: float, delay: float, actual_delay: float, size: int):
+        with self._lock:
+            self.handling.record(int(handling * 1e6))
+            self.delay.record(int(delay * 1e6))
+            self.actual_delay.record(int(actual_delay * 1e6))
+            self.size.record(size)
+
+    def merge(self, other: "StubTimings"):
+        with self._lock:
+            self.handling.merge(other.handling)
+            self.delay.merge(other.delay)
+            self.actual_delay.merge(other.actual_delay)
+            self.size.merge(other.size)
+
+    def locked(self) -> threading.Lock:
+        """Held while reading the histograms in place, to keep them still."""
+        return self._lock
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {"handling": self.handling.to_list(), "delay": self.delay.to_list(),
+                    "actual_delay": self.actual_delay.to_list(),
+                    "size": self.size.to_list()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StubTimings":
+        timings = cls()
+        for name in ("handling", "delay", "actual_delay", "size"):
+            setattr(timings, name, Histogram.from_list(data[name]))
+        return timings
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.handling.total,
+                "handling_ms": self.handling.summary(1e-3),
+                "delay_ms": self.delay.summary(1e-3),
+                "actual_delay_ms": self.actual_delay.summary(1e-3),
+                "response_bytes": self.size.summary(),
+            }
+
+
+class _Shard:
+    __slots__ = ("counts", "__weakref__")
+
+    def __init__(self):
+        self.counts: List[int] = []
+
+
+class HitCounters:
+    """
+    Counters addressed by slot number, incremented without a lock.
+
+    Each thread counts into its own list of slots, so increments never
+    contend; totals() sums the lists of all threads. When a thread ends, its
+    counts are folded into a shared list so they outlive it.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._shards: "weakref.WeakSet[_Shard]" = weakref.WeakSet()
+        # Counts left by threads that have ended.
+        self._retired: List[int] = []
+
+    def increment(self, slot: int):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+        counts = shard.counts
+        if slot >= len(counts):
+            # Extended in place: the list is shared with the thread's finalizer.
+            counts.extend([0] * (slot + 1 - len(counts)))
+        counts[slot] += 1
+
+    def totals(self, size: int) -> List[int]:
+        """The summed counts of slots 0 to size - 1."""
+        with self._lock:
+            shards = list(self._shards)
+            totals = [0] * size
+            for counts in [self._retired] + [shard.counts for shard in shards]:
+                for slot, count in enumerate(counts[:size]):
+                    totals[slot] += count
+        return totals
+
+    def clear(self, slot: int):
+        with self._lock:
+            for counts in [self._retired] + [shard.counts for shard in self._shards]:
+                if slot < len(counts):
+                    counts[slot] = 0
+
+    def clear_all(self):
+        with self._lock:
+            self._retired = []
+            for shard in self._shards:
+                shard.counts[:] = [0] * len(shard.counts)
+
+    def _new_shard(self) -> _Shard:
+        shard = _Shard()
+        with self._lock:
+            self._shards.add(shard)
+        # The shard lives as long as the thread's locals.
+        weakref.finalize(shard, self._retire, shard.counts)
+        self._local.shard = shard
+        return shard
 
-    def register_stub(self, method: str, path: str):
-        key = f"{method} {path}"
+    def _retire(self, counts: List[int]):
         with self._lock:
-            self._stubs[key] = StubRecord(method=method, path=path)
+            retired = self._retired
+            if len(retired) < len(counts):
+                retired.extend([0] * (len(counts) - len(retired)))
+            for slot, count in enumerate(counts):
+                if count:
+                    retired[slot] += count
+
+
+class RequestTracker:
+    """
+    Counts hits per registered stub, and the requests that matched no stub.
+
+    Each stub also gets latency and size histograms (see StubTimings) once
+    record_response() is first called for it.
+
+    Unmatched requests are aggregated by method and path, keeping at most
+    max_unmatched pairs; past that, the pair seen least recently is dropped,
+    though its requests still count towards the total. Optionally the last
+    unmatched_samples requests are also kept one by one.
+    """
+    def __init__(self, max_unmatched: int = DEFAULT_MAX_UNMATCHED,
+                 unmatched_samples: int = 0):
+        self._lock = threading.Lock()
+        # Registered stubs by slot; their hit counts live in _hits.
+        self._stubs: List[StubRecord] = []
+        self._slots: Dict[Tuple[str, str], int] = {}
+        self._hits = HitCounters()
+        # Requests refused by each stub's rate limit, by slot.
+        self._rate_limited = HitCounters()
+        # Slot 0 counts requests started, slot 1 requests finished.
+        self._in_flight = HitCounters()
+        # Histograms by slot, created on a stub's first response.
+        self._timings: List[Optional[StubTimings]] = []
+        # (method, path) -> UnmatchedRecord, least recently seen first.
+        self._unmatched: "OrderedDict[Tuple[str, str], UnmatchedRecord]" = OrderedDict()
+        self._unmatched_total = 0
+        self._samples: Optional[Deque[Tuple[str, str, float]]] = None
+        self.limit_unmatched(max_unmatched, unmatched_samples)
+
+    def limit_unmatched(self, max_paths: int, samples: int = 0):
+        """
+        Sets how much of the unmatched traffic is kept.
+
+        Args:
+            max_paths (int): Distinct method and path pairs to keep.
+            samples (int): Individual unmatched requests to keep, most recent
+                first. None are kept when 0.
+
+        Raises:
+            ValueError: If max_paths is less than 1 or samples is negative.
+        """
+        if max_paths < 1:
+            raise ValueError(f"max_paths must be at least 1, got {max_paths}")
+        if samples < 0:
+            raise ValueError(f"samples must not be negative, got {samples}")
+        with self._lock:
+            self.max_unmatched = max_paths
+            while len(self._unmatched) > max_paths:
+                self._unmatched.popitem(last=False)
+            self._samples = deque(self._samples or (), maxlen=samples) if samples else None
+
+    def register_stub(self, method: str, path: str) -> int:
+        """
+        Registers a stub, or resets the hit count of one registered before.
+
+        Returns:
+            int: The slot to pass to count_hit() for this stub.
+        """
+        with self._lock:
+            slot = self._slots.get((method, path))
+            if slot is None:
+                slot = len(self._stubs)
+                self._slots[(method, path)] = slot
+                self._stubs.append(StubRecord(method=method, path=path))
+                self._timings.append(None)
+            else:
+                self._hits.clear(slot)
+                self._rate_limited.clear(slot)
+                self._timings[slot] = None
+            return slot
+
+    def count_hit(self, slot: int):
+        """Records a hit on the stub registered at slot."""
+        self._hits.increment(slot)
+
+    def count_rate_limited(self, slot: int):
+        """Records a request the stub registered at slot refused with 429."""
+        self._rate_limited.increment(slot)
+
+    def request_started(self):
+        """Marks a request as in flight until request_finished() is called."""
+        self._in_flight.increment(0)
+
+    def request_finished(self):
+        self._in_flight.increment(1)
+
+    @property
+    def in_flight(self) -> int:
+        """Requests being answered, including those waiting out a delay."""
+        started, finished = self._in_flight.totals(2)
+        return started - finished
 
     def record_hit(self, method: str, path: str):
-        key = f"{method} {path}"
+        slot = self._slots.get((method, path))
+        if slot is not None:
+            self._hits.increment(slot)
+
+    def record_response(self, slot: int, handling: float, delay: float,
+                        actual_delay: float, size: int):
+        """
+        Records how a response of the stub registered at slot was served.
+
+        Args:
+            slot (int): The stub's slot, from register_stub().
+            handling (float): Seconds spent reading the request and writing the
+                response, the delay excluded.
+            delay (float): The delay the stub was configured with, in seconds.
+            actual_delay (float): Seconds between the response being ready and
+                being written, which is the delay plus any scheduling lag.
+            size (int): Bytes written for the response, headers included.
+        """
+        timings = self._timings[slot]
+        if timings is None:
+            with self._lock:
+                timings = self._timings[slot]
+                if timings is None:
+                    timings = self._timings[slot] = StubTimings()
+        timings.record(handling, delay, actual_delay, size)
+
+    def _stub_timings(self) -> Dict[Tuple[str, str], StubTimings]:
+        with self._lock:
+            return {(stub.method, stub.path): timings
+                    for stub, timings in zip(self._stubs, self._timings)
+                    if timings is not None}
+
+    def _stub_records(self) -> List[StubRecord]:
         with self._lock:
-            if key in self._stubs:
-                self._stubs[key].hit_count += 1
+            stubs = list(self._stubs)
+        hits = self._hits.totals(len(stubs))
+        return [StubRecord(s.method, s.path, count) for s, count in zip(stubs, hits)]
 
     def record_unmatched(self, method: str, path: str):
+        now = time.time()
+        key = (method, path)
         with self._lock:
-            self._unmatched.append(UnmatchedRecord(method=method, path=path))
+            self._unmatched_total += 1
+            record = self._unmatched.get(key)
+            if record is None:
+                self._unmatched[key] = UnmatchedRecord(method, path, 1, now, now)
+                if len(self._unmatched) > self.max_unmatched:
+                    self._unmatched.popitem(last=False)
+            else:
+                record.count += 1
+                record.last_seen = now
+                self._unmatched.move_to_end(key)
+            if self._samples is not None:
+                self._samples.append((method, path, now))
 
-    def report(self) -> dict:
+    def snapshot(self) -> dict:
+        """
+        Returns the raw tracker state as plain JSON-serializable data, so that
+        trackers living in other processes can be merged into one report.
+        """
+        stubs = self._stub_records()
+        timings = self._stub_timings()
+        limited = self._rate_limited.totals(len(stubs))
         with self._lock:
-            stubs = list(self._stubs.values())
-            unmatched = list(self._unmatched)
+            return {
+                "stubs": [[s.method, s.path, s.hit_count] for s in stubs],
+                "rate_limited": [[s.method, s.path, count]
+                                 for s, count in zip(stubs, limited) if count],
+                "unmatched": [[r.method, r.path, r.count, r.first_seen, r.last_seen]
+                              for r in self._unmatched.values()],
+                "unmatched_total": self._unmatched_total,
+                "unmatched_samples": [list(sample) for sample in self._samples or ()],
+                "timings": [[method, path, stub_timings.to_dict()]
+                            for (method, path), stub_timings in timings.items()],
+            }
+
+    def totals(self, peer_snapshots: Iterable[dict] = ()) -> Tuple[List[StubTotals], int]:
+        """
+        The counters of every stub, and the number of unmatched requests,
+        with those of peer_snapshots added in.
+
+        Without peers the timings are this process's own, still being recorded
+        into; read them under StubTimings.locked().
+        """
+        records = self._stub_records()
+        limited = self._rate_limited.totals(len(records))
+        timings = self._stub_timings()
+        peer_snapshots = list(peer_snapshots)
+        if peer_snapshots:
+            # Merged into copies, leaving this process's histograms alone.
+            timings = {key: StubTimings.from_dict(value.to_dict())
+                       for key, value in timings.items()}
+        stubs = [StubTotals(r.method, r.path, r.hit_count, count,
+                            timings.get((r.method, r.path)))
+                 for r, count in zip(records, limited)]
+        with self._lock:
+            unmatched = self._unmatched_total
+
+        if peer_snapshots:
+            by_key = {(stub.method, stub.path): stub for stub in stubs}
+            for snapshot in peer_snapshots:
+                for method, path, hit_count in snapshot["stubs"]:
+                    stub = by_key.get((method, path))
+                    if stub is None:
+                        stub = by_key[(method, path)] = StubTotals(method, path, 0, 0, None)
+                        stubs.append(stub)
+                    stub.hit_count += hit_count
+                for method, path, count in snapshot.get("rate_limited", ()):
+                    if (method, path) in by_key:
+                        by_key[(method, path)].rate_limited += count
+                for method, path, data in snapshot.get("timings", ()):
+                    stub = by_key.get((method, path))
+                    if stub is None:
+                        continue
+                    if stub.timings is None:
+                        stub.timings = StubTimings.from_dict(data)
+                    else:
+                        stub.timings.merge(StubTimings.from_dict(data))
+                unmatched += snapshot["unmatched_total"]
+        return stubs, unmatched
+
+    def report(self, peer_snapshots: Iterable[dict] = ()) -> dict:
+        stubs = self._stub_records()
+        timings = self._stub_timings()
+        with self._lock:
+            unmatched = [UnmatchedRecord(r.method, r.path, r.count, r.first_seen, r.last_seen)
+                         for r in self._unmatched.values()]
+            total = self._unmatched_total
+            samples = list(self._samples) if self._samples is not None else None
+
+        peer_snapshots = list(peer_snapshots)
+        if peer_snapshots:
+            # Merged into copies, leaving this process's histograms alone.
+            timings = {key: StubTimings.from_dict(value.to_dict())
+                       for key, value in timings.items()}
+            by_key = {(s.method, s.path): s for s in stubs}
+            misses = {(r.method, r.path): r for r in unmatched}
+            for snapshot in peer_snapshots:
+                for method, path, hit_count in snapshot["stubs"]:
+                    if (method, path) in by_key:
+                        by_key[(method, path)].hit_count += hit_count
+                    else:
+                        by_key[(method, path)] = StubRecord(method, path, hit_count)
+                        stubs.append(by_key[(method, path)])
+                for method, path, count, first_seen, last_seen in snapshot["unmatched"]:
+                    record = misses.get((method, path))
+                    if record is None:
+                        misses[(method, path)] = UnmatchedRecord(method, path, count,
+                                                                 first_seen, last_seen)
+                    else:
+                        record.count += count
+                        record.first_seen = min(record.first_seen, first_seen)
+                        record.last_seen = max(record.last_seen, last_seen)
+                for method, path, data in snapshot.get("timings", ()):
+                    peer = StubTimings.from_dict(data)
+                    if (method, path) in timings:
+                        timings[(method, path)].merge(peer)
+                    else:
+                        timings[(method, path)] = peer
+                total += snapshot["unmatched_total"]
+                if samples is not None:
+                    samples.extend(tuple(sample) for sample in snapshot["unmatched_samples"])
+            # Keep the merged report as small as any one worker's.
+            unmatched = sorted(misses.values(), key=lambda r: r.last_seen)[-self.max_unmatched:]
+            if samples is not None:
+                samples = sorted(samples, key=lambda sample: sample[2])[-self._samples.maxlen:]
+        unmatched.sort(key=lambda r: r.first_seen)
 
         used = [s for s in stubs if s.hit_count > 0]
         unused = [s for s in stubs if s.hit_count == 0]
 
-        return {
+        report = {
             "summary": {
                 "total_stubs": len(stubs),
                 "matched_stubs": len(used),
-                "unmatched_requests": len(unmatched),
+                "unmatched_requests": total,
+                "unmatched_paths": len(unmatched),
             },
-            "stubs": [
-                {"method": s.method, "path": s.path, "hit_count": s.hit_count}
-                for s in stubs
-            ],
+            "stubs": [_stub_entry(s, timings.get((s.method, s.path))) for s in stubs],
             "unused_stubs": [
                 {"method": s.method, "path": s.path}
                 for s in unused
             ],
             "unmatched_requests": [
-                {"method": r.method, "path": r.path, "timestamp": r.timestamp}
+                {"method": r.method, "path": r.path, "count": r.count,
+                 "first_seen": _timestamp(r.first_seen),
+                 "last_seen": _timestamp(r.last_seen),
+                 # The single timestamp of reports before aggregation.
+                 "timestamp": _timestamp(r.first_seen)}
                 for r in unmatched
             ],
         }
+        if samples is not None:
+            report["unmatched_samples"] = [
+                {"method": method, "path": path, "timestamp": _timestamp(seen)}
+                for method, path, seen in samples
+            ]
+        return report
 
     def reset(self):
+        self._hits.clear_all()
+        self._rate_limited.clear_all()
         with self._lock:
-            for s in self._stubs.values():
-                s.hit_count = 0
+            self._timings = [None] * len(self._timings)
             self._unmatched.clear()
+            self._unmatched_total = 0
+            if self._samples is not None:
+                self._samples.clear()
+
+
+def _stub_entry(stub: StubRecord, timings: Optional[StubTimings]) -> dict:
+    entry = {"method": stub.method, "path": stub.path, "hit_count": stub.hit_count}
+    if timings is not None:
+        entry["timings"] = timings.summary()
+    return entry
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -10,3 +10,22 @@ def mimicker_server():
     yield server
 
     server.shutdown()
+
+
+@pytest.fixture(params=[
+    {"engine": "threaded"},
+    {"engine": "threaded", "threads": 1},
+    {"engine": "asyncio"},
+], ids=["threaded", "pooled", "asyncio"])
+def engine(request) -> dict:
+    """The mimicker() options of each engine: threaded, pooled and asyncio."""
+    return request.param
+
+
+@pytest.fixture
+def server(engine):
+    """A server on a free port, once per engine."""
+    server = mimicker(0, **engine)
+    yield server
+    server.shutdown()
+
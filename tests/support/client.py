@@ -1,5 +1,10 @@
+import socket
+from typing import Union
+
 import requests
 
+from mimicker.server import MimickerServer
+
 
 class Client:
 
@@ -48,3 +53,20 @@ class Client:
 
     def patch_as_text(self, path, body, **kwargs):
         return requests.patch(f"{self.root + path}", data=body, headers={"Content-Type": "text/plain"}, **kwargs)
+
+
+def url(server: Union[MimickerServer, int], path: str = "") -> str:
+    """The URL of path on a running server, given the server or its port."""
+    return f"http://localhost:{_port(server)}{path}"
+
+
+def client_for(server: Union[MimickerServer, int]) -> Client:
+    return Client(url(server))
+
+
+def connect(server: Union[MimickerServer, int]) -> socket.socket:
+    return socket.create_connection(("localhost", _port(server)), timeout=2)
+
+
+def _port(server: Union[MimickerServer, int]) -> int:
+    return server if isinstance(server, int) else server.get_port()
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from hamcrest import assert_that, is_, has_entries, has_length, contains_inanyorder
+from hamcrest.library.number.ordering_comparison import greater_than, less_than
+
+from mimicker.access_log import AccessLog, worker_path
+from mimicker.mimicker import mimicker, get
+from tests.support.client import client_for
+
+
+def _lines(path) -> list:
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_written_as_json_lines(tmp_path):
+    path = tmp_path / "access.log"
+    access_log = AccessLog(str(path))
+    access_log.record("GET", "/items/1?full=1", "/items/{id}", 200, 120, 0.0015)
+    access_log.record("POST", "/missing", None, 404, 40, 0.0002)
+    access_log.close()
+
+    first, second = _lines(path)
+    assert_that(first, has_entries({"method": "GET", "path": "/items/1?full=1",
+                                    "stub": "/items/{id}", "status": 200,
+                                    "bytes": 120, "latency_ms": 1.5}))
+    assert_that(second, has_entries({"stub": None, "status": 404}))
+    assert_that(first["time"], greater_than(0))
+
+
+def test_records_are_flushed_in_the_background(tmp_path):
+    path = tmp_path / "access.log"
+    access_log = AccessLog(str(path), flush_interval=0.01)
+    access_log.record("GET", "/", None, 200, 10, 0.)
+    try:
+        access_log._closed.wait(0.2)
+        assert_that(_lines(path), has_length(1))
+    finally:
+        access_log.close()
+
+
+def test_close_is_idempotent(tmp_path):
+    access_log = AccessLog(str(tmp_path / "access.log"))
+    access_log.close()
+    access_log.close()
+
+
+def test_existing_log_is_appended_to(tmp_path):
+    path = tmp_path / "access.log"
+    path.write_text('{"earlier": true}\n')
+    access_log = AccessLog(str(path))
+    access_log.record("GET", "/", None, 200, 10, 0.)
+    access_log.close()
+
+    assert_that(_lines(path), has_length(2))
+
+
+def test_sampling_records_a_fraction_of_requests(tmp_path):
+    path = tmp_path / "access.log"
+    access_log = AccessLog(str(path), sample_rate=0.1)
+    for _ in range(2000):
+        access_log.record("GET", "/", None, 200, 10, 0.)
+    access_log.close()
+
+    count = len(_lines(path))
+    assert_that(count, greater_than(100))
+    assert_that(count, less_than(300))
+
+
+@pytest.mark.parametrize("rate", [0, -0.5, 1.5])
+def test_invalid_sample_rate_is_rejected(tmp_path, rate):
+    with pytest.raises(ValueError):
+        AccessLog(str(tmp_path / "access.log"), sample_rate=rate)
+
+
+def test_log_is_rotated_past_max_bytes(tmp_path):
+    path = tmp_path / "access.log"
+    access_log = AccessLog(str(path), max_bytes=1000, backup_count=2)
+    for i in range(50):
+        access_log.record("GET", f"/items/{i}", None, 200, 10, 0.)
+    access_log.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert_that(files, is_(["access.log", "access.log.1", "access.log.2"]))
+    for name in files:
+        assert_that((tmp_path / name).stat().st_size, less_than(1001))
+    # The live file carries on where the most recent backup stopped.
+    newest = [int(entry["path"].rsplit("/", 1)[1]) for entry in _lines(path)]
+    previous = [int(entry["path"].rsplit("/", 1)[1])
+                for entry in _lines(tmp_path / "access.log.1")]
+    assert_that(newest[-1], is_(49))
+    assert_that(newest[0], is_(previous[-1] + 1))
+
+
+def test_worker_path_keeps_the_extension():
+    assert_that(worker_path("/var/log/access.log", 2), is_("/var/log/access.worker-2.log"))
+    assert_that(worker_path("access", 0), is_("access.worker-0"))
+
+
+@pytest.fixture
+def logged_server(engine, tmp_path):
+    path = tmp_path / "access.log"
+    server = mimicker(0, access_log=str(path), **engine)
+    server.routes(get("/items/{id}").body({"id": "{id}"}))
+    yield server, path
+    server.shutdown()
+
+
+def test_engines_write_one_line_per_request(logged_server):
+    server, path = logged_server
+    client = client_for(server)
+    client.get("/items/7?full=1")
+    client.get("/nowhere")
+    client.get("/__mimicker__/health")
+    server.shutdown()
+
+    entries = _lines(path)
+    assert_that(entries, contains_inanyorder(
+        has_entries({"method": "GET", "path": "/items/7?full=1", "stub": "/items/{id}",
+                     "status": 200}),
+        has_entries({"method": "GET", "path": "/nowhere", "stub": None, "status": 404}),
+    ))
+    for entry in entries:
+        assert_that(entry["bytes"], greater_than(0))
+        assert_that(entry["latency_ms"], greater_than(0))
+
+
+def test_access_log_defaults_to_environment(tmp_path, monkeypatch):
+    path = tmp_path / "env.log"
+    monkeypatch.setenv("MIMICKER_ACCESS_LOG", str(path))
+    server = mimicker(0)
+    try:
+        client_for(server).get("/x")
+    finally:
+        server.shutdown()
+
+    assert_that(_lines(path), has_length(1))
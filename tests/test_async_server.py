@@ -0,0 +1,93 @@
+import socket
+from time import perf_counter
+
+import pytest
+from hamcrest import assert_that, is_, equal_to, has_entry, contains_string
+from hamcrest.library.number.ordering_comparison import greater_than_or_equal_to
+
+from mimicker.mimicker import mimicker, get, post, MimickerServer
+from tests.support.client import client_for
+
+
+@pytest.fixture(scope="module")
+def asyncio_server():
+    server = mimicker(0, engine="asyncio")
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def client(asyncio_server):
+    return client_for(asyncio_server)
+
+
+def _raw_exchange(port: int, payload: bytes) -> bytes:
+    """Sends raw bytes and reads until the server closes the connection."""
+    with socket.create_connection(("localhost", port), timeout=2) as sock:
+        sock.sendall(payload)
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return data
+            data += chunk
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        MimickerServer(0, engine="gevent")
+
+
+def test_get_body_as_json(asyncio_server, client):
+    asyncio_server.routes(get("/aio/json").body({"message": "hi"}))
+    resp = client.get("/aio/json")
+    assert_that(resp.status_code, is_(200))
+    assert_that(resp.headers, has_entry("Content-Type", "application/json"))
+    assert_that(resp.json(), equal_to({"message": "hi"}))
+
+
+def test_path_params(asyncio_server, client):
+    asyncio_server.routes(get("/aio/users/{id}").body({"id": "{id}"}))
+    assert_that(client.get("/aio/users/7").json(), equal_to({"id": "7"}))
+
+
+def test_post_payload_reaches_response_func(asyncio_server, client):
+    def echo(**kwargs):
+        return 201, {"echo": kwargs["payload"]}
+
+    asyncio_server.routes(post("/aio/echo").response_func(echo))
+    resp = client.post_as_json("/aio/echo", {"a": 1})
+    assert_that(resp.status_code, is_(201))
+    assert_that(resp.json(), equal_to({"echo": {"a": 1}}))
+
+
+def test_404_for_unknown_path(client):
+    assert_that(client.get("/aio/missing").status_code, is_(404))
+
+
+def test_health_endpoint(client):
+    assert_that(client.get("/__mimicker__/health").json(), has_entry("status", "up"))
+
+
+def test_delay(asyncio_server, client):
+    asyncio_server.routes(get("/aio/slow").delay(0.1).body("late"))
+    start = perf_counter()
+    resp = client.get("/aio/slow")
+    assert_that(perf_counter() - start, is_(greater_than_or_equal_to(0.1)))
+    assert_that(resp.text, is_("late"))
+
+
+def test_pipelined_requests_on_one_connection(asyncio_server):
+    asyncio_server.routes(get("/aio/pipe/{n}").body({"n": "{n}"}))
+    data = _raw_exchange(
+        asyncio_server.get_port(),
+        b"GET /aio/pipe/1 HTTP/1.1\r\nHost: localhost\r\n\r\n"
+        b"GET /aio/pipe/2 HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+    )
+    assert_that(data.count(b"HTTP/1.1 200 OK"), is_(2))
+    assert_that(data.decode(), contains_string('{"n": "2"}'))
+
+
+def test_malformed_request_line_returns_400(asyncio_server):
+    data = _raw_exchange(asyncio_server.get_port(), b"NONSENSE\r\n\r\n")
+    assert_that(data.decode(), contains_string("400 Bad Request"))
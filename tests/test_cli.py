@@ -137,6 +137,33 @@ def test_text_report_lists_unmatched_requests(capsys):
     assert "/unknown" in out
 
 
+def test_text_report_shows_how_often_a_path_was_unmatched(capsys):
+    report = dict(_SAMPLE_REPORT, unmatched_requests=[
+        {"method": "GET", "path": "/unknown", "count": 7,
+         "first_seen": "2024-01-01T00:00:00Z", "last_seen": "2024-01-01T00:05:00Z",
+         "timestamp": "2024-01-01T00:00:00Z"}
+    ])
+    _print_text_report(report)
+    out = capsys.readouterr().out
+    assert "7 times" in out
+    assert "2024-01-01T00:05:00Z" in out
+
+
+def test_text_report_shows_stub_timings(capsys):
+    summary = {"p50": 1, "p90": 2, "p99": 3, "max": 4}
+    report = dict(_SAMPLE_REPORT, stubs=[
+        {"method": "GET", "path": "/used", "hit_count": 3, "timings": {
+            "count": 3, "handling_ms": {"p50": 0.125, "p90": 0.25, "p99": 0.5, "max": 0.5},
+            "delay_ms": {"p50": 500, "p90": 500, "p99": 500, "max": 500},
+            "actual_delay_ms": summary, "response_bytes": summary}},
+        {"method": "GET", "path": "/unused", "hit_count": 0},
+    ])
+    _print_text_report(report)
+    out = capsys.readouterr().out
+    assert "0.125 / 0.25 / 0.5 / 0.5 ms" in out
+    assert "configured 500 / 500 / 500 / 500 ms" in out
+
+
 def test_github_summary_is_markdown(capsys):
     _print_github_summary(_SAMPLE_REPORT)
     out = capsys.readouterr().out
@@ -260,6 +287,110 @@ def test_cmd_serve_custom_port():
     mock_mimicker.assert_called_once_with(9191)
 
 
+def test_cmd_serve_engine_option():
+    args = argparse.Namespace(port=9191, config=None, stub=None, engine="asyncio")
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, engine="asyncio")
+
+
+def test_cmd_serve_match_cache_option():
+    args = argparse.Namespace(port=9191, config=None, stub=None, match_cache=512)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, match_cache_size=512)
+
+
+@pytest.mark.parametrize("option", ["--threads", "--match-cache", "--backlog",
+                                    "--send-buffer", "--recv-buffer"])
+@pytest.mark.parametrize("value", ["0", "-1"])
+def test_cmd_serve_rejects_non_positive_sizes(option, value):
+    with patch.object(sys, "argv", ["mimicker", "serve", option, value]), \
+         patch("mimicker.cli.cmd_serve") as mock_serve, \
+         pytest.raises(SystemExit) as exc_info:
+        main()
+    assert exc_info.value.code == 2
+    mock_serve.assert_not_called()
+
+
+def test_cmd_serve_body_size_options():
+    args = argparse.Namespace(port=9191, config=None, stub=None,
+                              max_body_size=4096, spool_threshold=1024)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, max_body_size=4096,
+                                          spool_threshold=1024)
+
+
+def test_cmd_serve_body_size_options_accept_zero():
+    args = argparse.Namespace(port=9191, config=None, stub=None,
+                              max_body_size=0, spool_threshold=0)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, max_body_size=0, spool_threshold=0)
+
+
+def test_cmd_serve_compress_min_size_option():
+    args = argparse.Namespace(port=9191, config=None, stub=None, compress_min_size=0)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, compress_min_size=0)
+
+
+def test_cmd_serve_socket_options():
+    args = argparse.Namespace(port=9191, config=None, stub=None, backlog=512,
+                              send_buffer=65536, recv_buffer=None, no_tcp_nodelay=True)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, backlog=512, send_buffer=65536,
+                                          tcp_nodelay=False)
+
+
+def test_cmd_serve_access_log():
+    args = argparse.Namespace(port=9191, config=None, stub=None, access_log="access.log",
+                              access_log_sample=0.1, access_log_max_bytes=0)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, access_log="access.log",
+                                          access_log_sample=0.1, access_log_max_bytes=0)
+
+
+def test_cmd_serve_unmatched_limits():
+    args = argparse.Namespace(port=9191, config=None, stub=None, max_unmatched=50,
+                              unmatched_samples=10)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, max_unmatched=50, unmatched_samples=10)
+
+
+def test_cmd_serve_unmatched_limits_accept_zero():
+    args = argparse.Namespace(port=9191, config=None, stub=None, max_unmatched=0,
+                              unmatched_samples=0)
+    with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
+        mock_mimicker.return_value = _make_mock_server()
+        cmd_serve(args)
+    mock_mimicker.assert_called_once_with(9191, max_unmatched=0, unmatched_samples=0)
+
+
+def test_cmd_serve_workers_forks_prefork_server():
+    args = argparse.Namespace(port=9191, config=None, stub="GET /x -> 200",
+                              engine=None, threads=None, workers=4)
+    with patch("mimicker.cli.serve_prefork", return_value=0) as mock_prefork, \
+         patch("mimicker.cli.mimicker") as mock_mimicker:
+        cmd_serve(args)
+    mock_mimicker.assert_not_called()
+    port, routes, workers = mock_prefork.call_args.args
+    assert (port, len(routes), workers) == (9191, 1, 4)
+
+
 def test_cmd_serve_keyboard_interrupt_shuts_down():
     args = argparse.Namespace(port=8080, config=None, stub=None)
     with patch("mimicker.cli.mimicker") as mock_mimicker, patch("signal.signal"):
@@ -0,0 +1,116 @@
+import gzip
+import zlib
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, none, has_item
+
+from mimicker.compression import compress_variants, negotiate
+from mimicker.mimicker import mimicker, get
+from mimicker.request import Request
+from mimicker.response import prepare
+from mimicker.stub_group import StubGroup
+from tests.support.client import url
+
+_BIG = {"items": [{"id": n, "name": f"item {n}"} for n in range(200)]}
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("deflate", "deflate"),
+    ("gzip, deflate", "gzip"),
+    ("deflate;q=1, gzip;q=0.5", "deflate"),
+    ("gzip;q=0", None),
+    ("br", None),
+    ("*", "gzip"),
+    ("*;q=0.5, gzip;q=0", "deflate"),
+    ("gzip;q=0.5, identity", None),
+    ("GZIP;Q=1", "gzip"),
+    ("gzip;q=oops, deflate", "deflate"),
+])
+def test_negotiate(header, expected):
+    assert_that(negotiate(header, {"gzip", "deflate"}), is_(expected))
+
+
+def test_negotiate_only_picks_available_codings():
+    assert_that(negotiate("deflate, gzip", {"gzip"}), is_("gzip"))
+
+
+def test_compress_variants_decompress_to_the_body():
+    body = b"hello " * 100
+    variants = compress_variants(body)
+    assert_that(gzip.decompress(variants["gzip"]), is_(body))
+    assert_that(zlib.decompress(variants["deflate"]), is_(body))
+
+
+def test_compress_variants_skip_codings_that_do_not_shrink():
+    assert_that(compress_variants(b"x"), is_({}))
+
+
+def test_prepare_precompresses_static_bodies_past_the_threshold():
+    template = prepare(200, _BIG, compress_min_size=100)
+    gzipped = template.encoded["gzip"]
+    assert_that(gzip.decompress(gzipped.body), is_(template.static.body))
+    assert_that(gzipped.headers, has_item(("Content-Encoding", "gzip")))
+    assert_that(template.static.headers, has_item(("Vary", "Accept-Encoding")))
+
+
+@pytest.mark.parametrize("status, body, headers", [
+    (200, {"small": True}, None),
+    (200, {"id": "{id}", "pad": "x" * 500}, None),
+    (204, _BIG, None),
+    (200, _BIG, [("Content-Encoding", "br")]),
+])
+def test_prepare_leaves_some_bodies_uncompressed(status, body, headers):
+    template = prepare(status, body, headers, compress_min_size=100, param_names={"id"})
+    assert_that(template.encoded, is_(none()))
+
+
+def test_render_picks_variant_from_accept_encoding():
+    template = prepare(200, _BIG, compress_min_size=100)
+    request = Request("GET", "/", {"Accept-Encoding": "deflate"})
+    assert_that(template.render({}, request), is_(template.encoded["deflate"]))
+    assert_that(template.render({}, Request("GET", "/", {})), is_(template.static))
+
+
+def test_enable_compression_reprepares_existing_stubs():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/big", 200, _BIG)
+    stub, _ = stub_group.match("GET", "/big")
+    assert_that(stub_group.template(stub).encoded, is_(none()))
+    stub_group.enable_compression(100)
+    assert_that(sorted(stub_group.template(stub).encoded), has_item("gzip"))
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = mimicker(0, compress_min_size=256)
+    server.routes(
+        get("/big").body(_BIG),
+        get("/small").body({"ok": True}),
+    )
+    yield server
+    server.shutdown()
+
+
+def test_server_sends_gzip_to_clients_that_accept_it(server):
+    resp = requests.get(url(server, "/big"),
+                        headers={"Accept-Encoding": "gzip"})
+    assert_that(resp.headers["Content-Encoding"], is_("gzip"))
+    assert_that(resp.headers["Vary"], is_("Accept-Encoding"))
+    assert_that(resp.json(), is_(_BIG))
+
+
+def test_server_sends_plain_body_without_accept_encoding(server):
+    resp = requests.get(url(server, "/big"),
+                        headers={"Accept-Encoding": "identity"})
+    assert_that("Content-Encoding" in resp.headers, is_(False))
+    assert_that(resp.json(), is_(_BIG))
+
+
+def test_server_does_not_compress_small_bodies(server):
+    resp = requests.get(url(server, "/small"),
+                        headers={"Accept-Encoding": "gzip"})
+    assert_that("Content-Encoding" in resp.headers, is_(False))
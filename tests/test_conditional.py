@@ -0,0 +1,123 @@
+import pytest
+import requests
+from hamcrest import assert_that, is_, has_item, is_not, none
+
+from mimicker.mimicker import mimicker, get, post
+from mimicker.request import Request
+from mimicker.response import is_not_modified, prepare
+from mimicker.sequence import step
+from tests.support.client import url
+
+_BIG = {"items": list(range(500))}
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, False),
+    ({"If-None-Match": '"abc"'}, True),
+    ({"If-None-Match": 'W/"abc"'}, True),
+    ({"If-None-Match": '"x", "abc"'}, True),
+    ({"If-None-Match": "*"}, True),
+    ({"If-None-Match": '"other"'}, False),
+    ({"If-Modified-Since": "Thu, 01 Jan 1970 00:16:40 GMT"}, True),
+    ({"If-Modified-Since": "Thu, 01 Jan 1970 00:16:39 GMT"}, False),
+    ({"If-Modified-Since": "not a date"}, False),
+    # If-None-Match takes precedence over If-Modified-Since.
+    ({"If-None-Match": '"other"', "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+     False),
+])
+def test_is_not_modified(headers, expected):
+    request = Request("GET", "/", headers)
+    assert_that(is_not_modified(request, '"abc"', 1000), is_(expected))
+
+
+def test_is_not_modified_only_for_get():
+    assert_that(is_not_modified(Request("POST", "/", {"If-None-Match": "*"}), '"abc"', 0),
+                is_(False))
+
+
+def test_static_body_answers_matching_etag_with_304():
+    template = prepare(200, {"a": 1}, [("Cache-Control", "max-age=60")], etag=True)
+    etag = dict(template.static.headers)["ETag"]
+    not_modified = template.render({}, Request("GET", "/", {"If-None-Match": etag}))
+    assert_that(not_modified.status, is_(304))
+    assert_that(not_modified.headers, has_item(("ETag", etag)))
+    assert_that(not_modified.headers, has_item(("Cache-Control", "max-age=60")))
+    assert_that(dict(not_modified.headers).get("Content-Type"), is_(none()))
+
+
+def test_compressed_variants_have_their_own_etag():
+    template = prepare(200, _BIG, compress_min_size=100, etag=True)
+    plain = dict(template.static.headers)["ETag"]
+    gzipped = dict(template.encoded["gzip"].headers)["ETag"]
+    assert_that(gzipped, is_not(plain))
+    request = Request("GET", "/", {"Accept-Encoding": "gzip", "If-None-Match": plain})
+    assert_that(template.render({}, request).status, is_(200))
+    request = Request("GET", "/", {"Accept-Encoding": "gzip", "If-None-Match": gzipped})
+    assert_that(template.render({}, request).status, is_(304))
+
+
+@pytest.mark.parametrize("status, body, headers", [
+    (201, {"id": "{id}"}, None),
+    (204, {"a": 1}, None),
+    (404, {"a": 1}, None),
+    (200, {"a": 1}, [("ETag", '"mine"')]),
+])
+def test_no_validators(status, body, headers):
+    assert_that(prepare(status, body, headers, etag=True, param_names={"id"}).validators,
+                is_(none()))
+
+
+@pytest.fixture(scope="module")
+def server(tmp_path_factory):
+    fixture = tmp_path_factory.mktemp("conditional") / "data.json"
+    fixture.write_text('{"from": "file"}')
+    server = mimicker(0)
+    server.routes(
+        get("/cached").body({"cached": True}).etag(),
+        get("/uncached").body({"cached": False}),
+        get("/file").body_file(str(fixture)).etag(),
+        get("/steps").sequence(step().body("one"), step().body("two")).etag(),
+        post("/cached").body({"cached": True}).etag(),
+    )
+    yield server
+    server.shutdown()
+
+
+def test_revalidation_gets_304_without_a_body(server):
+    first = requests.get(url(server, "/cached"))
+    again = requests.get(url(server, "/cached"),
+                         headers={"If-None-Match": first.headers["ETag"]})
+    assert_that(again.status_code, is_(304))
+    assert_that(again.content, is_(b""))
+    assert_that(again.headers["ETag"], is_(first.headers["ETag"]))
+
+
+def test_if_modified_since_gets_304(server):
+    first = requests.get(url(server, "/cached"))
+    again = requests.get(url(server, "/cached"),
+                         headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert_that(again.status_code, is_(304))
+
+
+def test_etag_is_off_by_default(server):
+    resp = requests.get(url(server, "/uncached"), headers={"If-None-Match": "*"})
+    assert_that(resp.status_code, is_(200))
+    assert_that("ETag" in resp.headers, is_(False))
+
+
+def test_file_body_revalidation(server):
+    first = requests.get(url(server, "/file"))
+    again = requests.get(url(server, "/file"),
+                         headers={"If-None-Match": first.headers["ETag"]})
+    assert_that(again.status_code, is_(304))
+
+
+def test_sequence_steps_have_distinct_etags(server):
+    one = requests.get(url(server, "/steps")).headers["ETag"]
+    two = requests.get(url(server, "/steps")).headers["ETag"]
+    assert_that(one, is_not(two))
+
+
+def test_non_get_requests_are_not_conditional(server):
+    resp = requests.post(url(server, "/cached"), headers={"If-None-Match": "*"})
+    assert_that(resp.status_code, is_(200))
@@ -117,6 +117,20 @@ def test_validate_sequence_not_a_list():
     assert any("sequence" in e for e in errors)
 
 
+def test_validate_body_file_with_body():
+    data = {"routes": [{"method": "GET", "path": "/x", "status": 200,
+                        "body": "inline", "body_file": "data.bin"}]}
+    errors = validate_config(data)
+    assert any("mutually exclusive" in e for e in errors)
+
+
+def test_validate_body_file_in_sequence_step():
+    data = {"routes": [{"method": "GET", "path": "/x",
+                        "sequence": [{"status": 200, "body_file": 42}]}]}
+    errors = validate_config(data)
+    assert any("sequence[0]" in e and "body_file" in e for e in errors)
+
+
 # ── build_routes ──────────────────────────────────────────────────────────────
 
 def test_build_routes_count(multi_route_yaml):
@@ -235,3 +249,37 @@ def test_build_routes_produces_same_route_as_dsl(simple_yaml):
     assert yaml_route["path"] == dsl_route["path"]
     assert yaml_route["status"] == dsl_route["status"]
     assert yaml_route["body"] == dsl_route["body"]
+
+
+def test_build_routes_body_file_is_relative_to_config(tmp_path):
+    p = tmp_path / "files.yaml"
+    p.write_text(
+        "routes:\n"
+        "  - method: GET\n"
+        "    path: /export\n"
+        "    status: 200\n"
+        "    body_file: fixtures/export.csv\n"
+    )
+    data = load_config(str(p))
+    routes = build_routes(data, str(tmp_path))
+    assert routes[0].build()["body"].path == str(tmp_path / "fixtures" / "export.csv")
+
+
+def test_build_routes_etag_toggle(tmp_path):
+    p = tmp_path / "etag.yaml"
+    p.write_text(
+        "routes:\n"
+        "  - method: GET\n"
+        "    path: /fresh\n"
+        "    status: 200\n"
+        "    etag: false\n"
+    )
+    routes = build_routes(load_config(str(p)))
+    assert routes[0].build()["etag"] is False
+
+
+def test_validate_config_rejects_non_bool_etag():
+    errors = validate_config({"routes": [
+        {"method": "GET", "path": "/x", "etag": "false"},
+    ]})
+    assert any("'etag' must be true or false" in e for e in errors)
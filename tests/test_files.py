@@ -0,0 +1,138 @@
+import os
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, same_instance, not_
+
+from mimicker.files import FileBody, RangeNotSatisfiable, byte_range
+from mimicker.mimicker import get
+from mimicker.sequence import step
+from tests.support.client import url
+
+_LARGE = bytes(range(256)) * 1024  # 256 KiB, past the inline size
+
+
+@pytest.fixture(scope="module")
+def fixtures(tmp_path_factory):
+    root = tmp_path_factory.mktemp("fixtures")
+    (root / "large.bin").write_bytes(_LARGE)
+    (root / "hello.txt").write_text("hello, file")
+    (root / "empty.json").write_bytes(b"")
+    return root
+
+
+@pytest.fixture
+def server(server, fixtures):
+    server.routes(
+        get("/large").body_file(str(fixtures / "large.bin")),
+        get("/hello").body_file(str(fixtures / "hello.txt")),
+        get("/empty").body_file(str(fixtures / "empty.json")),
+        get("/missing").body_file(str(fixtures / "missing.bin")),
+        get("/steps").sequence(step().body_file(str(fixtures / "hello.txt"))),
+        get("/dynamic").response_func(
+            lambda **kwargs: (200, FileBody(str(fixtures / "hello.txt")))),
+    )
+    return server
+
+
+def test_large_file_is_served_whole(server):
+    resp = requests.get(url(server, "/large"))
+    assert_that(resp.status_code, is_(200))
+    assert_that(resp.content == _LARGE, is_(True))
+    assert_that(resp.headers["Content-Length"], is_(str(len(_LARGE))))
+    assert_that(resp.headers["Accept-Ranges"], is_("bytes"))
+    assert_that(resp.headers["Content-Type"], is_("application/octet-stream"))
+
+
+def test_small_file_gets_guessed_content_type_and_validators(server):
+    resp = requests.get(url(server, "/hello"))
+    assert_that(resp.text, is_("hello, file"))
+    assert_that(resp.headers["Content-Type"], is_("text/plain"))
+    assert_that("ETag" in resp.headers and "Last-Modified" in resp.headers, is_(True))
+
+
+def test_empty_file(server):
+    resp = requests.get(url(server, "/empty"))
+    assert_that(resp.status_code, is_(200))
+    assert_that(resp.content, is_(b""))
+
+
+def test_range_request_gets_partial_content(server):
+    resp = requests.get(url(server, "/large"), headers={"Range": "bytes=1000-200999"})
+    assert_that(resp.status_code, is_(206))
+    assert_that(resp.content == _LARGE[1000:201000], is_(True))
+    assert_that(resp.headers["Content-Range"], is_(f"bytes 1000-200999/{len(_LARGE)}"))
+
+
+def test_suffix_range(server):
+    resp = requests.get(url(server, "/hello"), headers={"Range": "bytes=-4"})
+    assert_that(resp.status_code, is_(206))
+    assert_that(resp.text, is_("file"))
+
+
+def test_unsatisfiable_range(server):
+    resp = requests.get(url(server, "/hello"), headers={"Range": "bytes=100-"})
+    assert_that(resp.status_code, is_(416))
+    assert_that(resp.headers["Content-Range"], is_("bytes */11"))
+
+
+def test_stale_if_range_gets_whole_file(server):
+    resp = requests.get(url(server, "/hello"),
+                        headers={"Range": "bytes=0-4", "If-Range": '"stale"'})
+    assert_that(resp.status_code, is_(200))
+    assert_that(resp.text, is_("hello, file"))
+
+
+def test_keep_alive_after_file_responses(server):
+    with requests.Session() as session:
+        assert_that(len(session.get(url(server, "/large")).content), is_(len(_LARGE)))
+        assert_that(session.get(url(server, "/hello")).text, is_("hello, file"))
+
+
+def test_missing_file_is_a_server_error(server):
+    assert_that(requests.get(url(server, "/missing")).status_code, is_(500))
+
+
+def test_sequence_step_and_response_func_can_serve_files(server):
+    assert_that(requests.get(url(server, "/steps")).text, is_("hello, file"))
+    assert_that(requests.get(url(server, "/dynamic")).text, is_("hello, file"))
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 10)),
+    ("bytes=90-", (90, 10)),
+    ("bytes=-5", (95, 5)),
+    ("bytes=-500", (0, 100)),
+    ("bytes=50-1000", (50, 50)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-9", None),
+    ("bytes=9-3", None),
+    ("bytes=abc", None),
+])
+def test_byte_range(header, expected):
+    assert_that(byte_range(header, 100), is_(expected))
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+def test_byte_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        byte_range(header, 100)
+
+
+def test_file_info_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text("{}")
+    body = FileBody(str(path))
+    file, first = body.open()
+    file.close()
+    file, second = body.open()
+    file.close()
+    assert_that(second, same_instance(first))
+
+    path.write_text('{"changed": true}')
+    os.utime(path, ns=(0, 1_000_000_000))
+    file, third = body.open()
+    file.close()
+    assert_that(third.etag, not_(first.etag))
+    assert_that(third.size, is_(17))
@@ -1,7 +1,10 @@
+import logging
+
 import pytest
-from hamcrest import assert_that, is_, has_entry
+from hamcrest import assert_that, is_, has_entry, has_item, contains_string, not_
 
-from mimicker.mimicker import mimicker, get
+from mimicker.logger import get_logger
+from mimicker.mimicker import mimicker, get, post
 from tests.support.client import Client
 
 
@@ -51,3 +54,54 @@ def test_health_endpoint_does_not_conflict_with_user_routes(health_server):
     assert_that(resp.status_code, is_(404))
     # Health is still up
     assert_that(client.get("/__mimicker__/health").status_code, is_(200))
+
+
+@pytest.fixture
+def server(server):
+    server.routes(get("/logged").body({"ok": True}))
+    return server
+
+
+@pytest.fixture
+def log_records():
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = get_logger()
+    logger.addHandler(handler)
+    yield records
+    logger.removeHandler(handler)
+
+
+def test_health_probes_are_not_logged(server, log_records):
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    assert_that(client.get("/__mimicker__/health").status_code, is_(200))
+    assert_that(client.get("/logged").status_code, is_(200))
+
+    messages = [record.getMessage() for record in log_records]
+    assert_that(messages, has_item(contains_string("/logged")))
+    assert_that(messages, not_(has_item(contains_string("/__mimicker__/health"))))
+
+
+def test_health_probes_are_not_tracked(server):
+    client = Client(f"http://localhost:{server.get_port()}")
+    client.get("/__mimicker__/health")
+
+    report = client.get("/__mimicker__/report").json()
+
+    assert_that(report["unmatched_requests"], is_([]))
+
+
+def test_stub_matching_an_admin_path_overrides_it_for_its_method_only(server):
+    server.routes(post("/__mimicker__/{endpoint}").status(202).body({"custom": True}))
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    assert_that(client.post_as_json("/__mimicker__/health").json(), is_({"custom": True}))
+    assert_that(client.get("/__mimicker__/health").json(), has_entry("status", "up"))
+
+
+def test_health_with_query_string_still_falls_back_to_admin_handler(server):
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    assert_that(client.get("/__mimicker__/health?probe=1").json(), has_entry("status", "up"))
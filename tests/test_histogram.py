@@ -0,0 +1,49 @@
+import pytest
+from hamcrest import assert_that, is_, less_than_or_equal_to, greater_than_or_equal_to
+
+from mimicker.histogram import MAX_BUCKETS, Histogram, bucket_index, bucket_upper_bound
+
+
+@pytest.mark.parametrize("value", [0, 1, 7, 8, 9, 15, 16, 17, 1000, 123456, 2 ** 40 + 3])
+def test_values_fall_in_a_bucket_within_an_eighth_of_them(value):
+    upper = bucket_upper_bound(bucket_index(value))
+
+    assert_that(upper, greater_than_or_equal_to(value))
+    assert_that(upper - value, less_than_or_equal_to(value / 8))
+
+
+def test_bucket_count_is_bounded():
+    assert_that(bucket_index(2 ** 80), is_(MAX_BUCKETS - 1))
+
+    histogram = Histogram()
+    histogram.record(2 ** 80)
+    assert_that(len(histogram.counts), is_(MAX_BUCKETS))
+
+
+def test_percentiles():
+    histogram = Histogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert_that(histogram.total, is_(1000))
+    assert_that(histogram.max, is_(1000))
+    assert_that(histogram.percentile(.5), is_(511))
+    assert_that(histogram.percentile(.99), is_(1000))
+    assert_that(histogram.percentile(1), is_(1000))
+
+
+def test_empty_histogram_summary():
+    assert_that(Histogram().summary(), is_({"p50": 0, "p90": 0, "p99": 0, "max": 0}))
+
+
+def test_merge_and_round_trip():
+    first, second = Histogram(), Histogram()
+    first.record(10)
+    second.record(5000)
+
+    first.merge(Histogram.from_list(second.to_list()))
+
+    assert_that(first.total, is_(2))
+    assert_that(first.sum, is_(5010))
+    assert_that(first.max, is_(5000))
+    assert_that(first.percentile(.5), is_(10))
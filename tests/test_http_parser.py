@@ -0,0 +1,175 @@
+import io
+
+import pytest
+from hamcrest import assert_that, is_, contains_string
+from pytest import raises
+
+from mimicker.http_parser import (HTTPParseError, Headers, parse_headers, parse_request_line,
+                                  read_headers, wants_keep_alive)
+from mimicker.mimicker import get
+from mimicker.request import Request
+from tests.support.client import connect
+
+
+def _buffered(data: bytes) -> io.BufferedReader:
+    return io.BufferedReader(io.BytesIO(data))
+
+
+def test_request_line_is_split():
+    assert_that(parse_request_line(b"GET /items?page=2 HTTP/1.1\r\n"),
+                is_(("GET", "/items?page=2", "HTTP/1.1")))
+
+
+@pytest.mark.parametrize("line, status", [
+    (b"NONSENSE\r\n", 400),
+    (b"GET / SPDY/3\r\n", 400),
+    (b"GET / HTTP/one\r\n", 400),
+    (b"GET / HTTP/2.0\r\n", 505),
+])
+def test_bad_request_lines_are_refused(line, status):
+    with raises(HTTPParseError) as e:
+        parse_request_line(line)
+    assert_that(e.value.status, is_(status))
+
+
+def test_header_names_are_lowercased_and_values_trimmed():
+    headers = parse_headers([b"Content-Type:  application/json \r\n", b"X-Id:1\r\n"])
+
+    assert_that(headers, is_({"content-type": "application/json", "x-id": "1"}))
+
+
+def test_repeated_headers_are_joined_and_kept_apart():
+    headers = parse_headers([b"Accept: text/html\r\n", b"Host: a\r\n",
+                             b"accept: application/json\r\n"])
+
+    assert_that(headers["accept"], is_("text/html, application/json"))
+    assert_that(headers.get_all("Accept"), is_(["text/html", "application/json"]))
+    assert_that(headers.get_all("host"), is_(["a"]))
+    assert_that(headers.get_all("missing"), is_([]))
+
+
+@pytest.mark.parametrize("line", [
+    b"no colon\r\n",
+    b": no name\r\n",
+    b"Host : localhost\r\n",
+    b" folded continuation\r\n",
+])
+def test_malformed_header_lines_are_refused(line):
+    with raises(HTTPParseError) as e:
+        parse_headers([line])
+    assert_that(e.value.status, is_(400))
+
+
+def test_too_many_headers_are_refused():
+    with raises(HTTPParseError) as e:
+        parse_headers([b"X-%d: 1\r\n" % i for i in range(3)], max_headers=2)
+    assert_that(e.value.status, is_(431))
+
+
+def test_read_headers_stops_at_blank_line():
+    rfile = _buffered(b"Host: localhost\r\nX-Id: 1\r\n\r\nbody")
+
+    assert_that(read_headers(rfile), is_({"host": "localhost", "x-id": "1"}))
+    assert_that(rfile.read(), is_(b"body"))
+
+
+def test_read_headers_without_headers():
+    rfile = _buffered(b"\r\nbody")
+
+    assert_that(read_headers(rfile), is_({}))
+    assert_that(rfile.read(), is_(b"body"))
+
+
+def test_read_headers_accepts_bare_line_feeds():
+    rfile = _buffered(b"Host: localhost\nX-Id: 1\n\nbody")
+
+    assert_that(read_headers(rfile), is_({"host": "localhost", "x-id": "1"}))
+    assert_that(rfile.read(), is_(b"body"))
+
+
+def test_read_headers_stops_at_a_bare_line_feed_blank_line():
+    rfile = _buffered(b"Host: a\nConnection: close\n\nGET / HTTP/1.1\r\nHost: b\r\n\r\n")
+
+    assert_that(read_headers(rfile), is_({"host": "a", "connection": "close"}))
+    assert_that(rfile.read(), is_(b"GET / HTTP/1.1\r\nHost: b\r\n\r\n"))
+
+
+def test_read_headers_refuses_long_lines():
+    with raises(HTTPParseError) as e:
+        read_headers(_buffered(b"X-Long: " + b"a" * 100 + b"\r\n\r\n"), max_line_length=64)
+    assert_that(e.value.status, is_(431))
+
+
+def test_read_headers_refuses_too_many_headers():
+    head = b"".join(b"X-%d: 1\r\n" % i for i in range(5)) + b"\r\n"
+
+    with raises(HTTPParseError) as e:
+        read_headers(_buffered(head), max_headers=4)
+    assert_that(e.value.status, is_(431))
+
+
+@pytest.mark.parametrize("version, connection, expected", [
+    ("HTTP/1.1", "", True),
+    ("HTTP/1.1", "close", False),
+    ("HTTP/1.0", "", False),
+    ("HTTP/1.0", "Keep-Alive", True),
+])
+def test_wants_keep_alive(version, connection, expected):
+    assert_that(wants_keep_alive(version, {"connection": connection}), is_(expected))
+
+
+def test_request_uses_parsed_headers_as_they_are():
+    headers = Headers()
+    headers.add("x-id", "1")
+
+    assert_that(Request("GET", "/", headers).headers is headers, is_(True))
+
+
+@pytest.fixture
+def server(server):
+    server.routes(get("/hello").body("hi"))
+    return server
+
+
+def _exchange(server, payload: bytes) -> str:
+    with connect(server) as sock:
+        sock.sendall(payload)
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return data.decode("latin-1")
+            data += chunk
+
+
+def test_engines_serve_parsed_requests(server):
+    response = _exchange(server, b"GET /hello HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+
+    assert_that(response, contains_string("200 OK"))
+
+
+def test_engines_serve_pipelined_requests_after_bare_line_feeds(server):
+    response = _exchange(server, b"GET /hello HTTP/1.1\nHost: x\n\n"
+                                 b"GET /hello HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+
+    assert_that(response.count("200 OK"), is_(2))
+
+
+def test_engines_refuse_too_many_headers(server):
+    head = b"".join(b"X-%d: 1\r\n" % i for i in range(101))
+
+    response = _exchange(server, b"GET /hello HTTP/1.1\r\n" + head + b"\r\n")
+
+    assert_that(response, contains_string("431"))
+
+
+def test_engines_refuse_folded_headers(server):
+    response = _exchange(server, b"GET /hello HTTP/1.1\r\nX-A: 1\r\n  2\r\n\r\n")
+
+    assert_that(response, contains_string("400"))
+
+
+def test_engines_refuse_unsupported_versions(server):
+    response = _exchange(server, b"GET /hello HTTP/2.0\r\nHost: x\r\n\r\n")
+
+    assert_that(response, contains_string("505"))
@@ -0,0 +1,100 @@
+import socket
+import time
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, has_entry, contains_string, not_
+
+from mimicker.mimicker import mimicker, get
+from tests.support.client import client_for, connect, url
+
+
+@pytest.fixture
+def server(server):
+    server.routes(
+        get("/ka/{n}").body({"n": "{n}"}),
+        get("/ka-limited").rate_limit(max_requests=1, window_seconds=60),
+        get("/ka-empty").status(204).body({"ignored": True}),
+    )
+    return server
+
+
+def _read_until_closed(sock: socket.socket) -> bytes:
+    data = b""
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return data
+        data += chunk
+
+
+def test_pipelined_requests_share_one_connection(server):
+    with connect(server) as sock:
+        sock.sendall(
+            b"GET /ka/1 HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /ka/2 HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /ka/3 HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
+        data = _read_until_closed(sock).decode()
+    assert_that(data.count("HTTP/1.1 200 OK"), is_(3))
+    assert_that(data, contains_string('{"n": "3"}'))
+    assert_that(data, contains_string("Connection: close"))
+
+
+def test_connection_is_reused_by_client_pool(server):
+    root = url(server)
+    with requests.Session() as session:
+        first = session.get(f"{root}/ka/1")
+        second = session.get(f"{root}/ka/2")
+    assert_that(first.json(), has_entry("n", "1"))
+    assert_that(second.json(), has_entry("n", "2"))
+    assert_that(second.headers, not_(has_entry("Connection", "close")))
+
+
+def test_404_and_rate_limited_responses_carry_content_length(server):
+    client = client_for(server)
+    assert_that(client.get("/nope").headers, has_entry("Content-Length", "0"))
+    client.get("/ka-limited")
+    limited = client.get("/ka-limited")
+    assert_that(limited.status_code, is_(429))
+    assert_that(limited.headers["Content-Length"], is_(str(len(limited.content))))
+
+
+def test_no_content_response_has_no_body(server):
+    with connect(server) as sock:
+        sock.sendall(
+            b"GET /ka-empty HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /ka/9 HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
+        data = _read_until_closed(sock).decode()
+    assert_that(data, contains_string("204 No Content"))
+    assert_that(data, not_(contains_string("ignored")))
+    assert_that(data, contains_string('{"n": "9"}'))
+
+
+def test_http_1_0_closes_by_default(server):
+    with connect(server) as sock:
+        sock.sendall(b"GET /ka/1 HTTP/1.0\r\n\r\n")
+        data = _read_until_closed(sock).decode()
+    assert_that(data, contains_string('{"n": "1"}'))
+
+
+def test_idle_connection_is_closed_after_timeout(server):
+    server.server.keep_alive_timeout = 0.2
+    with connect(server) as sock:
+        sock.sendall(b"GET /ka/1 HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        start = time.monotonic()
+        data = _read_until_closed(sock)
+    assert_that(data.count(b"HTTP/1.1 200 OK"), is_(1))
+    assert time.monotonic() - start < 1.8
+
+
+def test_idle_connection_does_not_block_pooled_worker():
+    server = mimicker(0, engine="threaded", threads=1)
+    server.routes(get("/ka/{n}").body({"n": "{n}"}))
+    with connect(server) as idle:
+        idle.sendall(b"GET /ka/1 HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        idle.recv(65536)
+        resp = client_for(server).get("/ka/2", timeout=2)
+    server.shutdown()
+    assert_that(resp.json(), has_entry("n", "2"))
@@ -1,9 +1,14 @@
 import logging
 from io import StringIO
+from logging.handlers import QueueHandler
 
-from hamcrest import assert_that, contains_string
+import requests
+from hamcrest import assert_that, contains_string, instance_of, is_, not_
 
-from mimicker.logger import configure_logger
+from mimicker.dispatch import log_incoming_request
+from mimicker.logger import configure_logger, flush_logs
+from mimicker.mimicker import post
+from mimicker.request import Request
 
 
 def test_logger_outputs(caplog):
@@ -32,3 +37,95 @@ def test_logger_output_includes_prefix():
     assert_that(output, contains_string("format test message"))
 
     logger.removeHandler(handler)
+
+
+def test_logger_hands_records_to_a_queue():
+    logger = configure_logger()
+
+    assert_that(logger.handlers[0], instance_of(QueueHandler))
+
+
+def test_flush_logs_writes_queued_records_and_keeps_logging():
+    logger = configure_logger()
+    records = []
+    logger.warning("queued")
+
+    flush_logs()
+    assert_that(logger.handlers[0].queue.empty(), is_(True))
+    collector = _Collector(records)
+    logger.addHandler(collector)
+    try:
+        logger.warning("after flush")
+    finally:
+        logger.removeHandler(collector)
+
+    assert_that([record.getMessage() for record in records], is_(["after flush"]))
+
+
+def test_request_is_not_read_for_logging_above_info():
+    logger = configure_logger()
+    reads = []
+    request = Request("POST", "/", {}, lambda: reads.append(1) or b'{"a": 1}')
+    logger.setLevel(logging.WARNING)
+    try:
+        log_incoming_request(request)
+    finally:
+        logger.setLevel(logging.INFO)
+
+    assert_that(reads, is_([]))
+    assert_that(request.body_read, is_(False))
+
+
+def test_request_json_is_rendered_when_the_record_is_written():
+    logger = configure_logger()
+    records = []
+    collector = _Collector(records)
+    logger.addHandler(collector)
+    logger.setLevel(logging.DEBUG)
+    try:
+        log_incoming_request(Request("POST", "/items", {"X-Id": "1"}, b'{"name": "a"}'))
+    finally:
+        logger.setLevel(logging.INFO)
+        logger.removeHandler(collector)
+
+    assert_that(records[0].args[2], not_(instance_of(str)))
+    assert_that(records[0].getMessage(), contains_string('"x-id": "1"'))
+    assert_that(records[0].getMessage(), contains_string('"name": "a"'))
+
+
+def test_body_is_only_sized_for_logging_at_info():
+    logger = configure_logger()
+    records = []
+    collector = _Collector(records)
+    logger.addHandler(collector)
+    request = Request("POST", "/items", {"Content-Length": "13"},
+                      lambda: b'{"name": "a"}')
+    try:
+        log_incoming_request(request)
+    finally:
+        logger.removeHandler(collector)
+
+    assert_that(request.body_read, is_(False))
+    assert_that(records[0].getMessage(), contains_string("Body: <13 bytes>"))
+
+
+def test_static_stub_body_is_not_parsed_at_info(server, monkeypatch):
+    parsed = []
+    monkeypatch.setattr("mimicker.request.parse_body",
+                        lambda raw, content_type: parsed.append(raw))
+    server.routes(post("/static").status(201))
+
+    resp = requests.post(f"http://localhost:{server.get_port()}/static",
+                         json={"big": "x" * 100000})
+
+    assert_that(resp.status_code, is_(201))
+    assert_that(parsed, is_([]))
+
+
+class _Collector(logging.Handler):
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+
+    def emit(self, record):
+        self.records.append(record)
@@ -0,0 +1,138 @@
+from hamcrest import (assert_that, is_, contains_string, has_item, not_, starts_with,
+                      greater_than_or_equal_to, same_instance)
+
+from mimicker.metrics import render_metrics
+from mimicker.mimicker import get
+from mimicker.stub_group import StubGroup
+from mimicker.tracking import RequestTracker
+from tests.support.client import client_for
+
+
+def _samples(text: str) -> dict:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_stub_and_unmatched_counters():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/a", 200, "a")
+    stub_group.add("GET", "/b", 200, "b")
+    for _ in range(3):
+        stub_group.match("GET", "/a")
+    stub_group.match("GET", "/missing")
+
+    samples = _samples(render_metrics(stub_group).decode())
+
+    assert_that(samples['mimicker_stub_requests_total{method="GET",path="/a"}'], is_(3))
+    assert_that(samples['mimicker_stub_requests_total{method="GET",path="/b"}'], is_(0))
+    assert_that(samples["mimicker_unmatched_requests_total"], is_(1))
+
+
+def test_histograms_are_cumulative():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/a", 200, "a")
+    slot = stub_group.tracker.register_stub("GET", "/a")
+    stub_group.tracker.record_response(slot, 0.00005, 0, 0, 10)
+    stub_group.tracker.record_response(slot, 0.02, 0, 0, 10)
+
+    samples = _samples(render_metrics(stub_group).decode())
+
+    name = 'mimicker_stub_handling_seconds_bucket{method="GET",path="/a",le="%s"}'
+    assert_that(samples[name % "0.0001"], is_(1))
+    assert_that(samples[name % "0.01"], is_(1))
+    assert_that(samples[name % "0.025"], is_(2))
+    assert_that(samples[name % "+Inf"], is_(2))
+    assert_that(samples['mimicker_stub_handling_seconds_count{method="GET",path="/a"}'],
+                is_(2))
+    assert_that(samples['mimicker_stub_handling_seconds_sum{method="GET",path="/a"}'],
+                is_(0.02005))
+    # Without a configured delay there is nothing to compare the wait against.
+    assert_that(list(samples), not_(has_item(starts_with("mimicker_stub_delay_seconds_"))))
+
+
+def test_label_values_are_escaped():
+    stub_group = StubGroup()
+    stub_group.add("GET", '/say/"hi"\\', 200, "a")
+
+    text = render_metrics(stub_group).decode()
+
+    assert_that(text, contains_string(r'path="/say/\"hi\"\\"'))
+
+
+def test_peer_counters_are_added():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/a", 200, "a")
+    stub_group.match("GET", "/a")
+    peer = RequestTracker()
+    peer.count_hit(peer.register_stub("GET", "/a"))
+    peer.record_unmatched("GET", "/missing")
+    stub_group.peer_snapshots = lambda: [peer.snapshot()]
+
+    samples = _samples(render_metrics(stub_group).decode())
+
+    assert_that(samples['mimicker_stub_requests_total{method="GET",path="/a"}'], is_(2))
+    assert_that(samples["mimicker_unmatched_requests_total"], is_(1))
+
+
+def test_local_histograms_are_read_without_copying():
+    tracker = RequestTracker()
+    slot = tracker.register_stub("GET", "/a")
+    tracker.record_response(slot, 0.001, 0, 0, 10)
+
+    first, _ = tracker.totals()
+    second, _ = tracker.totals()
+
+    assert_that(first[0].timings, is_(same_instance(second[0].timings)))
+
+
+def test_peer_histograms_are_merged_into_copies():
+    tracker = RequestTracker()
+    slot = tracker.register_stub("GET", "/a")
+    tracker.record_response(slot, 0.001, 0, 0, 10)
+    peer = RequestTracker()
+    peer.record_response(peer.register_stub("GET", "/a"), 0.001, 0, 0, 10)
+
+    merged, _ = tracker.totals([peer.snapshot()])
+    local, _ = tracker.totals()
+
+    assert_that(merged[0].timings.handling.total, is_(2))
+    assert_that(local[0].timings.handling.total, is_(1))
+
+
+def test_metrics_endpoint(server):
+    server.routes(
+        get("/limited").rate_limit(max_requests=1, window_seconds=60),
+        get("/slow").delay(0.02).body("late"),
+    )
+    client = client_for(server)
+    client.get("/limited")
+    client.get("/limited")
+    client.get("/slow")
+
+    response = client.get("/__mimicker__/metrics")
+    samples = _samples(response.text)
+
+    assert_that(response.status_code, is_(200))
+    assert_that(response.headers["Content-Type"], starts_with("text/plain; version=0.0.4"))
+    assert_that(samples['mimicker_stub_requests_total{method="GET",path="/limited"}'], is_(2))
+    assert_that(
+        samples['mimicker_rate_limited_requests_total{method="GET",path="/limited"}'], is_(1))
+    # The scrape itself is in flight; earlier requests and connections may
+    # not have been wound up yet.
+    assert_that(samples["mimicker_requests_in_flight"], greater_than_or_equal_to(1))
+    assert_that(samples["mimicker_active_connections"], greater_than_or_equal_to(1))
+    assert_that(samples['mimicker_stub_delay_seconds_bucket'
+                        '{method="GET",path="/slow",le="0.01"}'], is_(0))
+    assert_that(samples['mimicker_stub_delay_seconds_count{method="GET",path="/slow"}'],
+                is_(1))
+
+
+def test_metrics_endpoint_can_be_stubbed(server):
+    server.routes(get("/__mimicker__/metrics").body("custom"))
+    client = client_for(server)
+
+    assert_that(client.get("/__mimicker__/metrics").text, is_("custom"))
@@ -76,6 +76,37 @@ def test_get_path_param(mimicker_server):
     assert_that(resp.json(), equal_to({"message": "Hello, world!"}))
 
 
+def test_get_nested_path_param(mimicker_server):
+    mimicker_server.routes(
+        get("/orders/{order_id}/items/{item}").
+        body({"order": {"id": "{order_id}", "items": [{"sku": "{item}"}, "fixed"]}}).
+        status(200)
+    )
+    resp = Client().get('/orders/7/items/ab-1')
+    assert_that(resp.json(), equal_to(
+        {"order": {"id": "7", "items": [{"sku": "ab-1"}, "fixed"]}}))
+
+
+def test_get_body_braces_that_name_no_path_param_are_kept(mimicker_server):
+    mimicker_server.routes(
+        get("/braces/{id}").body({"id": "{id}", "a": {"tpl": "{missing}"}}).status(200)
+    )
+    resp = Client().get('/braces/3')
+    assert_that(resp.status_code, is_(200))
+    assert_that(resp.json(), equal_to({"id": "3", "a": {"tpl": "{missing}"}}))
+
+
+def test_get_response_func_output_braces_are_kept(mimicker_server):
+    mimicker_server.routes(
+        get("/echo/{id}").response_func(
+            lambda **kwargs: (200, {"msg": "hi {name}", "id": "{id}", "n": {"id": "{id}"}}))
+    )
+    resp = Client().get('/echo/5')
+    assert_that(resp.status_code, is_(200))
+    # Only top-level values are filled, as for any body built per request.
+    assert_that(resp.json(), equal_to({"msg": "hi {name}", "id": "5", "n": {"id": "{id}"}}))
+
+
 def test_get_when_implicit_query_params_then_variables_are_available_in_query(mimicker_server):
     def answer(**kwargs):
         return 200, {"message": f"Hello, {kwargs['query_params']['greet'][0]}!"}
@@ -1,5 +1,6 @@
 import json
 
+import requests
 from hamcrest import assert_that, is_, has_entry, equal_to
 
 from mimicker.mimicker import post
@@ -66,6 +67,41 @@ def test_post_reuse_request_body(mimicker_server):
     assert_that(resp.json(), equal_to({"my_counter": 2}))
 
 
+def test_post_text_payload_reaches_response_func(mimicker_server):
+    def response_func(**kwargs):
+        return 200, {"echo": kwargs.get("payload")}
+
+    mimicker_server.routes(
+        post("/echo-text").response_func(response_func)
+    )
+    resp = Client().post_as_text('/echo-text', body="plain words")
+    assert_that(resp.json(), equal_to({"echo": "plain words"}))
+
+
+def test_post_form_payload_reaches_response_func(mimicker_server):
+    def response_func(**kwargs):
+        return 200, {"echo": kwargs.get("payload")}
+
+    mimicker_server.routes(
+        post("/echo-form").response_func(response_func)
+    )
+    resp = requests.post(f"{Client().root}/echo-form", data={"name": "mimicker"})
+    assert_that(resp.json(), equal_to({"echo": {"name": ["mimicker"]}}))
+
+
+def test_post_unread_body_does_not_break_keep_alive(mimicker_server):
+    mimicker_server.routes(
+        post("/static-upload").body({"ok": True}),
+        post("/after-upload").body({"next": True}),
+    )
+    with requests.Session() as session:
+        first = session.post(f"{Client().root}/static-upload", data=b"x" * 300_000,
+                             headers={"Content-Type": "application/octet-stream"})
+        second = session.post(f"{Client().root}/after-upload", json={"a": 1})
+    assert_that(first.json(), equal_to({"ok": True}))
+    assert_that(second.json(), equal_to({"next": True}))
+
+
 def test_post_empty_response(mimicker_server):
     mimicker_server.routes(
         post("/clear").
@@ -0,0 +1,61 @@
+import signal
+import socket
+import subprocess
+import sys
+
+import pytest
+from hamcrest import assert_that, is_, has_entries
+from tests.support.client import client_for, url
+
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(socket, "SO_REUSEPORT") or sys.platform == "win32",
+    reason="prefork workers need fork() and SO_REUSEPORT",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def prefork_server():
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mimicker.cli", "serve", "--workers", "3",
+         "--port", str(port), "--stub", 'GET /pf/hello -> 200 {"ok": true}'],
+    )
+    subprocess.run(
+        [sys.executable, "-m", "mimicker.cli", "wait",
+         "--url", url(port), "--timeout", "10"],
+        check=True,
+    )
+    yield port, process
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=10)
+
+
+def test_report_aggregates_hits_across_workers(prefork_server):
+    port, _ = prefork_server
+    client = client_for(port)
+    for _ in range(20):
+        assert_that(client.get("/pf/hello").status_code, is_(200))
+    for _ in range(5):
+        client.get("/pf/missing")
+
+    report = client.get("/__mimicker__/report").json()
+
+    assert_that(report["stubs"][0]["hit_count"], is_(20))
+    assert_that(report["summary"]["unmatched_requests"], is_(5))
+    assert_that(report["workers"], has_entries(count=3, reporting=3))
+
+
+def test_sigterm_stops_all_workers(prefork_server):
+    port, process = prefork_server
+    process.send_signal(signal.SIGTERM)
+    assert_that(process.wait(timeout=10), is_(0))
+    with pytest.raises(OSError):
+        socket.create_connection(("localhost", port), timeout=1)
@@ -0,0 +1,122 @@
+import tempfile
+
+from hamcrest import assert_that, is_, none, same_instance
+from pytest import raises
+
+from mimicker.exceptions import BodyTooLarge
+from mimicker.request import BodyBuffer, Request
+
+
+def test_path_and_query_params_are_split_from_target():
+    request = Request("GET", "/search?q=python&page=2", {})
+
+    assert_that(request.path, is_("/search"))
+    assert_that(request.query_params, is_({"q": ["python"], "page": ["2"]}))
+
+
+def test_headers_are_lowercased_once():
+    request = Request("GET", "/", {"Content-Type": "application/json", "X-Id": "1"})
+
+    assert_that(request.headers, is_({"content-type": "application/json", "x-id": "1"}))
+    assert_that(request.headers, same_instance(request.headers))
+
+
+def test_body_is_parsed_on_first_access():
+    request = Request("POST", "/", {}, b'{"name": "mimicker"}')
+
+    assert_that(request.body, is_({"name": "mimicker"}))
+    assert_that(request.body, same_instance(request.body))
+
+
+def test_invalid_json_body_is_none():
+    request = Request("POST", "/", {"Content-Type": "application/json"}, b"{oops")
+    assert_that(request.body, none())
+    assert_that(Request("POST", "/", {}).body, none())
+
+
+def test_form_body_is_parsed_into_value_lists():
+    request = Request("POST", "/", {"Content-Type": "application/x-www-form-urlencoded"},
+                      b"name=mimicker&tag=a&tag=b")
+    assert_that(request.body, is_({"name": ["mimicker"], "tag": ["a", "b"]}))
+
+
+def test_text_body_is_decoded_with_its_charset():
+    request = Request("POST", "/", {"Content-Type": "text/plain; charset=latin-1"},
+                      "café".encode("latin-1"))
+    assert_that(request.body, is_("café"))
+
+
+def test_binary_body_is_kept_as_bytes():
+    request = Request("POST", "/", {"Content-Type": "image/png"}, b"\x89PNG")
+    assert_that(request.body, is_(b"\x89PNG"))
+
+
+def test_untyped_body_falls_back_to_bytes_when_not_json():
+    assert_that(Request("POST", "/", {}, b'{"a": 1}').body, is_({"a": 1}))
+    assert_that(Request("POST", "/", {}, b"a=1").body, is_(b"a=1"))
+
+
+def test_body_is_read_only_when_needed():
+    reads = []
+    request = Request("POST", "/", {}, lambda: reads.append(1) or b'{"a": 1}')
+
+    assert_that(request.body_read, is_(False))
+    assert_that(request.body, is_({"a": 1}))
+    assert_that(request.body, is_({"a": 1}))
+    assert_that(request.body_read, is_(True))
+    assert_that(reads, is_([1]))
+
+
+def test_request_has_no_instance_dict():
+    with raises(AttributeError):
+        Request("GET", "/", {}).extra = 1
+
+
+def test_body_buffer_keeps_small_bodies_in_memory():
+    buffer = BodyBuffer(spool_threshold=16)
+    buffer.write(b"hello ")
+    buffer.write(b"world")
+    assert_that(buffer.getvalue(), is_(b"hello world"))
+
+
+def test_body_buffer_spools_past_threshold():
+    buffer = BodyBuffer(spool_threshold=4)
+    buffer.write(b"abc")
+    buffer.write(b"defg")
+    content = buffer.getvalue()
+    assert_that(content.read(), is_(b"abcdefg"))
+    buffer.close()
+
+
+def test_body_buffer_with_zero_threshold_writes_to_disk():
+    buffer = BodyBuffer(spool_threshold=0)
+    buffer.write(b"a")
+    content = buffer.getvalue()
+    assert_that(isinstance(content, tempfile.SpooledTemporaryFile), is_(False))
+    assert_that(content.fileno() >= 0, is_(True))
+    assert_that(content.read(), is_(b"a"))
+    buffer.close()
+
+
+def test_body_buffer_refuses_bodies_over_max_size():
+    buffer = BodyBuffer(spool_threshold=4, max_size=5)
+    buffer.write(b"abc")
+    with raises(BodyTooLarge):
+        buffer.write(b"def")
+
+
+def test_body_buffer_without_keep_only_counts():
+    buffer = BodyBuffer(spool_threshold=4, keep=False)
+    buffer.write(b"abcdefgh")
+    assert_that(buffer.size, is_(8))
+    assert_that(buffer.getvalue(), is_(b""))
+
+
+def test_spooled_body_is_given_as_file_and_raw_body_as_bytes():
+    buffer = BodyBuffer(spool_threshold=2)
+    buffer.write(b'{"a": 1}')
+    request = Request("POST", "/", {"Content-Type": "application/json"},
+                      buffer.getvalue())
+    assert_that(request.raw_body, is_(b'{"a": 1}'))
+    assert_that(request.body.read(), is_(b'{"a": 1}'))
+    request.close()
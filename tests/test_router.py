@@ -0,0 +1,113 @@
+import random
+import re
+
+from hamcrest import assert_that, is_, none
+
+from mimicker.regex import parse_endpoint_pattern
+from mimicker.router import Router
+
+
+def _router(*templates):
+    router = Router()
+    for template in templates:
+        router.add(parse_endpoint_pattern(template), template)
+    return router
+
+
+def _matched_template(router, path):
+    found = router.match(path)
+    return (found[0].pattern, found[1]) if found else None
+
+
+def test_static_path_is_matched():
+    router = _router("/users/me", "/users")
+    pattern, params, _ = router.match("/users/me?verbose=1")
+    assert_that(pattern, is_(parse_endpoint_pattern("/users/me")))
+    assert_that(params, is_({}))
+
+
+def test_param_segments_are_captured():
+    router = _router("/orgs/{org}/repos/{repo}")
+    _, params, _ = router.match("/orgs/acme/repos/api")
+    assert_that(params, is_({"org": "acme", "repo": "api"}))
+
+
+def test_earlier_registration_wins_over_a_more_specific_route():
+    router = _router("/users/{id}", "/users/me")
+    pattern, params, _ = router.match("/users/me")
+    assert_that(pattern, is_(parse_endpoint_pattern("/users/{id}")))
+    assert_that(params, is_({"id": "me"}))
+
+
+def test_static_route_registered_first_wins():
+    router = _router("/users/me", "/users/{id}")
+    pattern, _, _ = router.match("/users/me")
+    assert_that(pattern, is_(parse_endpoint_pattern("/users/me")))
+
+
+def test_query_templates_fall_back_to_regex_in_order():
+    router = _router("/search?q={term}", "/search")
+    pattern, params, _ = router.match("/search?q=python")
+    assert_that(pattern, is_(parse_endpoint_pattern("/search?q={term}")))
+    assert_that(params, is_({"term": "python"}))
+    pattern, _, _ = router.match("/search?page=2")
+    assert_that(pattern, is_(parse_endpoint_pattern("/search")))
+
+
+def test_reregistered_template_keeps_its_position():
+    router = _router("/a/{x}", "/a/b", "/a/{x}")
+    pattern, _, _ = router.match("/a/b")
+    assert_that(pattern, is_(parse_endpoint_pattern("/a/{x}")))
+
+
+def test_key_is_returned_with_the_match():
+    router = Router()
+    for template in ("/users/me", "/users/{id}", "/search?q={term}"):
+        router.add(parse_endpoint_pattern(template), template, key=template)
+    assert_that(router.match("/users/me")[2], is_("/users/me"))
+    assert_that(router.match("/users/42")[2], is_("/users/{id}"))
+    assert_that(router.match("/search?q=x")[2], is_("/search?q={term}"))
+
+
+def test_reregistering_replaces_the_key():
+    router = Router()
+    pattern = parse_endpoint_pattern("/a/{x}")
+    router.add(pattern, "/a/{x}", key=1)
+    router.add(pattern, "/a/{x}", key=2)
+    assert_that(router.match("/a/b")[2], is_(2))
+
+
+def test_empty_segment_does_not_match_a_param():
+    router = _router("/a/{x}")
+    assert_that(router.match("/a/"), none())
+
+
+def test_hand_written_regex_is_matched():
+    router = Router()
+    router.add(re.compile(r"^/v\d+/ping$"))
+    assert_that(router.match("/v2/ping")[1], is_({}))
+
+
+def test_matches_like_a_linear_scan():
+    rng = random.Random(7)
+    words = ["a", "b", "c", "users", ""]
+
+    def template():
+        segments = []
+        for i in range(rng.randint(0, 3)):
+            segments.append(f"{{p{i}}}" if rng.random() < 0.4 else rng.choice(words))
+        path = "/" + "/".join(segments)
+        if rng.random() < 0.15:
+            path += "?q={q}" if rng.random() < 0.5 else "?q=a"
+        return path
+
+    templates = list(dict.fromkeys(template() for _ in range(80)))
+    patterns = [parse_endpoint_pattern(t) for t in templates]
+    router = _router(*templates)
+
+    for _ in range(2000):
+        path = "/" + "/".join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+        path += rng.choice(["", "?q=a", "?q=b&x=1", "?"])
+        expected = next(((p.pattern, m.groupdict()) for p in patterns
+                         for m in [p.match(path)] if m), None)
+        assert_that(_matched_template(router, path), is_(expected))
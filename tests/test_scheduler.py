@@ -0,0 +1,31 @@
+import threading
+import time
+
+from hamcrest import assert_that, is_, contains_exactly
+
+from mimicker.scheduler import DelayScheduler
+
+
+def test_callbacks_run_in_due_order():
+    scheduler = DelayScheduler()
+    fired = []
+    done = threading.Event()
+    scheduler.call_later(0.1, lambda: (fired.append("late"), done.set()))
+    scheduler.call_later(0.02, lambda: fired.append("early"))
+
+    assert_that(scheduler.pending, is_(2))
+    assert done.wait(2)
+    scheduler.close()
+
+    assert_that(fired, contains_exactly("early", "late"))
+
+
+def test_close_drops_pending_callbacks():
+    scheduler = DelayScheduler()
+    fired = []
+    scheduler.call_later(0.05, lambda: fired.append(1))
+    scheduler.close()
+    time.sleep(0.1)
+
+    assert_that(fired, is_([]))
+    assert_that(scheduler.pending, is_(0))
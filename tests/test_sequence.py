@@ -95,8 +95,7 @@ def test_sequence_works_with_post(mimicker_server):
 
 def test_sequence_is_thread_safe():
     # Uses a dedicated server so concurrent requests don't share state with the
-    # session-scoped server, which accumulates stubs from every other test and
-    # makes id()-based pattern lookups in _stub_keys unreliable under load.
+    # session-scoped server, which accumulates stubs from every other test.
     from mimicker.mimicker import mimicker as _mimicker
     server = _mimicker(0)
     server.routes(
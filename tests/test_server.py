@@ -1,5 +1,146 @@
-from hamcrest import assert_that, is_
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, has_entries, only_contains, greater_than_or_equal_to
+from pytest import raises
+
+from mimicker.mimicker import mimicker, get, MimickerServer
+from mimicker.server import ReusableAddressPooledTCPServer
+from tests.support.client import Client
 
 
 def test_default_port(mimicker_server):
     assert_that(mimicker_server.get_port(), is_(8080))
+
+
+def test_pooled_server_serves_concurrent_requests():
+    server = mimicker(0, engine="threaded", threads=2)
+    server.routes(get("/pool/slow").delay(0.05).body({"ok": True}))
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        statuses = list(executor.map(lambda _: client.get("/pool/slow").status_code,
+                                     range(8)))
+    workers = [t for t in threading.enumerate() if t.name.startswith("mimicker-worker")]
+    server.shutdown()
+
+    assert_that(statuses, only_contains(200))
+    assert_that(len(workers), is_(2))
+
+
+def test_pooled_server_reports_queue_depth():
+    server = mimicker(0, engine="threaded", threads=3)
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    report = client.get("/__mimicker__/report").json()
+    server.shutdown()
+
+    assert_that(report["server"], has_entries(threads=3, queue_depth=0))
+
+
+def test_pooled_server_rejects_empty_pool():
+    with raises(ValueError):
+        MimickerServer(0, engine="threaded", threads=-1)
+
+
+def test_resumed_connections_do_not_wait_for_the_accept_queue():
+    server = ReusableAddressPooledTCPServer(("localhost", 0), None, threads=1, queue_size=1)
+    release = threading.Event()
+    try:
+        server._submit(release.wait)  # keeps the only worker busy
+        server._accept_slots.acquire()  # as if the accept queue were full
+        resumed = threading.Event()
+        # What the delay timer and the reactor do when a connection is due again.
+        submitter = threading.Thread(target=server._submit, args=(resumed.set,))
+        submitter.start()
+        submitter.join(timeout=1)
+
+        assert_that(submitter.is_alive(), is_(False))
+        release.set()
+        assert_that(resumed.wait(timeout=1), is_(True))
+    finally:
+        release.set()
+        server.server_close()
+
+
+def test_delayed_responses_do_not_hold_pool_workers():
+    server = mimicker(0, engine="threaded", threads=1)
+    server.routes(get("/pool/delayed").delay(0.3).body({"ok": True}))
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=20) as executor:
+        statuses = list(executor.map(lambda _: client.get("/pool/delayed").status_code,
+                                     range(20)))
+    elapsed = time.monotonic() - start
+    server.shutdown()
+
+    assert_that(statuses, only_contains(200))
+    assert elapsed < 1.5
+
+
+def test_keep_alive_continues_after_delayed_response():
+    server = mimicker(0, engine="threaded", threads=1)
+    server.routes(
+        get("/pool/delayed").delay(0.1).body({"ok": True}),
+        get("/pool/fast").body({"fast": True}),
+    )
+    root = f"http://localhost:{server.get_port()}"
+    with requests.Session() as session:
+        delayed = session.get(f"{root}/pool/delayed", timeout=2)
+        fast = session.get(f"{root}/pool/fast", timeout=2)
+    server.shutdown()
+
+    assert_that(delayed.json(), has_entries(ok=True))
+    assert_that(fast.json(), has_entries(fast=True))
+
+
+@pytest.mark.parametrize("engine", ["threaded", "asyncio"])
+def test_listener_buffer_sizes_are_configurable(engine):
+    server = mimicker(0, engine=engine, send_buffer=65536, recv_buffer=131072,
+                      backlog=16)
+    listener = server.server.socket
+    send_buffer = listener.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+    recv_buffer = listener.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+    server.routes(get("/tuned").body({"ok": True}))
+    status = Client(f"http://localhost:{server.get_port()}").get("/tuned").status_code
+    server.shutdown()
+
+    # Linux reports twice the requested size, to account for bookkeeping.
+    assert_that(send_buffer, is_(greater_than_or_equal_to(65536)))
+    assert_that(recv_buffer, is_(greater_than_or_equal_to(131072)))
+    assert_that(status, is_(200))
+
+
+@pytest.mark.parametrize("nodelay", [True, False])
+def test_threaded_connections_get_tcp_nodelay(nodelay):
+    server = mimicker(0, engine="threaded", tcp_nodelay=nodelay)
+    server.routes(get("/nodelay").body({"ok": True}))
+    with requests.Session() as session:
+        session.get(f"http://localhost:{server.get_port()}/nodelay")
+        connection, = server.server._connections
+        flag = connection.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    server.shutdown()
+
+    assert_that(bool(flag), is_(nodelay))
+
+
+def test_failing_response_func_gets_500(server):
+    def fail(**kwargs):
+        raise RuntimeError("boom")
+
+    server.routes(get("/fails").response_func(fail), get("/ok").body({"ok": True}))
+    client = Client(f"http://localhost:{server.get_port()}")
+
+    assert_that(client.get("/fails").status_code, is_(500))
+    assert_that(client.get("/ok").status_code, is_(200))
+
+
+@pytest.mark.parametrize("options", [{"threads": 0}, {"match_cache_size": 0}])
+def test_non_positive_pool_and_cache_sizes_are_rejected(options):
+    with raises(ValueError):
+        MimickerServer(0, **options)
@@ -0,0 +1,135 @@
+import time
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, contains_string, not_, greater_than_or_equal_to
+
+from mimicker.mimicker import mimicker, get
+from mimicker.response import Response, stream_frames
+from mimicker.sequence import step
+from mimicker.stream import stream
+from tests.support.client import connect, url
+
+
+def _numbers(count):
+    def chunks():
+        for n in range(count):
+            yield f"{n}\n"
+    return chunks
+
+
+def _export(**kwargs):
+    rows = int(kwargs["query_params"].get("rows", ["3"])[0])
+    return 200, ({"row": n} for n in range(rows))
+
+
+def _broken():
+    yield b"first"
+    raise RuntimeError("export failed")
+
+
+@pytest.fixture
+def server(server):
+    server.routes(
+        get("/numbers").body(stream(_numbers(5))).headers([("Content-Type", "text/plain")]),
+        get("/slow").body(stream(_numbers(3), chunk_delay=0.05)),
+        get("/export").response_func(_export),
+        get("/broken").body(stream(_broken)),
+        get("/steps").sequence(step().body(stream([b"a", b"b"])), step().body("done")),
+    )
+    return server
+
+
+def test_static_stream_is_sent_chunked(server):
+    resp = requests.get(url(server, "/numbers"))
+    assert_that(resp.headers["Transfer-Encoding"], is_("chunked"))
+    assert_that("Content-Length" in resp.headers, is_(False))
+    assert_that(resp.text, is_("0\n1\n2\n3\n4\n"))
+
+
+def test_static_stream_is_replayed_on_every_hit(server):
+    first = requests.get(url(server, "/numbers")).text
+    second = requests.get(url(server, "/numbers")).text
+    assert_that(second, is_(first))
+
+
+def test_response_func_can_return_a_generator(server):
+    resp = requests.get(url(server, "/export?rows=2"))
+    assert_that(resp.text, is_('{"row": 0}{"row": 1}'))
+
+
+def test_chunk_delay_spaces_out_chunks(server):
+    start = time.perf_counter()
+    resp = requests.get(url(server, "/slow"))
+    assert_that(time.perf_counter() - start, is_(greater_than_or_equal_to(0.1)))
+    assert_that(resp.text, is_("0\n1\n2\n"))
+
+
+def test_sequence_step_can_stream(server):
+    assert_that(requests.get(url(server, "/steps")).text, is_("ab"))
+    assert_that(requests.get(url(server, "/steps")).text, is_("done"))
+
+
+def test_keep_alive_survives_a_stream(server):
+    with requests.Session() as session:
+        assert_that(session.get(url(server, "/numbers")).text, is_("0\n1\n2\n3\n4\n"))
+        assert_that(session.get(url(server, "/export")).status_code, is_(200))
+
+
+def test_failing_stream_is_cut_short(server):
+    with connect(server) as sock:
+        sock.sendall(b"GET /broken HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    reply = data.decode()
+    assert_that(reply, contains_string("5\r\nfirst\r\n"))
+    assert_that(reply, not_(contains_string("0\r\n\r\n")))
+
+
+def test_http_1_0_client_gets_raw_chunks_and_close(server):
+    with connect(server) as sock:
+        sock.sendall(b"GET /numbers HTTP/1.0\r\n\r\n")
+        data = b""
+        while chunk := sock.recv(65536):
+            data += chunk
+    head, body = data.decode().split("\r\n\r\n", 1)
+    assert_that(head, not_(contains_string("Transfer-Encoding")))
+    assert_that(head, contains_string("Connection: close"))
+    assert_that(body, is_("0\n1\n2\n3\n4\n"))
+
+
+def test_stream_frames_skip_empty_chunks_and_end_with_last_chunk():
+    response = Response(200, [], iter([b"ab", b"", b"c"]))
+    assert_that(b"".join(stream_frames(response, "HTTP/1.1")),
+                is_(b"2\r\nab\r\n1\r\nc\r\n0\r\n\r\n"))
+
+
+def test_stream_frames_send_nothing_for_no_content():
+    response = Response(204, [], iter([b"ignored"]))
+    assert_that(list(stream_frames(response, "HTTP/1.1")), is_([]))
+
+
+def test_iterator_body_must_be_streamed():
+    server = mimicker(0)
+    try:
+        with pytest.raises(TypeError, match=r"stream\(\)"):
+            server.routes(get("/numbers").body(_numbers(3)()))
+    finally:
+        server.shutdown()
+
+
+def test_slow_stream_does_not_hold_pool_worker():
+    server = mimicker(0, engine="threaded", threads=1)
+    server.routes(get("/trickle").body(stream(_numbers(4), chunk_delay=0.3)),
+                  get("/quick").body({"ok": True}))
+    with connect(server) as slow:
+        slow.sendall(b"GET /trickle HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        slow.recv(65536)
+        start = time.monotonic()
+        resp = requests.get(url(server, "/quick"), timeout=2)
+        elapsed = time.monotonic() - start
+    server.shutdown()
+
+    assert_that(resp.json(), is_({"ok": True}))
+    assert elapsed < 0.3
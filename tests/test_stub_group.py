@@ -1,4 +1,4 @@
-from hamcrest import assert_that, none, is_, not_none
+from hamcrest import assert_that, none, is_, not_none, matches_regexp
 
 from mimicker.stub_group import StubGroup
 
@@ -118,3 +118,112 @@ def test_match_given_partial_expected_headers():
                                   ('Content-Type', "application/json"),
                                   ('Authorization', "Bearer YOUR_TOKEN"),
                                   ('Custom-Header', "CustomValue")], None, None)))
+
+
+def test_static_stub_is_prepared_at_registration():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/hi", 201, {"message": "hello"}, headers=[("X-Id", "1")])
+    matched, _ = stub_group.match("GET", "/hi")
+
+    prepared = stub_group.prepared(matched)
+    assert_that(prepared.body, is_(b'{"message": "hello"}'))
+    assert_that(prepared.head, is_(b"HTTP/1.1 201 Created\r\nX-Id: 1\r\n"
+                                   b"Content-Type: application/json\r\n"
+                                   b"Content-Length: 20\r\n"))
+
+
+def test_static_stub_gets_validators_when_enabled():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/hi", 200, {"message": "hello"}, etag=True)
+    matched, _ = stub_group.match("GET", "/hi")
+
+    headers = dict(stub_group.prepared(matched).headers)
+    assert_that(headers["ETag"], matches_regexp(r'^"[0-9a-f]{16}"$'))
+    assert_that("Last-Modified" in headers, is_(True))
+    assert_that(stub_group.etag_enabled(matched), is_(True))
+
+
+def test_static_stub_has_no_validators_by_default():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/hi", 200, {"message": "hello"})
+    matched, _ = stub_group.match("GET", "/hi")
+
+    headers = dict(stub_group.prepared(matched).headers)
+    assert_that("ETag" in headers or "Last-Modified" in headers, is_(False))
+    assert_that(stub_group.etag_enabled(matched), is_(False))
+
+
+def test_templated_stub_is_not_prepared():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/hello/{name}", 200, {"message": "Hello, {name}!"})
+    matched, _ = stub_group.match("GET", "/hello/mimicker")
+
+    assert_that(stub_group.prepared(matched), none())
+
+
+def test_replaced_stub_drops_its_prepared_response():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/hi", 200, {"message": "hello"})
+    first, _ = stub_group.match("GET", "/hi")
+    stub_group.add("GET", "/hi", 200, {"message": "bye"})
+    second, _ = stub_group.match("GET", "/hi")
+
+    assert_that(stub_group.prepared(first), none())
+    assert_that(stub_group.prepared(second).body, is_(b'{"message": "bye"}'))
+
+
+def test_match_cache_counts_hits_and_misses():
+    stub_group = StubGroup()
+    stub_group.enable_match_cache(8)
+    stub_group.add("GET", "/hello/{name}", 200, {"message": "Hello, {name}!"})
+
+    stub_group.match("GET", "/hello/a")
+    matched, path_param = stub_group.match("GET", "/hello/a")
+    stub_group.match("GET", "/missing")
+    missing, _ = stub_group.match("GET", "/missing")
+
+    assert_that(matched, not_none())
+    assert_that(path_param, is_({"name": "a"}))
+    assert_that(missing, none())
+    assert_that(stub_group.report()["match_cache"],
+                is_({"size": 2, "max_size": 8, "hits": 2, "misses": 2}))
+    assert_that(stub_group.report()["summary"]["unmatched_requests"], is_(2))
+
+
+def test_match_cache_is_invalidated_by_add():
+    stub_group = StubGroup()
+    stub_group.enable_match_cache(8)
+    stub_group.match("GET", "/hi")
+    stub_group.add("GET", "/hi", 200, {"message": "hello"})
+
+    matched, _ = stub_group.match("GET", "/hi")
+    assert_that(matched, not_none())
+
+
+def test_match_cache_hands_out_copies_of_path_params():
+    stub_group = StubGroup()
+    stub_group.enable_match_cache(8)
+    stub_group.add("GET", "/hello/{name}", 200, {})
+
+    _, first = stub_group.match("GET", "/hello/a")
+    first["name"] = "changed"
+    _, second = stub_group.match("GET", "/hello/a")
+    assert_that(second, is_({"name": "a"}))
+
+
+def test_match_cache_evicts_least_recently_used():
+    stub_group = StubGroup()
+    stub_group.enable_match_cache(2)
+    for path in ("/a", "/b", "/a", "/c"):
+        stub_group.match("GET", path)
+
+    assert_that(list(stub_group.match_cache._data), is_([("GET", "/a"), ("GET", "/c")]))
+
+
+def test_stub_matching_admin_path_overrides_it_for_its_method():
+    stub_group = StubGroup()
+    stub_group.add("GET", "/{section}/health", 200, {})
+
+    assert_that(stub_group.overrides_admin("GET", "/__mimicker__/health"), is_(True))
+    assert_that(stub_group.overrides_admin("POST", "/__mimicker__/health"), is_(False))
+    assert_that(stub_group.overrides_admin("GET", "/__mimicker__/report"), is_(False))
@@ -0,0 +1,59 @@
+import json
+
+from hamcrest import assert_that, is_
+
+from mimicker.template import BodyTemplate, fill
+
+
+def test_static_body_matches_json_dumps():
+    body = {"a": [1, 2.5, None, True], "b": {"c": "text", 3: "int key"}, "d": []}
+    template = BodyTemplate(body)
+
+    assert_that(template.static, is_(True))
+    assert_that(template.render({}), is_(json.dumps(body).encode("utf-8")))
+
+
+def test_placeholders_are_filled_at_any_depth():
+    template = BodyTemplate({"user": {"id": "{id}", "tags": ["x", "id-{id}"]}, "n": 1}, {"id"})
+
+    assert_that(template.static, is_(False))
+    assert_that(template.render({"id": "42"}), is_(json.dumps(
+        {"user": {"id": "42", "tags": ["x", "id-42"]}, "n": 1}).encode("utf-8")))
+
+
+def test_rendered_values_are_json_escaped():
+    template = BodyTemplate({"name": "{name}"}, {"name"})
+
+    assert_that(json.loads(template.render({"name": 'a"b\\c'})), is_({"name": 'a"b\\c'}))
+
+
+def test_text_without_a_path_param_placeholder_is_kept_verbatim():
+    body = {"regex": "a{2}", "brace": "}", "other": {"tpl": "{missing}"}}
+    template = BodyTemplate(body, {"id"})
+
+    assert_that(template.static, is_(True))
+    assert_that(json.loads(template.render({"id": "42"})), is_(body))
+
+
+def test_escaped_braces_are_unescaped_without_a_placeholder():
+    template = BodyTemplate({"a": "{{x}}", "nested": {"b": "{{lit}}"}}, {"id"})
+
+    assert_that(template.static, is_(True))
+    assert_that(json.loads(template.render({"id": "42"})),
+                is_({"a": "{x}", "nested": {"b": "{lit}"}}))
+    assert_that(fill("{{x}}", {}), is_("{x}"))
+
+
+def test_only_path_param_placeholders_are_filled():
+    template = BodyTemplate({"msg": "{greeting} {id}, {{literal}}"}, {"id"})
+
+    assert_that(json.loads(template.render({"id": "42"})),
+                is_({"msg": "{greeting} 42, {literal}"}))
+
+
+def test_fill_leaves_unknown_placeholders():
+    assert_that(fill("hi {name} from {id}", {"id": "7"}), is_("hi {name} from 7"))
+
+
+def test_string_body_is_sent_as_is():
+    assert_that(BodyTemplate("Hello {name}").render({"name": "x"}), is_(b"Hello {name}"))
@@ -1,7 +1,11 @@
+import gc
+import threading
 import time
 
 import pytest
-from hamcrest import assert_that, is_, has_length, has_entry, equal_to
+from hamcrest import (assert_that, is_, has_length, has_entry, has_entries, has_key,
+                      equal_to, contains_inanyorder, close_to, not_, greater_than_or_equal_to,
+                      less_than)
 
 from mimicker.mimicker import mimicker, get, post
 from mimicker.tracking import RequestTracker
@@ -77,6 +81,129 @@ class TestRequestTracker:
         report = self.tracker.report()
         assert_that(report["summary"]["total_stubs"], is_(0))
 
+    def test_unmatched_requests_are_aggregated_by_method_and_path(self):
+        for _ in range(3):
+            self.tracker.record_unmatched("GET", "/missing")
+        self.tracker.record_unmatched("POST", "/missing")
+        report = self.tracker.report()
+        assert_that(report["summary"]["unmatched_requests"], is_(4))
+        assert_that(report["summary"]["unmatched_paths"], is_(2))
+        get_missing = report["unmatched_requests"][0]
+        assert_that(get_missing, has_entries({"method": "GET", "path": "/missing",
+                                              "count": 3}))
+        assert_that(get_missing["first_seen"] <= get_missing["last_seen"], is_(True))
+        assert_that(get_missing["timestamp"], is_(get_missing["first_seen"]))
+
+    def test_least_recently_seen_unmatched_path_is_evicted(self):
+        self.tracker.limit_unmatched(2)
+        self.tracker.record_unmatched("GET", "/a")
+        self.tracker.record_unmatched("GET", "/b")
+        self.tracker.record_unmatched("GET", "/a")
+        self.tracker.record_unmatched("GET", "/c")
+        report = self.tracker.report()
+        assert_that([r["path"] for r in report["unmatched_requests"]],
+                    contains_inanyorder("/a", "/c"))
+        assert_that(report["summary"]["unmatched_requests"], is_(4))
+
+    def test_unmatched_store_stays_bounded(self):
+        self.tracker.limit_unmatched(10)
+        for i in range(1000):
+            self.tracker.record_unmatched("GET", f"/scan/{i}")
+        report = self.tracker.report()
+        assert_that(report["unmatched_requests"], has_length(10))
+        assert_that(report["summary"]["unmatched_requests"], is_(1000))
+
+    def test_unmatched_samples_keep_the_latest_requests(self):
+        self.tracker.limit_unmatched(10, samples=2)
+        for path in ("/a", "/b", "/c"):
+            self.tracker.record_unmatched("GET", path)
+        report = self.tracker.report()
+        assert_that([r["path"] for r in report["unmatched_samples"]], is_(["/b", "/c"]))
+
+    def test_unmatched_samples_are_off_by_default(self):
+        self.tracker.record_unmatched("GET", "/a")
+        assert "unmatched_samples" not in self.tracker.report()
+
+    def test_invalid_unmatched_limits_are_rejected(self):
+        with pytest.raises(ValueError):
+            self.tracker.limit_unmatched(0)
+        with pytest.raises(ValueError):
+            self.tracker.limit_unmatched(10, samples=-1)
+
+    def test_register_stub_returns_slot_for_count_hit(self):
+        first = self.tracker.register_stub("GET", "/a")
+        second = self.tracker.register_stub("GET", "/b")
+        self.tracker.count_hit(second)
+        self.tracker.count_hit(second)
+        report = self.tracker.report()
+        assert_that([first, second], is_([0, 1]))
+        assert_that([s["hit_count"] for s in report["stubs"]], is_([0, 2]))
+
+    def test_registering_a_stub_again_resets_its_hits(self):
+        slot = self.tracker.register_stub("GET", "/a")
+        self.tracker.count_hit(slot)
+        assert_that(self.tracker.register_stub("GET", "/a"), is_(slot))
+        report = self.tracker.report()
+        assert_that(report["summary"]["total_stubs"], is_(1))
+        assert_that(report["stubs"][0]["hit_count"], is_(0))
+
+    def test_hits_from_many_threads_are_all_counted(self):
+        slot = self.tracker.register_stub("GET", "/busy")
+
+        def hit():
+            for _ in range(5000):
+                self.tracker.count_hit(slot)
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        del threads
+        gc.collect()
+
+        assert_that(self.tracker.report()["stubs"][0]["hit_count"], is_(40000))
+
+    def test_reset_clears_hits_of_ended_threads(self):
+        slot = self.tracker.register_stub("GET", "/a")
+        thread = threading.Thread(target=self.tracker.count_hit, args=(slot,))
+        thread.start()
+        thread.join()
+        del thread
+        gc.collect()
+        assert_that(self.tracker.report()["stubs"][0]["hit_count"], is_(1))
+
+        self.tracker.reset()
+
+        assert_that(self.tracker.report()["stubs"][0]["hit_count"], is_(0))
+
+    def test_timings_are_reported_once_recorded(self):
+        slot = self.tracker.register_stub("GET", "/slow")
+        self.tracker.register_stub("GET", "/idle")
+        for _ in range(10):
+            self.tracker.record_response(slot, 0.002, 0.5, 0.501, 128)
+
+        slow, idle = self.tracker.report()["stubs"]
+
+        assert_that(slow["timings"], has_entries({
+            "count": 10,
+            "handling_ms": has_entries({"p50": close_to(2, 0.25), "max": 2}),
+            "delay_ms": has_entries({"p99": 500}),
+            "actual_delay_ms": has_entries({"max": 501}),
+            "response_bytes": has_entries({"p50": 128, "max": 128}),
+        }))
+        assert_that(idle, not_(has_key("timings")))
+
+    def test_reset_and_reregistration_clear_timings(self):
+        slot = self.tracker.register_stub("GET", "/a")
+        self.tracker.record_response(slot, 0.001, 0, 0, 10)
+
+        self.tracker.reset()
+        assert_that(self.tracker.report()["stubs"][0], not_(has_key("timings")))
+
+        self.tracker.record_response(slot, 0.001, 0, 0, 10)
+        self.tracker.register_stub("GET", "/a")
+        assert_that(self.tracker.report()["stubs"][0], not_(has_key("timings")))
+
 
 # ── integration tests: tracking through the live server ──────────────────────
 
@@ -140,3 +267,93 @@ def test_admin_endpoints_not_recorded_as_unmatched(tracking_server):
     unmatched_paths = [r["path"] for r in report["unmatched_requests"]]
     assert "/__mimicker__/health" not in unmatched_paths
     assert "/__mimicker__/report" not in unmatched_paths
+
+
+def test_report_merges_peer_snapshots():
+    local = RequestTracker()
+    peer = RequestTracker()
+    for tracker in (local, peer):
+        tracker.register_stub("GET", "/shared")
+    local.record_hit("GET", "/shared")
+    peer.record_hit("GET", "/shared")
+    peer.record_hit("GET", "/shared")
+    peer.record_unmatched("GET", "/peer-miss")
+
+    report = local.report([peer.snapshot()])
+
+    assert_that(report["stubs"], has_length(1))
+    assert_that(report["stubs"][0]["hit_count"], is_(3))
+    assert_that(report["unmatched_requests"][0]["path"], is_("/peer-miss"))
+    assert_that(local.report()["stubs"][0]["hit_count"], is_(1))
+
+
+def test_report_merges_unmatched_paths_of_peers():
+    local = RequestTracker(unmatched_samples=5)
+    peer = RequestTracker(unmatched_samples=5)
+    local.record_unmatched("GET", "/both")
+    peer.record_unmatched("GET", "/both")
+    peer.record_unmatched("GET", "/both")
+    peer.record_unmatched("GET", "/peer-only")
+
+    report = local.report([peer.snapshot()])
+
+    assert_that(report["summary"]["unmatched_requests"], is_(4))
+    assert_that(report["unmatched_requests"], contains_inanyorder(
+        has_entries({"path": "/both", "count": 3}),
+        has_entries({"path": "/peer-only", "count": 1}),
+    ))
+    assert_that(report["unmatched_samples"], has_length(4))
+
+
+def test_report_merges_timings_of_peers():
+    local = RequestTracker()
+    peer = RequestTracker()
+    local.record_response(local.register_stub("GET", "/a"), 0.001, 0, 0, 10)
+    peer.record_response(peer.register_stub("GET", "/a"), 0.004, 0, 0, 1000)
+
+    report = local.report([peer.snapshot()])
+
+    assert_that(report["stubs"][0]["timings"], has_entries({
+        "count": 2, "response_bytes": has_entries({"p50": 10, "max": 1000})}))
+    assert_that(local.report()["stubs"][0]["timings"]["count"], is_(1))
+
+
+def test_engines_record_stub_timings(server):
+    server.routes(get("/delayed").delay(0.05).body("late"),
+                  get("/quick").body("x" * 100))
+    client = Client(f"http://localhost:{server.get_port()}")
+    client.get("/delayed")
+    for _ in range(3):
+        client.get("/quick")
+
+    stubs = {s["path"]: s for s in client.get("/__mimicker__/report").json()["stubs"]}
+
+    delayed = stubs["/delayed"]["timings"]
+    assert_that(delayed["delay_ms"]["max"], is_(50))
+    assert_that(delayed["actual_delay_ms"]["max"], greater_than_or_equal_to(45))
+    assert_that(delayed["handling_ms"]["max"], less_than(45))
+    quick = stubs["/quick"]["timings"]
+    assert_that(quick["count"], is_(3))
+    assert_that(quick["delay_ms"]["max"], is_(0))
+    assert_that(quick["response_bytes"]["p50"], greater_than_or_equal_to(100))
+
+
+def test_server_limits_unmatched_store():
+    server = mimicker(0, max_unmatched=5, unmatched_samples=3)
+    try:
+        client = Client(f"http://localhost:{server.get_port()}")
+        for i in range(20):
+            client.get(f"/scan/{i}")
+        report = client.get("/__mimicker__/report").json()
+    finally:
+        server.shutdown()
+
+    assert_that(report["summary"]["unmatched_requests"], is_(20))
+    assert_that(report["unmatched_requests"], has_length(5))
+    assert_that([r["path"] for r in report["unmatched_samples"]],
+                is_(["/scan/17", "/scan/18", "/scan/19"]))
+
+
+def test_server_rejects_an_empty_unmatched_store():
+    with pytest.raises(ValueError):
+        mimicker(0, max_unmatched=0)
@@ -0,0 +1,111 @@
+import time
+
+import pytest
+import requests
+from hamcrest import assert_that, is_, contains_string, starts_with
+
+from mimicker.mimicker import mimicker, post
+from tests.support.client import connect, url
+
+
+def _describe_upload(payload, **kwargs):
+    if hasattr(payload, "read"):
+        data = payload.read()
+        return 200, {"spooled": True, "size": len(data), "tail": data[-4:].decode()}
+    return 200, {"spooled": False, "size": len(payload or b"")}
+
+
+@pytest.fixture
+def server(engine):
+    server = mimicker(0, spool_threshold=1024, max_body_size=64 * 1024, **engine)
+    server.routes(
+        post("/upload").response_func(_describe_upload),
+        post("/ignore").status(204),
+    )
+    yield server
+    server.shutdown()
+
+
+def test_large_upload_reaches_response_func_as_file(server):
+    body = b"x" * 10000 + b"tail"
+    resp = requests.post(url(server, "/upload"), data=body,
+                         headers={"Content-Type": "application/octet-stream"})
+    assert_that(resp.json(), is_({"spooled": True, "size": 10004, "tail": "tail"}))
+
+
+def test_chunked_upload_is_spooled(server):
+    chunks = (b"y" * 512 for _ in range(8))
+    resp = requests.post(url(server, "/upload"), data=chunks,
+                         headers={"Content-Type": "application/octet-stream"})
+    assert_that(resp.json()["spooled"], is_(True))
+    assert_that(resp.json()["size"], is_(4096))
+
+
+def test_small_upload_stays_in_memory(server):
+    resp = requests.post(url(server, "/upload"), data=b"small",
+                         headers={"Content-Type": "application/octet-stream"})
+    assert_that(resp.json(), is_({"spooled": False, "size": 5}))
+
+
+def test_declared_oversized_body_is_refused(server):
+    with connect(server) as sock:
+        sock.sendall(b"POST /upload HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Length: 1000000\r\n\r\n")
+        reply = sock.recv(65536).decode()
+    assert_that(reply, starts_with("HTTP/1.1 413"))
+
+
+def test_chunked_oversized_body_is_refused(server):
+    chunks = (b"z" * 8192 for _ in range(16))
+    try:
+        resp = requests.post(url(server, "/upload"), data=chunks)
+    except requests.ConnectionError:
+        # The server may close the connection before the upload finishes.
+        return
+    assert_that(resp.status_code, is_(413))
+
+
+def test_expect_100_continue_is_honoured(server):
+    with connect(server) as sock:
+        sock.sendall(b"POST /upload HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Type: application/octet-stream\r\n"
+                     b"Content-Length: 5\r\nExpect: 100-continue\r\n"
+                     b"Connection: close\r\n\r\n")
+        interim = sock.recv(65536).decode()
+        assert_that(interim, starts_with("HTTP/1.1 100 Continue"))
+        sock.sendall(b"hello")
+        reply = b""
+        while chunk := sock.recv(65536):
+            reply += chunk
+    assert_that(reply.decode(), contains_string('"size": 5'))
+
+
+def test_expect_100_continue_declared_oversized_gets_413(server):
+    with connect(server) as sock:
+        sock.sendall(b"POST /upload HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Length: 1000000\r\nExpect: 100-continue\r\n\r\n")
+        reply = sock.recv(65536).decode()
+    assert_that(reply, starts_with("HTTP/1.1 413"))
+
+
+def test_negative_content_length_is_rejected(server):
+    with connect(server) as sock:
+        sock.sendall(b"POST /upload HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Length: -1\r\n\r\n")
+        reply = sock.recv(65536).decode()
+    assert_that(reply, starts_with("HTTP/1.1 400"))
+
+
+def test_slow_upload_outlasting_keep_alive_timeout_is_answered(server):
+    server.server.keep_alive_timeout = 0.5
+    with connect(server) as sock:
+        sock.sendall(b"POST /upload HTTP/1.1\r\nHost: localhost\r\n"
+                     b"Content-Type: application/octet-stream\r\n"
+                     b"Content-Length: 20\r\nConnection: close\r\n\r\n")
+        for _ in range(20):
+            time.sleep(0.1)
+            sock.sendall(b"x")
+        reply = b""
+        while chunk := sock.recv(65536):
+            reply += chunk
+    assert_that(reply.decode(), contains_string('"size": 20'))